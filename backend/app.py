@@ -12,6 +12,7 @@ All routes are served on port 5000 with the following prefixes:
   /api/goals/*      — Goals, key results, comments, approvals
   /api/appraisals/* — Appraisal records, self/manager assessment
   /api/cycles/*     — Appraisal cycle management
+  /api/jobs/*       — Background job status / resume
 """
 import os
 import uuid
@@ -42,6 +43,22 @@ def create_app(config_name=None):
     limiter.init_app(app)
     CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
 
+    from utils.identity_cache import identity_cache, register_invalidation_hooks
+    identity_cache.init_app(app)
+    register_invalidation_hooks(db.session)
+
+    from utils.password_hasher import password_hasher
+    password_hasher.init_app(app)
+
+    from services.job_runner import job_runner
+    job_runner.init_app(app)
+
+    from services.event_bus import event_bus
+    event_bus.init_app(app, db.session)
+
+    from services.reporting_rollups import register_rollup_hooks
+    register_rollup_hooks(db.session)
+
     # ── Logging ─────────────────────────────────────────────────────
     logging.basicConfig(
         level=logging.INFO,
@@ -61,6 +78,8 @@ def create_app(config_name=None):
     from routes.reports import reports_bp
     from routes.manager_reviews import manager_reviews_bp
     from routes.peer_feedback import peer_feedback_bp
+    from routes.jobs import jobs_bp
+    from routes.stream import stream_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(users_bp, url_prefix='/api/users')
@@ -74,6 +93,8 @@ def create_app(config_name=None):
     app.register_blueprint(reports_bp, url_prefix='/api/reports')
     app.register_blueprint(manager_reviews_bp, url_prefix='/api/manager-reviews')
     app.register_blueprint(peer_feedback_bp, url_prefix='/api/peer-feedback')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    app.register_blueprint(stream_bp, url_prefix='/api/stream')
 
     # ── Request lifecycle ───────────────────────────────────────────
 
@@ -249,6 +270,93 @@ def create_app(config_name=None):
         except Exception:
             db.session.rollback()  # Index already exists
 
+        # ── Incremental ?since= sync (comments, notifications) ──────
+        sync_stmts = [
+            "ALTER TABLE notifications ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE",
+            "UPDATE notifications SET updated_at = created_at WHERE updated_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_notifications_recipient_updated ON notifications (recipient_id, updated_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_goal_comments_goal_updated ON goal_comments (goal_id, updated_at, id)",
+        ]
+        for stmt in sync_stmts:
+            try:
+                db.session.execute(db.text(stmt))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()  # Column/index already exists
+
+        # ── Notification inbox paging / retention ──────────────────
+        notification_index_stmts = [
+            "CREATE INDEX IF NOT EXISTS ix_notifications_recipient_created ON notifications (recipient_id, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_notifications_read_created ON notifications (created_at) WHERE is_read",
+        ]
+        for stmt in notification_index_stmts:
+            try:
+                db.session.execute(db.text(stmt))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()  # Index already exists
+
+        # ── Manager approval queue ─────────────────────────────────
+        approval_queue_stmts = [
+            "ALTER TABLE goals ADD COLUMN submitted_at TIMESTAMP WITH TIME ZONE",
+            """UPDATE goals SET submitted_at = COALESCE(
+                   (SELECT MAX(a.timestamp) FROM goal_audits a
+                    WHERE a.goal_id = goals.id AND a.new_status = 'pending_approval'),
+                   updated_at, created_at)
+               WHERE approval_status = 'pending_approval' AND submitted_at IS NULL""",
+            "CREATE INDEX IF NOT EXISTS ix_user_profiles_manager ON user_profiles (manager_id)",
+            "CREATE INDEX IF NOT EXISTS ix_goals_pending_approval ON goals (employee_id, submitted_at, id) "
+            "WHERE approval_status = 'pending_approval'",
+        ]
+        for stmt in approval_queue_stmts:
+            try:
+                db.session.execute(db.text(stmt))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()  # Column/index already exists
+
+        # ── Refresh tokens: keyed digests (rt2.) ───────────────────
+        refresh_token_stmts = [
+            "ALTER TABLE refresh_tokens ADD COLUMN token_digest VARCHAR(64)",
+            "ALTER TABLE refresh_tokens ALTER COLUMN token_hash DROP NOT NULL",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_refresh_tokens_token_digest ON refresh_tokens (token_digest)",
+            "ALTER TABLE refresh_tokens ADD COLUMN family_id VARCHAR(36)",
+            "UPDATE refresh_tokens SET family_id = id WHERE family_id IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_refresh_tokens_family_id ON refresh_tokens (family_id)",
+            "CREATE INDEX IF NOT EXISTS ix_refresh_tokens_expires_at ON refresh_tokens (expires_at)",
+        ]
+        for stmt in refresh_token_stmts:
+            try:
+                db.session.execute(db.text(stmt))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()  # Column/index already exists
+
+        # ── Background jobs: one live job per (slot, resource_id) ──
+        background_job_stmts = [
+            "ALTER TABLE background_jobs ADD COLUMN slot VARCHAR(50)",
+            """UPDATE background_jobs SET slot = CASE
+                   WHEN job_type IN ('cycle_activation', 'cycle_sync') THEN 'cycle_generation'
+                   ELSE job_type END
+               WHERE slot IS NULL""",
+            """UPDATE background_jobs SET status = 'failed', error = 'Superseded by a newer job'
+               WHERE status IN ('queued', 'running') AND EXISTS (
+                   SELECT 1 FROM background_jobs newer
+                   WHERE newer.slot = background_jobs.slot
+                     AND newer.resource_id = background_jobs.resource_id
+                     AND newer.status IN ('queued', 'running')
+                     AND newer.created_at > background_jobs.created_at)""",
+            "DROP INDEX IF EXISTS uq_background_jobs_live",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_background_jobs_live_slot ON background_jobs (slot, resource_id) "
+            "WHERE status IN ('queued', 'running')",
+        ]
+        for stmt in background_job_stmts:
+            try:
+                db.session.execute(db.text(stmt))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()  # Index already exists
+
     return app
 
 
@@ -20,6 +20,55 @@ class Config:
     JWT_SECRET = os.getenv('JWT_SECRET', '')
     JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
 
+    # ── Identity cache (@require_auth DB verification) ──────────────
+    # Upper bound on how long a role change / deactivation can go unnoticed
+    # by *other* workers. 0 disables the cache.
+    IDENTITY_CACHE_TTL_SECONDS = int(os.getenv('IDENTITY_CACHE_TTL_SECONDS', 30))
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv('IDENTITY_CACHE_MAX_ENTRIES', 10000))
+
+    # ── Background jobs (cycle activation / sync / spillover) ───────
+    JOB_WORKER_POOL_SIZE = int(os.getenv('JOB_WORKER_POOL_SIZE', 2))
+    # Running jobs that haven't reported progress for this long are
+    # considered dead and may be resumed.
+    JOB_STALE_AFTER_SECONDS = int(os.getenv('JOB_STALE_AFTER_SECONDS', 600))
+    # Queued jobs no worker has picked up for this long (and that aren't
+    # waiting in the local pool) were lost with their process.
+    JOB_QUEUED_STALE_AFTER_SECONDS = int(os.getenv('JOB_QUEUED_STALE_AFTER_SECONDS', 3600))
+    JOBS_RUN_INLINE = False
+
+    # ── Event stream (/api/stream) ──────────────────────────────────
+    # 'auto' uses Postgres LISTEN/NOTIFY when the database is Postgres, so
+    # events reach subscribers on every gunicorn worker; 'local' is in-process.
+    EVENT_BUS_BACKEND = os.getenv('EVENT_BUS_BACKEND', 'auto')
+    EVENT_BUS_QUEUE_SIZE = int(os.getenv('EVENT_BUS_QUEUE_SIZE', 100))
+    STREAM_HEARTBEAT_SECONDS = int(os.getenv('STREAM_HEARTBEAT_SECONDS', 15))
+    # Streams are closed after this long; EventSource reconnects on its own.
+    STREAM_MAX_SECONDS = int(os.getenv('STREAM_MAX_SECONDS', 300))
+
+    # ── Notification retention ──────────────────────────────────────
+    # Read notifications older than this are moved to notifications_archive.
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+
+    # ── Password hashing ────────────────────────────────────────────
+    # bcrypt cost for new hashes; login re-hashes passwords stored at another cost.
+    PASSWORD_BCRYPT_ROUNDS = int(os.getenv('PASSWORD_BCRYPT_ROUNDS', 12))
+    # bcrypt runs on this many threads per worker; calls beyond the pool
+    # queue up to PASSWORD_HASH_MAX_QUEUE deep, then get a 503.
+    PASSWORD_HASH_POOL_SIZE = int(os.getenv('PASSWORD_HASH_POOL_SIZE', 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 16))
+    PASSWORD_HASH_MAX_WAIT_SECONDS = float(os.getenv('PASSWORD_HASH_MAX_WAIT_SECONDS', 5))
+
+    # ── Refresh-token retention ─────────────────────────────────────
+    # Revoked refresh tokens are kept this long (so a replayed token still
+    # revokes its family) before the purge job deletes them.
+    REFRESH_TOKEN_REVOKED_RETENTION_HOURS = int(os.getenv('REFRESH_TOKEN_REVOKED_RETENTION_HOURS', 24))
+
+    # ── Score simulation (what-if weight scenarios) ─────────────────
+    # How long per-appraisal component averages are reused between
+    # simulation requests. 0 reloads them every time.
+    SCORE_SIMULATION_CACHE_TTL_SECONDS = int(os.getenv('SCORE_SIMULATION_CACHE_TTL_SECONDS', 300))
+    SCORE_SIMULATION_CACHE_MAX_CYCLES = int(os.getenv('SCORE_SIMULATION_CACHE_MAX_CYCLES', 16))
+
     # ── Azure AD ────────────────────────────────────────────────────
     AZURE_AD_TENANT_ID = os.getenv('AZURE_AD_TENANT_ID', '')
     AZURE_AD_CLIENT_ID = os.getenv('AZURE_AD_CLIENT_ID', '')
@@ -40,6 +89,8 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    JOBS_RUN_INLINE = True
+    PASSWORD_BCRYPT_ROUNDS = 4
 
 
 config_map = {
@@ -0,0 +1,117 @@
+"""
+Shared pytest fixtures.
+
+Tests run against the 'testing' config (in-memory SQLite), so no Postgres or
+running server is needed. The legacy script-style tests (test_scoring_engine,
+test_provisioning, ...) still expect a seeded development database.
+"""
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('JWT_SECRET', 'test-secret-for-pytest-only-0123456789abcdef')
+
+import pytest
+from flask import g
+from flask.testing import FlaskClient
+from sqlalchemy import event
+
+from app import create_app
+from extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class RequestScopedClient(FlaskClient):
+    """Test client that gives every request a clean `g`.
+
+    The `app` fixture keeps an app context pushed for the whole test, and Flask
+    reuses it for test requests, so `g` would otherwise leak between requests.
+    """
+
+    def open(self, *args, **kwargs):
+        for name in list(g):
+            g.pop(name)
+        return super().open(*args, **kwargs)
+
+
+@pytest.fixture
+def client(app):
+    app.test_client_class = RequestScopedClient
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a UserAuth + UserProfile pair and return the profile."""
+    from models.user_auth import UserAuth
+    from models.user_profile import UserProfile
+
+    def _make_user(role='employee', manager_id=None, department_id=None, **profile_fields):
+        user_id = str(uuid.uuid4())
+        email = profile_fields.pop('email', f'{user_id[:8]}@example.com')
+        db.session.add(UserAuth(id=user_id, email=email, role=role, is_active=True))
+        profile = UserProfile(
+            id=user_id,
+            email=email,
+            first_name=profile_fields.pop('first_name', 'Test'),
+            last_name=profile_fields.pop('last_name', user_id[:8]),
+            manager_id=manager_id,
+            department_id=department_id,
+            **profile_fields,
+        )
+        db.session.add(profile)
+        db.session.commit()
+        return profile
+
+    return _make_user
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Build an Authorization header for the given user id."""
+    from models.user_auth import UserAuth
+    from utils.jwt_utils import create_access_token
+
+    def _auth_headers(user_id):
+        user = db.session.get(UserAuth, user_id)
+        return {'Authorization': f'Bearer {create_access_token(user)}'}
+
+    return _auth_headers
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager counting SQL statements sent to the database."""
+    from contextlib import contextmanager
+
+    @contextmanager
+    def _count_queries():
+        counter = QueryCounter()
+        event.listen(db.engine, 'before_cursor_execute', counter)
+        try:
+            yield counter
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', counter)
+
+    return _count_queries
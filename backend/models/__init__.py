@@ -19,6 +19,8 @@ from models.goal_comment import GoalComment
 from models.goal_comment_reaction import GoalCommentReaction
 from models.goal_version import GoalVersion
 from models.notification import Notification
+from models.notification_counter import NotificationCounter
+from models.notification_archive import NotificationArchive
 
 # Appraisal models
 from models.appraisal import Appraisal
@@ -33,3 +35,8 @@ from models.self_assessment import SelfAssessment
 from models.manager_review import ManagerReview
 from models.appraisal_review import AppraisalReview
 from models.appraisal_appeal import AppraisalAppeal
+from models.appraisal_rollup import AppraisalRollup
+from models.appraisal_rollup_state import AppraisalRollupState
+
+# Infrastructure models
+from models.background_job import BackgroundJob
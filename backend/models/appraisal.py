@@ -1,6 +1,9 @@
 """Appraisal model — individual employee appraisal records."""
 import uuid
 from datetime import datetime, timezone
+
+from sqlalchemy.orm import contains_eager, defer, joinedload
+
 from extensions import db
 
 
@@ -91,7 +94,35 @@ class Appraisal(db.Model):
     )
     peer_feedbacks = db.relationship('PeerFeedback', backref='appraisal', lazy='dynamic')
 
-    def to_dict(self):
+    # Large JSON payloads that list views can leave out via `fields=`
+    HEAVY_FIELDS = ('self_assessment', 'goal_ratings', 'manager_assessment', 'manager_goal_ratings')
+
+    @classmethod
+    def eager_options(cls, fields=None, cycle_joined=False):
+        """Loader options that let to_dict() serialize a list without per-row queries.
+
+        Pass cycle_joined=True when the query already joins AppraisalCycle so the
+        cycle is populated from that join instead of a second one. When `fields`
+        is given, heavy JSON columns not listed in it are deferred.
+        """
+        options = [
+            contains_eager(cls.cycle) if cycle_joined else joinedload(cls.cycle),
+            joinedload(cls.employee),
+            joinedload(cls.manager),
+        ]
+        if fields is not None:
+            options.extend(
+                defer(getattr(cls, name)) for name in cls.HEAVY_FIELDS if name not in fields
+            )
+        return options
+
+    def to_dict(self, fields=None):
+        """Serialize the appraisal.
+
+        `fields` is an optional collection of keys to return ('id' is always
+        included). Heavy JSON columns are only read when requested, so they can
+        be deferred at query time.
+        """
         # Base dictionary
         d = {
             'id': self.id,
@@ -102,12 +133,8 @@ class Appraisal(db.Model):
             'eligibility_status': self.eligibility_status,
             'eligibility_reason': self.eligibility_reason,
             'is_prorated': self.is_prorated,
-            'self_assessment': self.self_assessment,
-            'goal_ratings': self.goal_ratings,
             'self_submitted': self.self_submitted,
             'self_assessment_submitted_at': self.self_assessment_submitted_at.isoformat() if self.self_assessment_submitted_at else None,
-            'manager_assessment': self.manager_assessment,
-            'manager_goal_ratings': self.manager_goal_ratings,
             'manager_submitted': self.manager_submitted,
             'manager_assessment_submitted_at': self.manager_assessment_submitted_at.isoformat() if self.manager_assessment_submitted_at else None,
             'goals_avg_rating': float(self.goals_avg_rating) if self.goals_avg_rating else None,
@@ -127,6 +154,9 @@ class Appraisal(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+        for name in self.HEAVY_FIELDS:
+            if fields is None or name in fields:
+                d[name] = getattr(self, name)
 
         # Enrich with Cycle details
         if self.cycle:
@@ -177,4 +207,6 @@ class Appraisal(db.Model):
                 'manager_email': '',
             })
 
+        if fields is not None:
+            d = {k: v for k, v in d.items() if k == 'id' or k in fields}
         return d
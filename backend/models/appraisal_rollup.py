@@ -0,0 +1,20 @@
+"""AppraisalRollup model — pre-aggregated appraisal counts for the HR report endpoints."""
+from extensions import db
+
+
+class AppraisalRollup(db.Model):
+    """Number of appraisals per (cycle, department, status, overall rating, created month).
+
+    Kept current by services.reporting_rollups (per-change deltas, plus
+    per-cycle rebuilds when drift is detected). department_id is the
+    employee's current department (NULL when they have none).
+    """
+    __tablename__ = 'appraisal_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cycle_id = db.Column(db.String(36), nullable=False, index=True)
+    department_id = db.Column(db.String(36), nullable=True)
+    status = db.Column(db.String(30), nullable=True)
+    overall_rating = db.Column(db.Integer, nullable=True)
+    month = db.Column(db.Date, nullable=True)
+    appraisal_count = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,26 @@
+"""AppraisalRollupState model — freshness of each cycle's appraisal rollups."""
+from datetime import datetime, timezone
+from extensions import db
+
+
+class AppraisalRollupState(db.Model):
+    """One row per cycle whose rollups have been built.
+
+    is_stale is set when a change's deltas could not be applied to the
+    cycle's rollups (drift) and cleared by the next rebuild; a missing row
+    means "never built".
+    """
+    __tablename__ = 'appraisal_rollup_state'
+
+    cycle_id = db.Column(db.String(36), primary_key=True)
+    is_stale = db.Column(db.Boolean, default=False, nullable=False)
+    marked_stale_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    refreshed_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        return {
+            'cycle_id': self.cycle_id,
+            'is_stale': self.is_stale,
+            'marked_stale_at': self.marked_stale_at.isoformat() if self.marked_stale_at else None,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
@@ -0,0 +1,68 @@
+"""BackgroundJob model — long-running admin operations run off the request thread."""
+import uuid
+from datetime import datetime, timezone
+from extensions import db
+
+ACTIVE_JOB_STATUSES = ('queued', 'running')
+
+
+class BackgroundJob(db.Model):
+    __tablename__ = 'background_jobs'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = db.Column(db.String(50), nullable=False)
+    # e.g. 'cycle_activation' | 'cycle_sync' | 'probation_spillover'
+    # Job types that must not run alongside each other share a slot
+    # (e.g. 'cycle_generation' for activation and sync); defaults to job_type.
+    slot = db.Column(db.String(50), nullable=True)
+    resource_id = db.Column(db.String(36), nullable=True, index=True)
+    status = db.Column(db.String(20), default='queued', nullable=False)
+    # status: 'queued' | 'running' | 'succeeded' | 'failed'
+    progress = db.Column(db.Integer, default=0, nullable=False)  # 0 - 100
+    progress_message = db.Column(db.String(255), nullable=True)
+
+    payload = db.Column(db.JSON, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+
+    created_by = db.Column(db.String(36), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Bumped on every progress update; a running job whose heartbeat goes
+    # quiet belonged to a worker that died and can be resumed.
+    heartbeat_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_background_jobs_type_resource_status', 'job_type', 'resource_id', 'status'),
+        # At most one queued/running job per (slot, resource_id), so
+        # concurrent enqueues can't both start one.
+        db.Index('uq_background_jobs_live_slot', 'slot', 'resource_id', unique=True,
+                 postgresql_where=db.text("status IN ('queued', 'running')"),
+                 sqlite_where=db.text("status IN ('queued', 'running')")),
+    )
+
+    @property
+    def is_active(self):
+        return self.status in ACTIVE_JOB_STATUSES
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'slot': self.slot,
+            'resource_id': self.resource_id,
+            'status': self.status,
+            'progress': self.progress,
+            'progress_message': self.progress_message,
+            'payload': self.payload,
+            'result': self.result,
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+        }
@@ -22,6 +22,7 @@ class Goal(db.Model):
     appraisal_cycle_id = db.Column(db.String(36), nullable=True, index=True)
     created_by = db.Column(db.String(36), nullable=True)
     approval_status = db.Column(db.String(30), default='draft')
+    submitted_at = db.Column(db.DateTime(timezone=True), nullable=True)  # last sent for approval
     approved_by = db.Column(db.String(36), nullable=True)
     approved_date = db.Column(db.DateTime(timezone=True), nullable=True)
     rejected_reason = db.Column(db.Text, nullable=True)
@@ -55,6 +56,54 @@ class Goal(db.Model):
     def to_dict(self):
         from models.user_profile import UserProfile
         emp = UserProfile.query.get(self.employee_id) if self.employee_id else None
+        return self._serialize(emp, list(self.key_results), self.department)
+
+    @classmethod
+    def serialize_many(cls, goals):
+        """Serialize a list of goals with a fixed number of queries.
+
+        Produces the same dicts as calling to_dict() on each goal, but
+        prefetches employee profiles, key results and departments with one
+        IN query each instead of three lazy loads per goal.
+        """
+        from models.department import Department
+        from models.key_result import KeyResult
+        from models.user_profile import UserProfile
+
+        goals = list(goals)
+        if not goals:
+            return []
+
+        employee_ids = {g.employee_id for g in goals if g.employee_id}
+        department_ids = {g.department_id for g in goals if g.department_id}
+        goal_ids = [g.id for g in goals]
+
+        employees = {}
+        if employee_ids:
+            employees = {
+                p.id: p for p in UserProfile.query.filter(UserProfile.id.in_(employee_ids)).all()
+            }
+
+        departments = {}
+        if department_ids:
+            departments = {
+                d.id: d for d in Department.query.filter(Department.id.in_(department_ids)).all()
+            }
+
+        key_results = {goal_id: [] for goal_id in goal_ids}
+        for kr in KeyResult.query.filter(KeyResult.goal_id.in_(goal_ids)).all():
+            key_results[kr.goal_id].append(kr)
+
+        return [
+            g._serialize(
+                employees.get(g.employee_id),
+                key_results[g.id],
+                departments.get(g.department_id),
+            )
+            for g in goals
+        ]
+
+    def _serialize(self, emp, key_results, department):
         employee_name = f"{emp.first_name} {emp.last_name}" if emp else None
         return {
             'id': self.id,
@@ -84,9 +133,9 @@ class Goal(db.Model):
             'self_comment': self.self_comment,
             'manager_rating': self.manager_rating,
             'manager_comment': self.manager_comment,
-            'key_results': [kr.to_dict() for kr in self.key_results],
+            'key_results': [kr.to_dict() for kr in key_results],
             'department_id': self.department_id,
-            'department_name': self.department.name if self.department else None,
+            'department_name': department.name if department else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
@@ -38,6 +38,91 @@ class GoalComment(db.Model):
     def to_dict(self):
         from models.user_profile import UserProfile
         author = UserProfile.query.get(self.author_id)
+        reply_count = self.replies.filter_by(is_deleted=False).count() if not self.reply_to_id else 0
+        return self._serialize(author, reply_count, self._get_reactions_summary())
+
+    @classmethod
+    def serialize_threads(cls, top_level):
+        """Serialize top-level comments with their replies in a fixed number of queries.
+
+        Produces the same dicts as list_comments() used to build with to_dict()
+        per comment (replies oldest first under 'replies'), but loads the
+        replies, authors and reaction summaries for the whole page with one
+        query each and assembles the tree in memory.
+        """
+        top_level = list(top_level)
+        if not top_level:
+            return []
+
+        replies = {c.id: [] for c in top_level}
+        for reply in cls.query.filter(cls.reply_to_id.in_(list(replies))) \
+                .order_by(cls.created_at.asc()).all():
+            replies[reply.reply_to_id].append(reply)
+
+        reply_counts = {
+            comment_id: sum(1 for r in thread if not r.is_deleted) for comment_id, thread in replies.items()
+        }
+        serialized = iter(cls.serialize_many(
+            top_level + [r for thread in replies.values() for r in thread], reply_counts,
+        ))
+
+        result = [next(serialized) for _ in top_level]
+        for c in result:
+            c['replies'] = [next(serialized) for _ in replies[c['id']]]
+        return result
+
+    @classmethod
+    def serialize_many(cls, comments, reply_counts=None):
+        """Serialize a flat list of comments with a fixed number of queries.
+
+        Same dicts as to_dict(). Authors and reaction summaries (grouped by
+        emoji in SQL) are loaded with one query each; reply counts for
+        top-level comments too, unless the caller already has them.
+        """
+        from models.goal_comment_reaction import GoalCommentReaction
+        from models.user_profile import UserProfile
+
+        comments = list(comments)
+        if not comments:
+            return []
+        comment_ids = [c.id for c in comments]
+
+        author_ids = {c.author_id for c in comments}
+        authors = {
+            p.id: p for p in UserProfile.query.filter(UserProfile.id.in_(author_ids)).all()
+        }
+
+        if reply_counts is None:
+            top_level_ids = [c.id for c in comments if not c.reply_to_id]
+            reply_counts = dict(db.session.query(cls.reply_to_id, db.func.count(cls.id)).filter(
+                cls.reply_to_id.in_(top_level_ids),
+                cls.is_deleted.is_(False),
+            ).group_by(cls.reply_to_id).all()) if top_level_ids else {}
+
+        reactions = {}
+        grouped = db.session.query(
+            GoalCommentReaction.comment_id,
+            GoalCommentReaction.emoji,
+            db.func.count(GoalCommentReaction.id),
+            db.func.aggregate_strings(GoalCommentReaction.user_id, ','),
+        ).filter(
+            GoalCommentReaction.comment_id.in_(comment_ids),
+        ).group_by(
+            GoalCommentReaction.comment_id, GoalCommentReaction.emoji,
+        ).order_by(db.func.min(GoalCommentReaction.created_at))
+        for comment_id, emoji, count, user_ids in grouped:
+            reactions.setdefault(comment_id, {})[emoji] = {'count': count, 'users': user_ids.split(',')}
+
+        return [
+            c._serialize(
+                authors.get(c.author_id),
+                reply_counts.get(c.id, 0) if not c.reply_to_id else 0,
+                reactions.get(c.id, {}),
+            )
+            for c in comments
+        ]
+
+    def _serialize(self, author, reply_count, reactions):
         return {
             'id': self.id,
             'goal_id': self.goal_id,
@@ -50,8 +135,8 @@ class GoalComment(db.Model):
             'reply_to_id': self.reply_to_id,
             'is_edited': self.is_edited,
             'is_deleted': self.is_deleted,
-            'reply_count': self.replies.filter_by(is_deleted=False).count() if not self.reply_to_id else 0,
-            'reactions': self._get_reactions_summary(),
+            'reply_count': reply_count,
+            'reactions': reactions,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
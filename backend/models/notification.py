@@ -40,6 +40,12 @@ class Notification(db.Model):
     triggered_by = db.Column(db.String(36), nullable=True)
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # Bumped on every change (e.g. marked read) so clients can sync incrementally.
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     @property
     def message(self):
@@ -47,29 +53,37 @@ class Notification(db.Model):
 
     @classmethod
     def create(cls, recipient_id, event_type, message=None, related_id=None, triggered_by=None):
-        """Convenience factory — creates, adds to session, and commits."""
-        if not recipient_id:
-            return None
-        n = cls(
-            recipient_id=recipient_id,
-            event=event_type,
-            resource_id=related_id,
-            triggered_by=triggered_by,
+        """Convenience factory — creates via NotificationService and commits."""
+        from services.notification_service import NotificationService
+
+        n = NotificationService.create_notification(
+            recipient_id, event_type, triggered_by=triggered_by, resource_id=related_id,
         )
-        db.session.add(n)
-        db.session.commit()
+        if n is not None:
+            db.session.commit()
         return n
 
     def to_dict(self):
+        return self.row_to_dict({key: getattr(self, key) for key in _ROW_KEYS})
+
+    @staticmethod
+    def row_to_dict(row):
+        """to_dict() for a plain column mapping, e.g. a row built for a bulk insert."""
+        created_at, updated_at = row.get('created_at'), row.get('updated_at')
         return {
-            'id': self.id,
-            'recipient_id': self.recipient_id,
-            'event': self.event,
-            'message': self.message,
-            'goal_id': self.goal_id,
-            'resource_type': self.resource_type,
-            'resource_id': self.resource_id,
-            'triggered_by': self.triggered_by,
-            'is_read': self.is_read,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'id': row['id'],
+            'recipient_id': row['recipient_id'],
+            'event': row['event'],
+            'message': EVENT_MESSAGES.get(row['event'], f"Notification: {row['event']}"),
+            'goal_id': row.get('goal_id'),
+            'resource_type': row.get('resource_type'),
+            'resource_id': row.get('resource_id'),
+            'triggered_by': row.get('triggered_by'),
+            'is_read': row.get('is_read'),
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None,
         }
+
+
+_ROW_KEYS = ('id', 'recipient_id', 'event', 'goal_id', 'resource_type', 'resource_id',
+             'triggered_by', 'is_read', 'created_at', 'updated_at')
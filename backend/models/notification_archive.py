@@ -0,0 +1,24 @@
+"""NotificationArchive model — read notifications moved out of the live table."""
+from datetime import datetime, timezone
+from extensions import db
+
+
+class NotificationArchive(db.Model):
+    """Same columns as notifications, plus when the row was archived.
+
+    Filled by the notification_retention job so `notifications` only holds
+    unread and recent rows.
+    """
+    __tablename__ = 'notifications_archive'
+
+    id = db.Column(db.String(36), primary_key=True)
+    recipient_id = db.Column(db.String(36), nullable=False, index=True)
+    event = db.Column(db.String(50), nullable=False)
+    goal_id = db.Column(db.String(36), nullable=True)
+    resource_type = db.Column(db.String(50), nullable=True)
+    resource_id = db.Column(db.String(36), nullable=True)
+    triggered_by = db.Column(db.String(36), nullable=True)
+    is_read = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    archived_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,26 @@
+"""NotificationCounter model — cached per-user unread notification count."""
+from datetime import datetime, timezone
+from extensions import db
+
+
+class NotificationCounter(db.Model):
+    """Maintained by NotificationService on create / mark-read / read-all.
+
+    A missing row means "not known yet": it is filled from a COUNT on first
+    read or change, and the retention job re-derives all counters to repair any drift.
+    """
+    __tablename__ = 'notification_counters'
+
+    user_id = db.Column(db.String(36), primary_key=True)
+    unread_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'unread_count': self.unread_count,
+        }
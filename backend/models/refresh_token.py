@@ -4,6 +4,13 @@ from datetime import datetime, timezone
 from extensions import db
 
 
+def _as_utc(dt):
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
 class RefreshToken(db.Model):
     __tablename__ = 'refresh_tokens'
 
@@ -14,11 +21,22 @@ class RefreshToken(db.Model):
         nullable=False,
         index=True,
     )
-    token_hash = db.Column(db.String(255), nullable=False)
-    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    # Shared by a login's token and every token rotated from it
+    family_id = db.Column(db.String(36), nullable=True, index=True)
+    # bcrypt hash — only set on legacy ('<id>:<secret>') tokens
+    token_hash = db.Column(db.String(255), nullable=True)
+    # HMAC-SHA256 of the secret under REFRESH_TOKEN_HMAC_KEY ('rt2.' tokens)
+    token_digest = db.Column(db.String(64), nullable=True, unique=True, index=True)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
     is_revoked = db.Column(db.Boolean, default=False, nullable=False)
     revoked_at = db.Column(db.DateTime(timezone=True), nullable=True)
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     def is_expired(self):
-        return datetime.now(timezone.utc) > self.expires_at
+        return datetime.now(timezone.utc) > _as_utc(self.expires_at)
+
+    def revoked_seconds_ago(self):
+        """Seconds since revocation, or None if not revoked (or revoked before revoked_at existed)."""
+        if not self.is_revoked or self.revoked_at is None:
+            return None
+        return (datetime.now(timezone.utc) - _as_utc(self.revoked_at)).total_seconds()
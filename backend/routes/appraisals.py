@@ -16,7 +16,7 @@ from models.appraisal import Appraisal
 from models.appraisal_cycle import AppraisalCycle
 from models.goal import Goal
 from models.user_profile import UserProfile
-from sqlalchemy.orm import joinedload
+from sqlalchemy import or_, select
 from services.workflow import update_appraisal_status, can_transition, APPRAISAL_STATES
 from services.eligibility_engine import check_eligibility
 from services.provisioning import provision_appraisal_templates
@@ -50,6 +50,14 @@ def _is_current_manager(employee_id, user_id):
     return profile.manager_id == user_id
 
 
+def _parse_fields():
+    """Parse the optional `fields=a,b,c` projection query param (None = all fields)."""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    return {f.strip() for f in raw.split(',') if f.strip()}
+
+
 def _fetch_user_details(user_id):
     """Fetch user details from the same DB (direct query, no HTTP)."""
     profile = UserProfile.query.get(user_id)
@@ -64,7 +72,7 @@ def _fetch_goals_for_appraisal(appraisal):
         employee_id=appraisal.employee_id,
         appraisal_cycle_id=appraisal.cycle_id,
     ).all()
-    return [g.to_dict() for g in goals]
+    return Goal.serialize_many(goals)
 
 
 def _check_deadline(cycle, deadline_field, action_name):
@@ -136,6 +144,7 @@ def _ensure_active_appraisal(user_id):
     existing_query = (
         Appraisal.query
         .join(AppraisalCycle, Appraisal.cycle_id == AppraisalCycle.id)
+        .options(*Appraisal.eager_options(cycle_joined=True))
         .filter(
             Appraisal.employee_id == user_id,
             AppraisalCycle.status == 'active',
@@ -266,29 +275,22 @@ def list_appraisals():
     """List appraisals. Scope: mine (default), team (manager), all (HR)."""
     ctx = _get_current_user()
     scope = request.args.get('scope', 'mine')
+    fields = _parse_fields()
 
     query = Appraisal.query.join(
         AppraisalCycle, Appraisal.cycle_id == AppraisalCycle.id
-    ).options(
-        joinedload(Appraisal.cycle),
-        joinedload(Appraisal.employee),
-        joinedload(Appraisal.manager),
-    )
+    ).options(*Appraisal.eager_options(fields=fields, cycle_joined=True))
 
     if scope == 'mine':
         query = query.filter(Appraisal.employee_id == ctx['user_id'])
     elif scope == 'team':
         # SECURITY: Include appraisals where user is either the assigned manager
         # OR the current manager (via UserProfile.manager_id) of the employee.
-        from sqlalchemy import or_
-        current_team_ids = [
-            p.user_id for p in
-            UserProfile.query.filter_by(manager_id=ctx['user_id']).all()
-        ]
+        current_team_ids = select(UserProfile.id).where(UserProfile.manager_id == ctx['user_id'])
         query = query.filter(
             or_(
                 Appraisal.manager_id == ctx['user_id'],
-                Appraisal.employee_id.in_(current_team_ids) if current_team_ids else False,
+                Appraisal.employee_id.in_(current_team_ids),
             )
         )
     elif scope == 'all':
@@ -318,7 +320,7 @@ def list_appraisals():
     )
 
     appraisals = query.all()
-    return jsonify([a.to_dict() for a in appraisals])
+    return jsonify([a.to_dict(fields=fields) for a in appraisals])
 
 
 @appraisals_bp.route('/', methods=['POST'])
@@ -10,7 +10,6 @@ import hashlib
 import logging
 from datetime import datetime, timezone
 
-import bcrypt
 from flask import Blueprint, request, jsonify, current_app, g
 
 from extensions import db, limiter
@@ -19,10 +18,15 @@ from models.user_profile import UserProfile
 from models.department import Department
 from models.team_transfer import TeamTransfer
 from models.refresh_token import RefreshToken
+from services import refresh_token_service
+from services.job_runner import job_runner
+from utils.decorators import require_role
+from utils.password_hasher import HasherBusy, password_hasher
 from utils.jwt_utils import (
     create_access_token,
     create_refresh_token,
     decode_access_token,
+    revoke_token_family,
     verify_refresh_token,
     validate_azure_token,
 )
@@ -149,6 +153,35 @@ def _sync_user_profile(user_auth, profile_data=None):
         return None
 
 
+def _store_user_photo(app, user_id, access_token):
+    """Fetch the user's Graph photo and save it as their avatar."""
+    with app.app_context():
+        photo_url = GraphClient.get_user_photo(access_token)
+        if not photo_url:
+            return
+        try:
+            profile = db.session.get(UserProfile, user_id)
+            if profile and profile.avatar_url != photo_url:
+                profile.avatar_url = photo_url
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error('Photo sync failed for %s: %s', user_id, e)
+
+
+def _defer_photo_sync(user_id, access_token):
+    """Queue the photo fetch on the Graph pool (inline when JOBS_RUN_INLINE).
+
+    Not a job_runner job: that would persist the user's Graph access token
+    in background_jobs.payload.
+    """
+    app = current_app._get_current_object()
+    if app.config.get('JOBS_RUN_INLINE'):
+        _store_user_photo(app, user_id, access_token)
+    else:
+        GraphClient.defer(_store_user_photo, app, user_id, access_token)
+
+
 # ─── POST /api/auth/azure/callback ─────────────────────────────────
 
 @auth_bp.route('/azure/callback', methods=['POST'])
@@ -159,11 +192,12 @@ def azure_callback():
     Flow:
     1. Validate Azure AD id_token
     2. Map Azure AD roles to internal roles
-    3. Fetch Graph API data (profile, manager, direct reports)
+    3. Fetch Graph API data (profile, manager, direct reports) concurrently
     4. Auto-promote employee→manager if they have direct reports
     5. Upsert user in DB with role protection
     6. Sync user profile
     7. Issue application JWT tokens
+    8. Fetch the profile photo in the background
     """
     data = request.get_json(silent=True) or {}
     id_token = data.get('id_token')
@@ -202,11 +236,12 @@ def azure_callback():
     department = None
     display_from_graph = display_name
     manager_info = None
-    direct_reports = []
+    direct_reports = None  # None: unknown (Graph failed or timed out)
     report_count = 0
 
     if access_token:
-        user_graph_info = GraphClient.get_me(access_token)
+        graph = GraphClient.get_login_context(access_token)
+        user_graph_info = graph['me']
         if user_graph_info:
             logger.info('Graph profile: %s, Dept: %s',
                         user_graph_info.get('email'), user_graph_info.get('department'))
@@ -215,13 +250,16 @@ def azure_callback():
         else:
             logger.warning('Failed to fetch user profile from Graph API')
 
-        manager_info = GraphClient.get_user_manager(access_token)
+        manager_info = graph['manager']
         if manager_info:
             logger.info('Manager found: %s', manager_info.get('email'))
 
-        direct_reports = GraphClient.get_direct_reports(access_token)
-        report_count = len(direct_reports) if direct_reports else 0
-        logger.info('Direct reports found: %d', report_count)
+        direct_reports = graph['direct_reports']
+        if direct_reports is None:
+            logger.warning('Direct reports unknown; leaving manager status as is')
+        else:
+            report_count = len(direct_reports)
+            logger.info('Direct reports found: %d', report_count)
     else:
         logger.warning('Skipping Graph API calls due to missing access_token')
 
@@ -259,8 +297,8 @@ def azure_callback():
                 logger.info('Upgraded role for %s to manager', email)
 
             # 2. Downgrade Manager → Employee (lost reports)
-            #    Only if we are SURE via Graph API (access_token present)
-            elif user.role == 'manager' and role == 'employee' and access_token:
+            #    Only if we are SURE via Graph API (it answered the reports lookup)
+            elif user.role == 'manager' and role == 'employee' and direct_reports is not None:
                 user.role = 'employee'
                 logger.info('Downgraded role for %s from manager to employee', email)
 
@@ -292,16 +330,15 @@ def azure_callback():
         profile_data['job_title'] = user_graph_info.get('job_title')
         profile_data['department'] = department
 
-    if access_token:
-        photo_url = GraphClient.get_user_photo(access_token)
-        if photo_url:
-            profile_data['avatar_url'] = photo_url
-
     if manager_info:
         profile_data['manager_azure_oid'] = manager_info.get('azure_oid')
 
     _sync_user_profile(user, profile_data)
 
+    # --- Profile photo: fetched after the response, off the login path ---
+    if access_token:
+        _defer_photo_sync(user.id, access_token)
+
     return jsonify({
         'access_token': app_access_token,
         'refresh_token': raw_refresh,
@@ -310,6 +347,13 @@ def azure_callback():
     })
 
 
+def _busy_response(busy):
+    """503 telling the client when to retry, used when the password hasher sheds load."""
+    response = jsonify({'error': 'Server busy, please retry shortly'})
+    response.headers['Retry-After'] = str(busy.retry_after)
+    return response, 503
+
+
 # ─── POST /api/auth/login ──────────────────────────────────────────
 
 @auth_bp.route('/login', methods=['POST'])
@@ -328,13 +372,24 @@ def login():
     if user.is_locked():
         return jsonify({'error': 'Account temporarily locked due to too many failed attempts. Try again later.'}), 429
 
-    if not bcrypt.checkpw(data['password'].encode(), user.password_hash.encode()):
+    try:
+        password_ok = password_hasher.verify(data['password'], user.password_hash)
+    except HasherBusy as busy:
+        return _busy_response(busy)
+    if not password_ok:
         user.record_failed_login(db.session)
         return jsonify({'error': 'Invalid credentials'}), 401
 
     if not user.is_active:
         return jsonify({'error': 'Account is deactivated'}), 403
 
+    # Re-hash at the current cost if PASSWORD_BCRYPT_ROUNDS changed; best effort
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = password_hasher.hash(data['password'])
+        except HasherBusy:
+            logger.info('Skipped password rehash for %s; hasher busy', user.id)
+
     # Successful login — reset lockout state
     user.reset_failed_logins(db.session)
     user.last_login = datetime.now(timezone.utc)
@@ -394,7 +449,10 @@ def register():
     if UserAuth.query.filter_by(email=email).first():
         return jsonify({'error': 'Email already registered'}), 409
 
-    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    try:
+        password_hash = password_hasher.hash(password)
+    except HasherBusy as busy:
+        return _busy_response(busy)
 
     # SECURITY: Role is always 'employee' — never trust user input for role assignment.
     # Role changes must be done by HR/admin through the user management endpoints.
@@ -446,9 +504,9 @@ def refresh():
     rt.is_revoked = True
     rt.revoked_at = datetime.now(timezone.utc)
 
-    # Issue new tokens
+    # Issue new tokens (same rotation family)
     new_access = create_access_token(user)
-    new_raw_refresh, _ = create_refresh_token(user, db.session)
+    new_raw_refresh, _ = create_refresh_token(user, db.session, family_id=rt.family_id)
 
     return jsonify({
         'access_token': new_access,
@@ -465,13 +523,15 @@ def logout():
     """Revoke refresh tokens."""
     data = request.get_json()
 
-    # Try to revoke specific token
+    # Revoke the token and everything rotated from the same login
     raw_token = data.get('refresh_token') if data else None
     if raw_token:
         rt = verify_refresh_token(raw_token, db.session)
         if rt:
             rt.is_revoked = True
             rt.revoked_at = datetime.now(timezone.utc)
+            if rt.family_id:
+                revoke_token_family(rt.family_id, db.session)
             db.session.commit()
 
     return jsonify({'message': 'Logged out successfully'})
@@ -530,3 +590,43 @@ def get_me():
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 401
+
+
+# ─── Refresh-token housekeeping (admin) ────────────────────────────
+
+@auth_bp.route('/tokens/stats', methods=['GET'])
+@require_role('hr_admin', 'super_admin')
+def refresh_token_stats():
+    """Refresh-token counts and the users holding the most live tokens.
+
+    Query param: limit (default 20, max 100) — how many users to list.
+    """
+    limit = request.args.get('limit', 20, type=int)
+    if limit < 1 or limit > 100:
+        return jsonify({'error': 'limit must be between 1 and 100'}), 400
+    return jsonify(refresh_token_service.token_stats(limit))
+
+
+@auth_bp.route('/tokens/purge', methods=['POST'])
+@require_role('hr_admin', 'super_admin')
+def purge_refresh_tokens():
+    """Delete expired and long-revoked refresh tokens as a background job.
+
+    Body (optional): {"revoked_retention_hours": 24}; defaults to
+    REFRESH_TOKEN_REVOKED_RETENTION_HOURS.
+    """
+    data = request.get_json(silent=True) or {}
+    hours = data.get('revoked_retention_hours', current_app.config['REFRESH_TOKEN_REVOKED_RETENTION_HOURS'])
+    if not isinstance(hours, int) or isinstance(hours, bool) or hours < 0:
+        return jsonify({'error': 'revoked_retention_hours must be a non-negative integer'}), 400
+    job, _ = job_runner.enqueue(
+        'refresh_token_purge', payload={'revoked_retention_hours': hours}, created_by=g.current_user['user_id'],
+    )
+    return jsonify({'message': 'Refresh token purge started', 'job': job.to_dict()}), 202
+
+
+@auth_bp.route('/password-hasher/stats', methods=['GET'])
+@require_role('hr_admin', 'super_admin')
+def password_hasher_stats():
+    """Password hashing pool metrics for this worker: latency, queue wait, shed calls."""
+    return jsonify(password_hasher.stats())
@@ -4,13 +4,12 @@ Migrated from appraisal-service/routes/cycles.py.
 
 Key changes:
 - User fetching for auto-creation uses direct DB query instead of HTTP
-- Notification creation uses direct NotificationService instead of HTTP
+- Appraisal, attribute and notification generation is set-based (services.cycle_activation)
 - Per-type active cycle enforcement (one annual + one probation + one mid_year)
 - Auto-spillover: annual activation creates probation cycle for ineligible users
 """
 import logging
 from datetime import datetime, timezone, date, timedelta
-from dateutil.relativedelta import relativedelta
 
 from flask import Blueprint, request, jsonify, g, current_app
 
@@ -19,8 +18,11 @@ from models.appraisal_cycle import AppraisalCycle
 from models.appraisal_question import AppraisalQuestion
 from models.appraisal import Appraisal
 from models.user_profile import UserProfile
-from services.eligibility_engine import check_eligibility, get_ineligible_users_for_spillover
-from services.notification_service import NotificationService
+from services import reporting_rollups
+from services.cycle_activation import generate_cycle_appraisals
+from services.eligibility_engine import get_ineligible_users_for_spillover
+from services.job_runner import job_runner
+from services.score_simulation import simulate_weights
 from utils.decorators import require_auth, require_role
 
 logger = logging.getLogger(__name__)
@@ -28,105 +30,37 @@ logger = logging.getLogger(__name__)
 cycles_bp = Blueprint('cycles', __name__)
 
 
-def _create_appraisals_for_active_users(cycle_id, criteria=None):
+def _create_appraisals_for_active_users(cycle_id, criteria=None, report_progress=None):
     """Auto-create appraisals for eligible active users.
 
     Direct DB query replaces HTTP call to user-service.
-    Eligibility is determined by the cycle-type-aware eligibility engine.
+    Eligibility is determined by the cycle-type-aware eligibility engine;
+    rows are generated set-based by services.cycle_activation.
+
+    Returns the {'created', 'skipped', 'notified'} counts, or None on failure.
+    `report_progress` is the job runner's callback, when run as a job.
     """
     cycle = AppraisalCycle.query.get(cycle_id)
     if not cycle:
         logger.error('Cycle %s not found', cycle_id)
-        return
+        return None
 
     try:
-        # Build query for active users
-        query = UserProfile.query.filter_by(is_active=True)
-
-        if criteria:
-            dept_id = criteria.get('department_id')
-            if dept_id and dept_id != 'all':
-                query = query.filter(UserProfile.department_id == dept_id)
-            emp_type = criteria.get('employment_type')
-            if emp_type and emp_type != 'all':
-                query = query.filter(UserProfile.employment_type == emp_type)
-
-        users = query.all()
-
-        if not users:
-            logger.info('No active users found for cycle %s', cycle_id)
-            return
-
-        count = 0
-        skipped = 0
-        notified = 0
-
-        for user in users:
-            user_data = user.to_dict()
-
-            # Idempotent: skip if appraisal already exists
-            exists = Appraisal.query.filter_by(
-                cycle_id=cycle_id, employee_id=user.id
-            ).first()
-
-            if not exists:
-                # Check eligibility using the cycle-type-aware engine
-                eligibility = check_eligibility(user_data, cycle)
-
-                if not eligibility['is_eligible']:
-                    logger.debug('Skipping %s: %s', user.email, eligibility['reason'])
-                    skipped += 1
-                    continue
-
-                appraisal_start_date = None
-                appraisal_end_date = None
-                
-                # Dynamic Probation Window Overrides
-                if cycle.cycle_type == 'probation' and user.start_date:
-                    appraisal_start_date = user.start_date
-                    appraisal_end_date = user.start_date + relativedelta(months=3)
-
-                appraisal = Appraisal(
-                    cycle_id=cycle_id,
-                    employee_id=user.id,
-                    manager_id=user.manager_id,
-                    status='not_started',
-                    eligibility_status='eligible',
-                    eligibility_reason=eligibility['reason'],
-                    is_prorated=eligibility['is_prorated'],
-                    start_date=appraisal_start_date,
-                    end_date=appraisal_end_date,
-                )
-                db.session.add(appraisal)
-                db.session.flush()  # ensure appraisal.id is accessible
-                
-                from services.provisioning import provision_appraisal_templates
-                provision_appraisal_templates(appraisal)
-                
-                count += 1
-
-                # Send notification (direct call, no HTTP)
-                NotificationService.create_notification(
-                    recipient_id=user.id,
-                    event='cycle_started',
-                    triggered_by='system',
-                    resource_type='appraisal_cycle',
-                    resource_id=cycle.id,
-                )
-                notified += 1
-
+        counts = generate_cycle_appraisals(cycle, criteria, report_progress=report_progress)
         db.session.commit()
         logger.info(
             'Cycle %s (%s): Created %d appraisals, skipped %d, notified %d',
-            cycle_id, cycle.cycle_type, count, skipped, notified,
+            cycle_id, cycle.cycle_type, counts['created'], counts['skipped'], counts['notified'],
         )
+        return counts
 
     except Exception as e:
         db.session.rollback()
         logger.error('Error creating appraisals for cycle %s: %s', cycle_id, e, exc_info=True)
+        return None
 
 
-def _create_probation_spillover(annual_cycle, criteria=None):
+def _create_probation_spillover(annual_cycle, criteria=None, report_progress=None):
     """Auto-create a probation cycle for users ineligible for the annual cycle.
 
     When HR activates an annual cycle with a cutoff date, employees who
@@ -144,7 +78,7 @@ def _create_probation_spillover(annual_cycle, criteria=None):
         logger.info('Probation spillover already exists for annual cycle %s: %s',
                      annual_cycle.id, existing.id)
         # Re-sync users into the existing spillover
-        _create_appraisals_for_active_users(existing.id, criteria)
+        _create_appraisals_for_active_users(existing.id, criteria, report_progress)
         return existing
 
     # Get users who were deferred from the annual cycle
@@ -181,11 +115,76 @@ def _create_probation_spillover(annual_cycle, criteria=None):
     )
 
     # Create appraisals for the ineligible users in the probation cycle
-    _create_appraisals_for_active_users(probation_cycle.id, criteria)
+    _create_appraisals_for_active_users(probation_cycle.id, criteria, report_progress)
 
     return probation_cycle
 
 
+# ─── Background jobs ─────────────────────────────────────────────────
+# Activation, sync and spillover can touch every active user, so they run on
+# the job runner instead of inside the request. All three are idempotent and
+# safe to resume.
+
+# Generating appraisals for the same cycle twice in parallel would race on
+# the existence checks, so activation and sync share one slot per cycle.
+_GENERATION_SLOT = 'cycle_generation'
+
+
+def _generate_or_raise(cycle_id, criteria, report_progress):
+    counts = _create_appraisals_for_active_users(cycle_id, criteria, report_progress)
+    if counts is None:
+        raise RuntimeError(f'Appraisal generation failed for cycle {cycle_id} — see server logs')
+    return counts
+
+
+@job_runner.handler('cycle_activation', slot=_GENERATION_SLOT)
+def _run_cycle_activation(job, report_progress):
+    criteria = (job.payload or {}).get('criteria')
+    report_progress(5, 'Generating appraisals')
+    result = _generate_or_raise(job.resource_id, criteria, report_progress)
+
+    # Auto-spillover: for annual cycles, create probation cycle for ineligible users
+    cycle = AppraisalCycle.query.get(job.resource_id)
+    if cycle.cycle_type == 'annual' and cycle.eligibility_cutoff_date:
+        report_progress(90, 'Queueing probation spillover')
+        spillover_job, _ = job_runner.enqueue(
+            'probation_spillover', cycle.id, {'criteria': criteria}, created_by=job.created_by,
+        )
+        result['spillover_job_id'] = spillover_job.id
+    return result
+
+
+@job_runner.handler('cycle_sync', slot=_GENERATION_SLOT)
+def _run_cycle_sync(job, report_progress):
+    report_progress(5, 'Syncing eligible users')
+    return _generate_or_raise(job.resource_id, (job.payload or {}).get('criteria'), report_progress)
+
+
+@job_runner.handler('probation_spillover')
+def _run_probation_spillover(job, report_progress):
+    cycle = AppraisalCycle.query.get(job.resource_id)
+    if not cycle:
+        raise RuntimeError(f'Cycle {job.resource_id} not found')
+
+    report_progress(5, 'Creating probation spillover')
+    spillover_cycle = _create_probation_spillover(cycle, (job.payload or {}).get('criteria'), report_progress)
+    return {
+        'spillover_cycle_id': spillover_cycle.id if spillover_cycle else None,
+        'spillover_cycle_name': spillover_cycle.name if spillover_cycle else None,
+    }
+
+
+@job_runner.handler('score_recalculation')
+def _run_score_recalculation(job, report_progress):
+    from services.review_service import ReviewService
+
+    report_progress(5, 'Recalculating scores')
+    outcome = ReviewService.calculate_scores_for_cycle(job.resource_id)
+    if outcome is None:
+        raise RuntimeError(f'Cycle {job.resource_id} not found')
+    return {'created': outcome['created'], 'updated': outcome['updated']}
+
+
 def _parse_date(d):
     if not d:
         return None
@@ -300,6 +299,9 @@ def activate_cycle(id):
 
     For annual cycles: auto-creates a probation spillover cycle for
     employees who joined after the eligibility cutoff date.
+
+    Appraisal generation and spillover run as a background job; the response
+    is 202 with the job to poll at GET /api/jobs/<job_id>.
     """
     cycle = AppraisalCycle.query.get_or_404(id)
     criteria = request.get_json() or {}
@@ -331,24 +333,17 @@ def activate_cycle(id):
         db.session.commit()
         logger.info('Activated %s cycle: %s (%s)', cycle.cycle_type, cycle.name, cycle.id)
 
-    # Create appraisals for eligible users
-    _create_appraisals_for_active_users(cycle.id, criteria)
-
-    # Auto-spillover: for annual cycles, create probation cycle for ineligible users
-    spillover_cycle = None
-    if cycle.cycle_type == 'annual' and cycle.eligibility_cutoff_date:
-        spillover_cycle = _create_probation_spillover(cycle, criteria)
+    # Appraisal generation (and spillover for annual cycles) runs in the background
+    job, _ = job_runner.enqueue(
+        'cycle_activation', cycle.id, {'criteria': criteria},
+        created_by=g.current_user['user_id'],
+    )
 
-    cycle = AppraisalCycle.query.get(id)
-    response = {
-        'message': 'Cycle activated and appraisals generated',
+    return jsonify({
+        'message': 'Cycle activated — appraisals are being generated in the background',
         'cycle': cycle.to_dict(),
-    }
-    if spillover_cycle:
-        response['spillover_cycle'] = spillover_cycle.to_dict()
-        response['message'] += f' — probation spillover cycle also created: "{spillover_cycle.name}"'
-
-    return jsonify(response)
+        'job': job.to_dict(),
+    }), 202
 
 
 @cycles_bp.route('/<id>/sync-users', methods=['POST'])
@@ -367,12 +362,82 @@ def sync_users(id):
 
     # _create_appraisals_for_active_users is idempotent. It will safely skip
     # users who already have an appraisal for this cycle.
-    _create_appraisals_for_active_users(cycle.id, criteria)
+    job, _ = job_runner.enqueue(
+        'cycle_sync', cycle.id, {'criteria': criteria},
+        created_by=g.current_user['user_id'],
+    )
 
     return jsonify({
-        'message': 'Users synced successfully. Appraisals generated for newly eligible employees.',
+        'message': 'User sync started. Appraisals for newly eligible employees are being generated in the background.',
         'cycle': cycle.to_dict(),
-    })
+        'job': job.to_dict(),
+    }), 202
+
+
+@cycles_bp.route('/<id>/recalculate-scores', methods=['POST'])
+@require_role('hr_admin', 'super_admin')
+def recalculate_scores(id):
+    """Recalculate every appraisal score in the cycle (e.g. after a weight change). HR Admin only.
+
+    Runs as a background job; poll GET /api/jobs/<job_id>.
+    """
+    cycle = AppraisalCycle.query.get_or_404(id)
+    job, _ = job_runner.enqueue('score_recalculation', cycle.id, created_by=g.current_user['user_id'])
+    return jsonify({
+        'message': 'Score recalculation started',
+        'cycle': cycle.to_dict(),
+        'job': job.to_dict(),
+    }), 202
+
+
+MAX_SIMULATION_SCENARIOS = 10
+_WEIGHT_FIELDS = ('goals_weight', 'attributes_weight', 'peer_feedback_weight')
+
+
+def _validate_scenario(scenario):
+    """Return an error message for an invalid weight scenario, else None."""
+    if not isinstance(scenario, dict):
+        return 'Each scenario must be an object'
+    for field in _WEIGHT_FIELDS:
+        value = scenario.get(field)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            return f'{field} must be a non-negative integer'
+    for field in ('goals_weight', 'attributes_weight'):
+        # Scoring treats a 0 here as "unset" and falls back to 70 / 30
+        # (normalize_weights), so a simulated 0 would not be what a cycle gets.
+        if scenario[field] == 0:
+            return f'{field} must be at least 1; a cycle with a 0 {field} is scored with the 70/30 default'
+    if sum(scenario[field] for field in _WEIGHT_FIELDS) != 100:
+        return 'goals_weight + attributes_weight + peer_feedback_weight must equal 100'
+    return None
+
+
+@cycles_bp.route('/<id>/weight-simulation', methods=['POST'])
+@require_role('hr_admin', 'super_admin')
+def simulate_cycle_weights(id):
+    """Preview scores under alternative weights without changing anything. HR Admin only.
+
+    Body: {"scenarios": [{"name": "...", "goals_weight": 60, "attributes_weight": 20,
+    "peer_feedback_weight": 20}, ...], "refresh": false, "include_appraisals": false}
+    """
+    cycle = AppraisalCycle.query.get_or_404(id)
+    data = request.get_json(silent=True) or {}
+    scenarios = data.get('scenarios')
+    if not isinstance(scenarios, list) or not scenarios:
+        return jsonify({'error': 'scenarios must be a non-empty list'}), 400
+    if len(scenarios) > MAX_SIMULATION_SCENARIOS:
+        return jsonify({'error': f'At most {MAX_SIMULATION_SCENARIOS} scenarios per request'}), 400
+    for index, scenario in enumerate(scenarios):
+        error = _validate_scenario(scenario)
+        if error:
+            return jsonify({'error': f'Scenario {index + 1}: {error}'}), 400
+
+    return jsonify(simulate_weights(
+        cycle,
+        scenarios,
+        refresh=bool(data.get('refresh')),
+        include_appraisals=bool(data.get('include_appraisals')),
+    ))
 
 
 @cycles_bp.route('/<id>/stop', methods=['POST'])
@@ -482,6 +547,7 @@ def delete_cycle(id):
     try:
         Appraisal.query.filter_by(cycle_id=id).delete()
         AppraisalQuestion.query.filter_by(cycle_id=id).delete()
+        reporting_rollups.drop_cycle(id)
         db.session.delete(cycle)
         db.session.commit()
         return jsonify({'message': 'Cycle deleted successfully'}), 200
@@ -19,13 +19,17 @@ from models.goal_comment import GoalComment
 from models.goal_comment_reaction import GoalCommentReaction
 from models.goal_audit import GoalAudit
 from models.goal_version import GoalVersion
-from models.notification import Notification
 from models.appraisal import Appraisal
 from models.appraisal_cycle import AppraisalCycle
 from models.user_profile import UserProfile
 from services.approval_workflow import ApprovalWorkflow
+from services.event_bus import event_bus, goal_channel
+from services.goal_stats import PROGRESS_STATES, progress_state_clause, summarize_goals
+from services.job_runner import job_runner
 from services.notification_service import NotificationService
+from services.template_assignment import apply_template_push, describe_plan, plan_template_push
 from services.workflow import update_appraisal_status
+from utils import http_cache, sync_cursor
 from utils.decorators import require_auth, require_role
 
 goals_bp = Blueprint('goals', __name__)
@@ -81,22 +85,8 @@ def list_goals():
             query = query.filter(db.not_(db.and_(Goal.goal_type == 'performance', Goal.approval_status == 'draft')))
 
     if status:
-        if status == 'completed':
-            query = query.filter(db.or_(Goal.status == 'completed', Goal.progress_percentage >= 100))
-        elif status == 'in_progress':
-            query = query.filter(
-                db.or_(
-                    Goal.status == 'in_progress',
-                    db.and_(Goal.status == 'active', Goal.progress_percentage > 0, Goal.progress_percentage < 100)
-                )
-            )
-        elif status == 'not_started':
-            query = query.filter(
-                db.or_(
-                    Goal.status == 'not_started',
-                    db.and_(Goal.status == 'active', db.or_(Goal.progress_percentage == 0, Goal.progress_percentage == None))
-                )
-            )
+        if status in PROGRESS_STATES:
+            query = query.filter(progress_state_clause(status))
         else:
             query = query.filter(Goal.status == status)
     if approval_status:
@@ -114,13 +104,79 @@ def list_goals():
     paginated = query.paginate(page=page, per_page=per_page, error_out=False)
 
     return jsonify({
-        'goals': [g.to_dict() for g in paginated.items],
+        'goals': Goal.serialize_many(paginated.items),
         'total': paginated.total,
         'page': paginated.page,
         'per_page': paginated.per_page,
     })
 
 
+APPROVAL_QUEUE_LIMIT = 50
+APPROVAL_QUEUE_MAX_LIMIT = 200
+
+
+@goals_bp.route('/approval-queue', methods=['GET'])
+@require_auth
+def approval_queue():
+    """Goals waiting for the caller's approval, oldest submission first.
+
+    Query: ?after=<cursor> (from next_cursor), ?limit=, ?employee_id=,
+    ?scope=all (HR only: every pending goal instead of direct reports').
+    Rows are lightweight — fetch /api/goals/<id> for the full goal.
+    """
+    ctx = g.current_user
+    limit = min(request.args.get('limit', APPROVAL_QUEUE_LIMIT, type=int) or APPROVAL_QUEUE_LIMIT,
+                APPROVAL_QUEUE_MAX_LIMIT)
+    if request.args.get('scope') == 'all' and ctx['role'] not in ('hr_admin', 'super_admin'):
+        return jsonify({'error': 'Forbidden'}), 403
+
+    # goals ⋈ user_profiles in SQL; served by ix_goals_pending_approval.
+    pending = db.session.query(Goal.id).join(UserProfile, UserProfile.id == Goal.employee_id) \
+        .filter(Goal.approval_status == 'pending_approval')
+    if request.args.get('scope') != 'all':
+        pending = pending.filter(UserProfile.manager_id == ctx['user_id'], UserProfile.is_active == True)
+    if request.args.get('employee_id'):
+        pending = pending.filter(Goal.employee_id == request.args['employee_id'])
+
+    rows_query = pending.with_entities(
+        Goal.id, Goal.title, Goal.goal_type, Goal.appraisal_cycle_id, Goal.employee_id,
+        UserProfile.first_name, UserProfile.last_name, Goal.submitted_at,
+    )
+    try:
+        rows, next_cursor, has_more = sync_cursor.page_after(
+            rows_query, Goal.submitted_at, Goal.id, request.args.get('after'), limit, overlap_seconds=0,
+        )
+    except sync_cursor.InvalidCursor:
+        return jsonify({'error': 'Invalid after cursor'}), 400
+
+    counts = pending.with_entities(
+        Goal.employee_id, UserProfile.first_name, UserProfile.last_name, db.func.count(Goal.id),
+    ).group_by(Goal.employee_id, UserProfile.first_name, UserProfile.last_name) \
+        .order_by(db.func.count(Goal.id).desc(), Goal.employee_id).all()
+
+    return jsonify({
+        'goals': [
+            {
+                'id': row.id,
+                'title': row.title,
+                'goal_type': row.goal_type,
+                'appraisal_cycle_id': row.appraisal_cycle_id,
+                'employee_id': row.employee_id,
+                'employee_name': f'{row.first_name} {row.last_name}',
+                'submitted_at': row.submitted_at.isoformat() if row.submitted_at else None,
+            }
+            for row in rows
+        ],
+        'next_cursor': next_cursor if has_more else None,
+        'has_more': has_more,
+        'pending_by_employee': [
+            {'employee_id': employee_id, 'employee_name': f'{first_name} {last_name}', 'pending': count}
+            for employee_id, first_name, last_name, count in counts
+        ],
+        'total_pending': sum(count for *_, count in counts),
+    })
+
+
 @goals_bp.route('/<id>', methods=['GET'])
 @require_auth
 def get_goal(id):
@@ -408,23 +464,78 @@ def delete_key_result(goal_id, kr_id):
 # Comments
 # ═══════════════════════════════════════════════════════════════════════
 
+COMMENT_SYNC_LIMIT = 200
+
+
+def _publish_comment_event(comment, action):
+    """Push a goal_comment event to /api/stream subscribers once the change commits."""
+    event_bus.publish(goal_channel(comment.goal_id), 'goal_comment', lambda: {
+        'action': action,
+        'goal_id': comment.goal_id,
+        'comment_id': comment.id,
+        'reply_to_id': comment.reply_to_id,
+    })
+
 @goals_bp.route('/<goal_id>/comments', methods=['GET'])
 @require_auth
 def list_comments(goal_id):
-    """List comments for a goal, threaded (top-level with nested replies)."""
-    # Fetch top-level comments only (no reply_to_id)
-    top_level = GoalComment.query.filter_by(goal_id=goal_id, reply_to_id=None) \
-        .order_by(GoalComment.created_at.desc()).all()
-
-    result = []
-    for comment in top_level:
-        c = comment.to_dict()
-        # Attach replies sorted by oldest first
-        replies = GoalComment.query.filter_by(reply_to_id=comment.id) \
-            .order_by(GoalComment.created_at.asc()).all()
-        c['replies'] = [r.to_dict() for r in replies]
-        result.append(c)
-    return jsonify(result)
+    """List comments for a goal, threaded (top-level with nested replies).
+
+    Returns the full thread as a list, with an X-Sync-Cursor header. With
+    ?page= / ?per_page= only that page of top-level comments (newest first) is
+    returned, wrapped with the total. With ?since=<cursor> only comments
+    created or changed after the cursor are returned, flat; deleted comments
+    come back as tombstones. Unchanged polls get a 304 via If-None-Match.
+    """
+    count, last_updated = db.session.query(
+        db.func.count(GoalComment.id), db.func.max(GoalComment.updated_at),
+    ).filter(GoalComment.goal_id == goal_id).one()
+    etag = http_cache.etag_for('goal-comments', goal_id, count, last_updated, sorted(request.args.items()))
+    cached = http_cache.not_modified(etag)
+    if cached:
+        return cached
+
+    since = request.args.get('since')
+    if since:
+        try:
+            changed, cursor, has_more = sync_cursor.page_after(
+                GoalComment.query.filter_by(goal_id=goal_id),
+                GoalComment.updated_at, GoalComment.id, since, COMMENT_SYNC_LIMIT,
+            )
+        except sync_cursor.InvalidCursor:
+            return jsonify({'error': 'Invalid since cursor'}), 400
+        return http_cache.with_etag(jsonify({
+            'comments': GoalComment.serialize_many(c for c in changed if not c.is_deleted),
+            'tombstones': [
+                {
+                    'id': c.id,
+                    'reply_to_id': c.reply_to_id,
+                    'deleted_at': c.updated_at.isoformat() if c.updated_at else None,
+                }
+                for c in changed if c.is_deleted
+            ],
+            'cursor': cursor,
+            'has_more': has_more,
+        }), etag)
+
+    query = GoalComment.query.filter_by(goal_id=goal_id, reply_to_id=None) \
+        .order_by(GoalComment.created_at.desc())
+
+    if 'page' not in request.args and 'per_page' not in request.args:
+        response = jsonify(GoalComment.serialize_threads(query.all()))
+        if last_updated:
+            response.headers['X-Sync-Cursor'] = sync_cursor.checkpoint(last_updated)
+        return http_cache.with_etag(response, etag)
+
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 20, type=int), 100)
+    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+    return http_cache.with_etag(jsonify({
+        'comments': GoalComment.serialize_threads(paginated.items),
+        'total': paginated.total,
+        'page': paginated.page,
+        'per_page': paginated.per_page,
+    }), etag)
 
 
 @goals_bp.route('/<goal_id>/comments', methods=['POST'])
@@ -452,6 +563,7 @@ def add_comment(goal_id):
         reply_to_id=reply_to_id,
     )
     db.session.add(comment)
+    _publish_comment_event(comment, 'created')
     db.session.commit()
     return jsonify(comment.to_dict()), 201
 
@@ -476,6 +588,7 @@ def update_comment(goal_id, comment_id):
 
     comment.content = data['content']
     comment.is_edited = True
+    _publish_comment_event(comment, 'updated')
     db.session.commit()
     return jsonify(comment.to_dict())
 
@@ -494,6 +607,7 @@ def delete_comment(goal_id, comment_id):
 
     comment.is_deleted = True
     comment.content = ''
+    _publish_comment_event(comment, 'deleted')
     db.session.commit()
     return jsonify({'message': 'Comment deleted'})
 
@@ -520,6 +634,10 @@ def toggle_comment_reaction(goal_id, comment_id):
         emoji=emoji
     ).first()
 
+    # Reactions are part of the comment's serialized state; bump it for ?since= sync.
+    comment.updated_at = datetime.now(timezone.utc)
+    _publish_comment_event(comment, 'reactions_changed')
+
     if existing:
         db.session.delete(existing)
         db.session.commit()
@@ -616,23 +734,14 @@ def bulk_submit_goals():
             if cycle_counts[goal.appraisal_cycle_id] < 3 or cycle_counts[goal.appraisal_cycle_id] > 7:
                  return jsonify({'error': f'Team member must have between 3 and 7 performance goals to submit bulk goals.'}), 400
 
-    submitted_count = 0
-    synced_cycles = set()
-    for goal in goals:
-        try:
-            ApprovalWorkflow.submit_for_approval(goal, ctx['user_id'], ctx['role'])
-            submitted_count += 1
-            if goal.appraisal_cycle_id:
-                synced_cycles.add(goal.appraisal_cycle_id)
-        except ValueError as e:
-            logger.warning(f"Failed to submit goal {goal.id}: {e}")
-
-    # Synchronize appraisal statuses for all affected cycles
-    for cycle_id in synced_cycles:
-        # We just need one goal to pass to the sync function (it uses the goal's cycle and employee_id)
-        sample_goal = next((g for g in goals if g.appraisal_cycle_id == cycle_id), None)
-        if sample_goal:
-            _sync_appraisal_status(sample_goal)
+    keys = {goal: (goal.id, _appraisal_key(goal)) for goal in goals}
+    submitted, failed = ApprovalWorkflow.submit_many(goals, ctx['user_id'], ctx['role'])
+    for goal, error in failed:
+        logger.warning(f"Failed to submit goal {keys[goal][0]}: {error}")
+    submitted_count = len(submitted)
+
+    # Synchronize appraisal statuses once per affected (employee, cycle)
+    _sync_appraisal_statuses(keys[goal][1] for goal in submitted)
 
     return jsonify({
         'message': f'Successfully submitted {submitted_count} goals for approval.',
@@ -672,44 +781,213 @@ def reject_goal(id):
         return jsonify({'error': str(e)}), 400
 
 
+MAX_BULK_REVIEW_GOALS = 500
+
+
+@goals_bp.route('/bulk/approve', methods=['POST'])
+@require_auth
+def bulk_approve_goals():
+    """Approve several pending goals at once. Body: { goal_ids: [str], comment: str (optional) }"""
+    data = request.get_json() or {}
+    return _bulk_review(data, lambda goals, ctx: ApprovalWorkflow.approve_many(
+        goals, ctx['user_id'], ctx['role'], comment=data.get('comment', ''),
+    ), 'approved')
+
+
+@goals_bp.route('/bulk/reject', methods=['POST'])
+@require_auth
+def bulk_reject_goals():
+    """Reject several pending goals at once. Body: { goal_ids: [str], reason: str }"""
+    data = request.get_json() or {}
+    if not data.get('reason'):
+        return jsonify({'error': 'Rejection reason is required'}), 400
+    return _bulk_review(data, lambda goals, ctx: ApprovalWorkflow.reject_many(
+        goals, ctx['user_id'], ctx['role'], data['reason'],
+    ), 'rejected')
+
+
+def _bulk_review(data, review, label):
+    """Shared body of the bulk approve/reject endpoints.
+
+    Managers may act on their direct reports' goals, HR on anyone's. Goals
+    that are missing, not permitted or not pending are reported in `failed`
+    and the rest are still processed.
+    """
+    ctx = g.current_user
+    goal_ids = list(dict.fromkeys(data.get('goal_ids') or []))
+    if not goal_ids:
+        return jsonify({'error': 'goal_ids is required and must not be empty'}), 400
+    if len(goal_ids) > MAX_BULK_REVIEW_GOALS:
+        return jsonify({'error': f'At most {MAX_BULK_REVIEW_GOALS} goals per request'}), 400
+
+    goals = {goal.id: goal for goal in Goal.query.filter(Goal.id.in_(goal_ids))}
+    is_hr = ctx['role'] in ('hr_admin', 'super_admin')
+    managers = {} if is_hr else ApprovalWorkflow.manager_ids({goal.employee_id for goal in goals.values()})
+
+    failed = []
+    allowed = []
+    for goal_id in goal_ids:
+        goal = goals.get(goal_id)
+        if goal is None:
+            failed.append({'goal_id': goal_id, 'error': 'Goal not found'})
+        elif not is_hr and managers.get(goal.employee_id) != ctx['user_id']:
+            failed.append({'goal_id': goal_id, 'error': 'Forbidden: not a goal of your direct report'})
+        else:
+            allowed.append(goal)
+
+    keys = {goal: (goal.id, _appraisal_key(goal)) for goal in allowed}
+    done, rejected = review(allowed, ctx) if allowed else ([], [])
+    failed.extend({'goal_id': keys[goal][0], 'error': error} for goal, error in rejected)
+    _sync_appraisal_statuses(keys[goal][1] for goal in done)
+
+    return jsonify({
+        'message': f'{len(done)} goal(s) {label}.',
+        label: len(done),
+        'failed': failed,
+    }), 200
+
+
 def _sync_appraisal_status(goal):
     """Sync appraisal status after a goal approval change.
 
     This replaces the old HTTP POST to appraisal-service.
     """
-    if not goal.appraisal_cycle_id:
-        return
+    _sync_appraisal_statuses([_appraisal_key(goal)])
 
-    appraisal = Appraisal.query.filter_by(
-        employee_id=goal.employee_id,
-        cycle_id=goal.appraisal_cycle_id,
-    ).first()
 
-    if not appraisal:
-        return
+def _appraisal_key(goal):
+    return goal.employee_id, goal.appraisal_cycle_id
 
-    # Get all goals for this appraisal
-    goals = Goal.query.filter_by(
-        employee_id=goal.employee_id,
-        appraisal_cycle_id=goal.appraisal_cycle_id,
-    ).all()
 
-    goals_data = [g.to_dict() for g in goals]
-    update_appraisal_status(appraisal, goals_data)
+def _sync_appraisal_statuses(keys):
+    """Sync the appraisal of each distinct (employee_id, cycle_id) in `keys`, once each.
+
+    Loads the affected appraisals and their goals with one query each.
+    Take the keys before committing: reading them off expired goals
+    afterwards would reload each goal.
+    """
+    pairs = {(employee_id, cycle_id) for employee_id, cycle_id in keys if cycle_id}
+    if not pairs:
+        return
+    employee_ids = {employee_id for employee_id, _ in pairs}
+    cycle_ids = {cycle_id for _, cycle_id in pairs}
+
+    appraisals = {}
+    for appraisal in Appraisal.query.filter(
+        Appraisal.employee_id.in_(employee_ids), Appraisal.cycle_id.in_(cycle_ids),
+    ).order_by(Appraisal.created_at):
+        appraisals.setdefault((appraisal.employee_id, appraisal.cycle_id), appraisal)
+
+    # The state machine only reads goal_type and approval_status.
+    goals_by_pair = {pair: [] for pair in pairs}
+    rows = db.session.query(
+        Goal.employee_id, Goal.appraisal_cycle_id, Goal.goal_type, Goal.approval_status,
+    ).filter(Goal.employee_id.in_(employee_ids), Goal.appraisal_cycle_id.in_(cycle_ids))
+    for row in rows:
+        pair = (row.employee_id, row.appraisal_cycle_id)
+        if pair in goals_by_pair:
+            goals_by_pair[pair].append({'goal_type': row.goal_type, 'approval_status': row.approval_status})
+
+    for pair, goals_data in goals_by_pair.items():
+        if pair in appraisals:
+            update_appraisal_status(appraisals[pair], goals_data)
 
 
 # ═══════════════════════════════════════════════════════════════════════
 # Notifications
 # ═══════════════════════════════════════════════════════════════════════
 
+NOTIFICATION_PAGE_LIMIT = 100
+NOTIFICATION_MAX_LIMIT = 500
+
+
 @goals_bp.route('/notifications', methods=['GET'])
 @require_auth
 def list_notifications():
-    """Get notifications for the current user."""
+    """Get notifications for the current user, newest first (?limit=, default 100).
+
+    With ?since=<cursor> only notifications created or changed (e.g. marked
+    read) after the cursor are returned, oldest first, with the next cursor.
+    Unchanged polls get a 304 via If-None-Match.
+    """
     ctx = g.current_user
+    user_id = ctx['user_id']
     unread_only = request.args.get('unread_only', 'false').lower() == 'true'
-    notifications = NotificationService.get_notifications(ctx['user_id'], unread_only)
-    return jsonify([n.to_dict() for n in notifications])
+    limit = max(1, min(request.args.get('limit', NOTIFICATION_PAGE_LIMIT, type=int), NOTIFICATION_MAX_LIMIT))
+
+    count, last_updated = NotificationService.fingerprint(user_id)
+    etag = http_cache.etag_for('notifications', user_id, count, last_updated, sorted(request.args.items()))
+    cached = http_cache.not_modified(etag)
+    if cached:
+        return cached
+
+    since = request.args.get('since')
+    if since:
+        try:
+            notifications, cursor, has_more = NotificationService.get_changes_since(
+                user_id, since, unread_only=unread_only, limit=limit,
+            )
+        except sync_cursor.InvalidCursor:
+            return jsonify({'error': 'Invalid since cursor'}), 400
+        return http_cache.with_etag(jsonify({
+            'notifications': [n.to_dict() for n in notifications],
+            'cursor': cursor,
+            'has_more': has_more,
+        }), etag)
+
+    notifications = NotificationService.get_notifications(user_id, unread_only, limit=limit)
+    response = jsonify([n.to_dict() for n in notifications])
+    if last_updated:
+        response.headers['X-Sync-Cursor'] = sync_cursor.checkpoint(last_updated)
+    return http_cache.with_etag(response, etag)
+
+
+@goals_bp.route('/notifications/inbox', methods=['GET'])
+@require_auth
+def notification_inbox():
+    """Newest-first page of the current user's notifications.
+
+    ?limit= (default 20, max 100), ?before=<next_cursor from the previous
+    page>, ?unread_only=true. Includes the cached unread count.
+    """
+    ctx = g.current_user
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    unread_only = request.args.get('unread_only', 'false').lower() == 'true'
+    try:
+        notifications, next_cursor = NotificationService.get_inbox(
+            ctx['user_id'], before=request.args.get('before'), limit=limit, unread_only=unread_only,
+        )
+    except sync_cursor.InvalidCursor:
+        return jsonify({'error': 'Invalid before cursor'}), 400
+    return jsonify({
+        'notifications': [n.to_dict() for n in notifications],
+        'next_cursor': next_cursor,
+        'unread_count': NotificationService.unread_count(ctx['user_id']),
+    })
+
+
+@goals_bp.route('/notifications/unread-count', methods=['GET'])
+@require_auth
+def notification_unread_count():
+    """Unread notification count for the badge, from the cached counter."""
+    return jsonify({'unread_count': NotificationService.unread_count(g.current_user['user_id'])})
+
+
+@goals_bp.route('/notifications/archive', methods=['POST'])
+@require_role('hr_admin', 'super_admin')
+def archive_notifications():
+    """Move old read notifications to the archive table as a background job. HR Admin only.
+
+    Body (optional): {"older_than_days": 90}; defaults to NOTIFICATION_RETENTION_DAYS.
+    """
+    data = request.get_json(silent=True) or {}
+    days = data.get('older_than_days', current_app.config['NOTIFICATION_RETENTION_DAYS'])
+    if not isinstance(days, int) or isinstance(days, bool) or days < 1:
+        return jsonify({'error': 'older_than_days must be a positive integer'}), 400
+    job, _ = job_runner.enqueue(
+        'notification_retention', payload={'older_than_days': days}, created_by=g.current_user['user_id'],
+    )
+    return jsonify({'message': 'Notification archival started', 'job': job.to_dict()}), 202
 
 
 @goals_bp.route('/notifications/<id>/read', methods=['POST'])
@@ -725,11 +1003,7 @@ def mark_notification_read(id):
 def mark_all_notifications_read():
     """Mark all notifications as read."""
     ctx = g.current_user
-    Notification.query.filter_by(
-        recipient_id=ctx['user_id'],
-        is_read=False,
-    ).update({'is_read': True})
-    db.session.commit()
+    NotificationService.mark_all_read(ctx['user_id'])
     return jsonify({'message': 'All marked as read'})
 
 
@@ -745,27 +1019,10 @@ def my_goal_stats():
     
     # Do not filter by cycle, to ensure completed cycles are included.
     # Exclude drafts that are performance goals (assigned to employee but hidden)
-    goals = Goal.query.filter(
+    return jsonify(summarize_goals(
         Goal.employee_id == ctx['user_id'],
-        db.not_(db.and_(Goal.goal_type == 'performance', Goal.approval_status == 'draft'))
-    ).all()
-    
-    total = len(goals)
-    completed = sum(1 for g in goals if g.status == 'completed' or g.progress_percentage == 100)
-    in_progress = sum(1 for g in goals if g.status == 'in_progress' or (g.status == 'active' and 0 < (g.progress_percentage or 0) < 100))
-    not_started = sum(1 for g in goals if g.status == 'not_started' or (g.status == 'active' and (g.progress_percentage or 0) == 0))
-    
-    avg_progress = 0
-    if total > 0:
-        avg_progress = sum((g.progress_percentage or 0) for g in goals) / total
-        
-    return jsonify({
-        'total': total,
-        'completed': completed,
-        'in_progress': in_progress,
-        'not_started': not_started,
-        'average_progress': avg_progress
-    })
+        db.not_(db.and_(Goal.goal_type == 'performance', Goal.approval_status == 'draft')),
+    ))
 
 
 @goals_bp.route('/reports/summary', methods=['GET'])
@@ -775,36 +1032,17 @@ def goal_reports_summary():
     ctx = g.current_user
     scope = request.args.get('scope', 'mine')
 
-    if scope == 'mine':
-        query = Goal.query.filter(Goal.employee_id == ctx['user_id'])
-    elif scope == 'team':
-        reports = UserProfile.query.filter_by(manager_id=ctx['user_id'], is_active=True).all()
-        report_ids = [r.id for r in reports]
-        query = Goal.query.filter(Goal.employee_id.in_(report_ids))
+    if scope == 'team':
+        reports = db.session.query(UserProfile.id).filter_by(manager_id=ctx['user_id'], is_active=True)
+        criteria = [Goal.employee_id.in_(reports.scalar_subquery())]
     elif scope == 'all':
         if ctx['role'] not in ('hr_admin', 'super_admin'):
             return jsonify({'error': 'Forbidden'}), 403
-        query = Goal.query
+        criteria = []
     else:
-        query = Goal.query.filter(Goal.employee_id == ctx['user_id'])
-
-    goals = query.all()
-
-    total = len(goals)
-    completed = sum(1 for g in goals if g.status == 'completed' or g.progress_percentage == 100)
-    in_progress = sum(1 for g in goals if g.status == 'in_progress' or (g.status == 'active' and 0 < (g.progress_percentage or 0) < 100))
-    not_started = sum(1 for g in goals if g.status == 'not_started' or (g.status == 'active' and (g.progress_percentage or 0) == 0))
-    
-    result = {
-        'total': total,
-        'completed': completed,
-        'in_progress': in_progress,
-        'not_started': not_started
-    }
-
-    return jsonify(result)
-
+        criteria = [Goal.employee_id == ctx['user_id']]
 
+    return jsonify(summarize_goals(*criteria))
 
 
 @goals_bp.route('/calculate-score/<appraisal_id>', methods=['POST'])
@@ -827,8 +1065,9 @@ def calculate_appraisal_score(appraisal_id):
 def push_templates_to_team():
     """Assign selected goal templates to a team member (or all) as draft goals.
 
-    Body: { template_ids: [str], cycle_id: str, employee_id: str (optional) }
+    Body: { template_ids: [str], cycle_id: str, employee_id: str (optional), dry_run: bool (optional) }
     If employee_id given, assign to that member only. Otherwise, all direct reports.
+    With dry_run, nothing is written and the response includes the would-be diff.
     """
     from models.goal_template import GoalTemplate
     from models.appraisal_cycle import AppraisalCycle
@@ -888,53 +1127,15 @@ def push_templates_to_team():
     start_date = cycle.start_date if cycle else None
     end_date = cycle.end_date if cycle else None
 
-    created = 0
-    updated = 0
-
-    for employee in target_employees:
-        for tmpl in templates:
-            existing = Goal.query.filter_by(
-                employee_id=employee.id,
-                appraisal_cycle_id=cycle_id,
-                title=tmpl.title
-            ).first()
-
-            if existing:
-                # Re-assign: update existing goal to approved
-                existing.description = tmpl.description
-                existing.approval_status = 'approved'
-                existing.department_id = tmpl.department_id
-                updated += 1
-                continue
-
-            goal = Goal(
-                employee_id=employee.id,
-                title=tmpl.title,
-                description=tmpl.description,
-                category=tmpl.category,
-                appraisal_cycle_id=cycle_id,
-                created_by=ctx['user_id'],
-                status='active',
-                goal_type='performance',
-                weight=0,
-                start_date=start_date,
-                target_date=end_date,
-                approval_status='approved',  # Manager-assigned = auto-approved
-                department_id=tmpl.department_id,
-            )
-            db.session.add(goal)
-            created += 1
-
-            # Notify the employee
-            NotificationService.create_notification(
-                recipient_id=employee.id,
-                event='goal_assigned',
-                triggered_by=ctx['user_id'],
-                resource_type='goal',
-                resource_id=None,
-            )
-
-    db.session.commit()
+    plan = plan_template_push(
+        cycle_id, templates, [employee.id for employee in target_employees], ctx['user_id'],
+        start_date=start_date, end_date=end_date,
+    )
+    created, updated = plan.created, plan.updated
+    dry_run = bool(data.get('dry_run'))
+    if not dry_run:
+        apply_template_push(plan, triggered_by=ctx['user_id'])
+        db.session.commit()
 
     member_label = (
         f'{target_employees[0].first_name} {target_employees[0].last_name}'
@@ -946,6 +1147,15 @@ def push_templates_to_team():
     if updated:
         parts.append(f'{updated} updated')
     summary = ' and '.join(parts) if parts else '0'
+    if dry_run:
+        return jsonify({
+            'message': f'{summary} goal(s) would be assigned to {member_label}.',
+            'dry_run': True,
+            'created': created,
+            'updated': updated,
+            'team_size': len(target_employees),
+            'diff': describe_plan(plan),
+        })
     return jsonify({
         'message': f'{summary} goal(s) assigned to {member_label}.',
         'created': created,
@@ -0,0 +1,42 @@
+"""
+Background job routes — status polling and resume for queued admin operations.
+"""
+from flask import Blueprint, jsonify
+
+from models.background_job import BackgroundJob
+from services.job_runner import job_runner
+from utils.decorators import require_role
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+@jobs_bp.route('/<id>', methods=['GET'])
+@require_role('hr_admin', 'super_admin')
+def get_job(id):
+    """Poll a background job's status and progress. HR Admin only."""
+    job = BackgroundJob.query.get_or_404(id)
+    result = job.to_dict()
+    result['is_stale'] = job_runner.is_stale(job)
+    return jsonify(result)
+
+
+@jobs_bp.route('/<id>/resume', methods=['POST'])
+@require_role('hr_admin', 'super_admin')
+def resume_job(id):
+    """Re-run a failed job, or one whose worker stopped responding. HR Admin only.
+
+    Job handlers are idempotent, so resuming picks up where the previous
+    attempt left off without duplicating work.
+    """
+    job = BackgroundJob.query.get_or_404(id)
+    if not job_runner.resume(job):
+        return jsonify({
+            'error': 'JOB_NOT_RESUMABLE',
+            'message': f'Only failed or stalled jobs can be resumed (status: {job.status})',
+            'job': job.to_dict(),
+        }), 409
+
+    return jsonify({
+        'message': 'Job resumed',
+        'job': job.to_dict(),
+    }), 202
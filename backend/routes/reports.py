@@ -1,19 +1,32 @@
 """Reporting routes — analytics and statistics for HR dashboards."""
-from io import BytesIO
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, g, request, jsonify, send_file, stream_with_context
 
-from sqlalchemy import func, case, cast, Float
+from sqlalchemy import func
 
 from extensions import db
-from models.appraisal import Appraisal
 from models.appraisal_cycle import AppraisalCycle
 from models.goal import Goal
-from models.user_profile import UserProfile
-from models.department import Department
+from services import appraisal_export
+from services import reporting_rollups as rollups
+from services.job_runner import job_runner
 from utils.decorators import require_auth, require_role
 
 reports_bp = Blueprint('reports', __name__)
 
+IN_PROGRESS_STATUSES = (
+    'goals_pending_approval', 'goals_approved',
+    'self_assessment_in_progress', 'manager_review',
+    'calibration', 'acknowledgement_pending',
+)
+
+
+def _rollup_json(payload, cycle_ids=None):
+    """jsonify a rollup-backed report, flagging it when any cycle read is stale (served as last built)."""
+    response = jsonify(payload)
+    if rollups.stale_cycle_ids(cycle_ids):
+        response.headers['X-Rollups-Stale'] = 'true'
+    return response
+
 
 @reports_bp.route('/cycle-completion', methods=['GET'])
 @require_role('hr_admin', 'super_admin')
@@ -29,32 +42,26 @@ def cycle_completion():
     if not cycle_id:
         return jsonify({'total': 0, 'completed': 0, 'in_progress': 0, 'not_started': 0, 'completion_rate': 0})
 
-    # Get counts for cycle completion
-    rows = db.session.query(Appraisal.status, func.count(Appraisal.id)) \
-        .filter(Appraisal.cycle_id == cycle_id) \
-        .group_by(Appraisal.status).all()
-
-    counts = {s: c for s, c in rows}
+    rollups.build_missing([cycle_id])
+    counts = rollups.status_counts(cycle_id)
     total = sum(counts.values())
     completed = counts.get('completed', 0)
     not_started = counts.get('not_started', 0)
     in_progress = total - completed - not_started
 
-    # Get average rating for completed appraisals in this cycle
-    avg_rating_query = db.session.query(func.avg(cast(Appraisal.overall_rating, Float))) \
-        .filter(Appraisal.cycle_id == cycle_id, Appraisal.status == 'completed') \
-        .scalar()
+    # Average rating for completed appraisals in this cycle
+    avg_rating_query = rollups.completed_average_rating(cycle_id)
 
     avg_rating = round(float(avg_rating_query), 1) if avg_rating_query else 0.0
 
-    return jsonify({
+    return _rollup_json({
         'total': total,
         'completed': completed,
         'in_progress': in_progress,
         'not_started': not_started,
         'completion_rate': round(completed / total * 100) if total else 0,
         'average_rating': avg_rating
-    })
+    }, [cycle_id])
 
 
 @reports_bp.route('/rating-distribution', methods=['GET'])
@@ -62,17 +69,8 @@ def cycle_completion():
 def rating_distribution():
     """Distribution of overall_rating values for a cycle."""
     cycle_id = request.args.get('cycle_id')
-    query = db.session.query(
-        Appraisal.overall_rating, func.count(Appraisal.id)
-    ).filter(
-        Appraisal.overall_rating.isnot(None),
-        Appraisal.status == 'completed',
-    )
-    if cycle_id:
-        query = query.filter(Appraisal.cycle_id == cycle_id)
-
-    rows = query.group_by(Appraisal.overall_rating) \
-        .order_by(Appraisal.overall_rating).all()
+    rollups.build_missing([cycle_id] if cycle_id else None)
+    rows = sorted(rollups.completed_rating_counts(cycle_id).items())
 
     # Ensure all ratings 1-5 are represented
     dist = {i: 0 for i in range(1, 6)}
@@ -80,7 +78,8 @@ def rating_distribution():
         if rating in dist:
             dist[rating] = count
 
-    return jsonify([{'rating': r, 'count': c} for r, c in sorted(dist.items())])
+    return _rollup_json([{'rating': r, 'count': c} for r, c in sorted(dist.items())],
+                        [cycle_id] if cycle_id else None)
 
 
 @reports_bp.route('/goal-stats', methods=['GET'])
@@ -99,21 +98,8 @@ def department_stats():
     """Average rating and completion rate per department."""
     cycle_id = request.args.get('cycle_id')
 
-    query = db.session.query(
-        Department.name,
-        func.avg(cast(Appraisal.overall_rating, Float)),
-        func.count(Appraisal.id),
-        func.sum(case((Appraisal.status == 'completed', 1), else_=0)),
-    ).join(
-        UserProfile, UserProfile.id == Appraisal.employee_id
-    ).join(
-        Department, Department.id == UserProfile.department_id
-    )
-
-    if cycle_id:
-        query = query.filter(Appraisal.cycle_id == cycle_id)
-
-    rows = query.group_by(Department.name).all()
+    rollups.build_missing([cycle_id] if cycle_id else None)
+    rows = rollups.department_stats(cycle_id)
 
     result = []
     for dept_name, avg_rating, total, completed in rows:
@@ -123,23 +109,23 @@ def department_stats():
             'completion_rate': round(int(completed) / total * 100) if total else 0,
         })
 
-    return jsonify(result)
+    return _rollup_json(result, [cycle_id] if cycle_id else None)
 
 
 @reports_bp.route('/appraisal-trends', methods=['GET'])
 @require_role('hr_admin', 'super_admin')
 def appraisal_trends():
     """Monthly breakdown of appraisal statuses for the current year."""
-    rows = db.session.query(
-        func.date_trunc('month', Appraisal.created_at).label('month'),
-        func.sum(case((Appraisal.status == 'not_started', 1), else_=0)),
-        func.sum(case((Appraisal.status.in_([
-            'goals_pending_approval', 'goals_approved',
-            'self_assessment_in_progress', 'manager_review',
-            'calibration', 'acknowledgement_pending',
-        ]), 1), else_=0)),
-        func.sum(case((Appraisal.status == 'completed', 1), else_=0)),
-    ).group_by('month').order_by('month').all()
+    rollups.build_missing()
+    rows = [
+        (
+            month,
+            counts.get('not_started', 0),
+            sum(counts.get(status, 0) for status in IN_PROGRESS_STATUSES),
+            counts.get('completed', 0),
+        )
+        for month, counts in rollups.monthly_status_counts()
+    ]
 
     month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
                    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
@@ -154,7 +140,7 @@ def appraisal_trends():
                 'completed': int(completed or 0),
             })
 
-    return jsonify(result)
+    return _rollup_json(result)
 
 
 @reports_bp.route('/distribution-compliance', methods=['GET'])
@@ -175,16 +161,8 @@ def distribution_compliance():
         5: float(request.args.get('target_5', 5)),
     }
 
-    query = db.session.query(
-        Appraisal.overall_rating, func.count(Appraisal.id)
-    ).filter(
-        Appraisal.overall_rating.isnot(None),
-        Appraisal.status == 'completed',
-    )
-    if cycle_id:
-        query = query.filter(Appraisal.cycle_id == cycle_id)
-
-    rows = query.group_by(Appraisal.overall_rating).all()
+    rollups.build_missing([cycle_id] if cycle_id else None)
+    rows = rollups.completed_rating_counts(cycle_id).items()
 
     counts = {i: 0 for i in range(1, 6)}
     for rating, count in rows:
@@ -207,94 +185,61 @@ def distribution_compliance():
             'variance_pct': round(actual_pct - target_pct, 1),
         })
 
-    return jsonify({'total': total, 'distribution': result})
+    return _rollup_json({'total': total, 'distribution': result}, [cycle_id] if cycle_id else None)
 
 
-@reports_bp.route('/export/appraisals', methods=['GET'])
+@reports_bp.route('/rollups/refresh', methods=['POST'])
 @require_role('hr_admin', 'super_admin')
-def export_appraisals():
-    """Export all appraisals for a cycle as an Excel (.xlsx) file."""
-    import openpyxl
-    from openpyxl.styles import Font
-    from models.appraisal_review import AppraisalReview
+def refresh_rollups():
+    """Rebuild report rollups as a background job, then check them against live data.
 
-    cycle_id = request.args.get('cycle_id')
-
-    query = db.session.query(
-        Appraisal,
-        UserProfile,
-        AppraisalCycle,
-    ).join(
-        UserProfile, UserProfile.id == Appraisal.employee_id
-    ).join(
-        AppraisalCycle, AppraisalCycle.id == Appraisal.cycle_id
+    Body (optional): {"cycle_id": str, "full": bool}. By default only stale
+    cycles are rebuilt; "full" rebuilds every (or the given) cycle.
+    """
+    data = request.get_json(silent=True) or {}
+    job, _ = job_runner.enqueue(
+        'report_rollup_refresh',
+        resource_id=data.get('cycle_id'),
+        payload={'cycle_id': data.get('cycle_id'), 'full': bool(data.get('full'))},
+        created_by=g.current_user['user_id'],
     )
+    return jsonify({'message': 'Rollup refresh started', 'job': job.to_dict()}), 202
 
-    if cycle_id:
-        query = query.filter(Appraisal.cycle_id == cycle_id)
 
-    rows = query.order_by(Appraisal.created_at.desc()).all()
+@reports_bp.route('/rollups/check', methods=['GET'])
+@require_role('hr_admin', 'super_admin')
+def check_rollups():
+    """Compare fresh rollups with a live aggregate (?cycle_id= to check one cycle)."""
+    cycle_id = request.args.get('cycle_id')
+    result = rollups.check_consistency([cycle_id] if cycle_id else None)
+    return jsonify({**result, 'consistent': not result['mismatched']})
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Appraisals"
 
-    headers = [
-        'Employee Name', 'Employee Email', 'Department',
-        'Cycle Name', 'Cycle Type',
-        'Status', 'Self Submitted', 'Manager Submitted',
-        'Overall Rating', 'Calculated Rating',
-        'Goals Avg', 'Attributes Avg',
-        'Is Dispute', 'Employee Comments',
-        'Acknowledged At', 'Manager Review Submitted At',
-    ]
-    ws.append(headers)
-
-    for cell in ws[1]:
-        cell.font = Font(bold=True)
-
-    review_map = {}
-    for r in AppraisalReview.query.all():
-        review_map[r.appraisal_id] = r
-
-    for appraisal, employee, cycle in rows:
-        review = review_map.get(appraisal.id)
-        emp_name = f'{employee.first_name} {employee.last_name}'.strip() or employee.email
-        dept_name = ''
-        if hasattr(employee, 'department') and employee.department:
-            dept_name = employee.department.name
-        ws.append([
-            emp_name,
-            employee.email,
-            dept_name,
-            cycle.name,
-            cycle.cycle_type,
-            appraisal.status,
-            'Yes' if appraisal.self_submitted else 'No',
-            'Yes' if appraisal.manager_submitted else 'No',
-            review.overall_rating if review else '',
-            review.calculated_rating if review else '',
-            review.goals_avg_rating if review else '',
-            review.attributes_avg_rating if review else '',
-            'Yes' if appraisal.is_dispute else 'No',
-            appraisal.employee_comments or '',
-            appraisal.employee_acknowledgement_date.strftime('%Y-%m-%d') if appraisal.employee_acknowledgement_date else '',
-            appraisal.manager_assessment_submitted_at.strftime('%Y-%m-%d') if appraisal.manager_assessment_submitted_at else '',
-        ])
-
-    for col in ws.columns:
-        max_len = max((len(str(cell.value or '')) for cell in col), default=10)
-        ws.column_dimensions[col[0].column_letter].width = min(max_len + 2, 50)
-
-    out = BytesIO()
-    wb.save(out)
-    out.seek(0)
+@reports_bp.route('/export/appraisals', methods=['GET'])
+@require_role('hr_admin', 'super_admin')
+def export_appraisals():
+    """Export appraisals (optionally for one cycle) as .xlsx, or CSV with ?format=csv.
+
+    Both formats stream rows from a server-side cursor; CSV is sent chunk by
+    chunk as it is generated.
+    """
+    cycle_id = request.args.get('cycle_id')
+    export_format = request.args.get('format', 'xlsx').lower()
+    if export_format not in ('xlsx', 'csv'):
+        return jsonify({'error': "format must be 'xlsx' or 'csv'"}), 400
 
     cycle_suffix = f'_cycle_{cycle_id}' if cycle_id else ''
-    filename = f'appraisals_export{cycle_suffix}.xlsx'
+    filename = f'appraisals_export{cycle_suffix}.{export_format}'
+
+    if export_format == 'csv':
+        return Response(
+            stream_with_context(appraisal_export.iter_csv(cycle_id)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={filename}'},
+        )
 
     return send_file(
-        out,
+        appraisal_export.write_xlsx(cycle_id),
         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
         as_attachment=True,
         download_name=filename,
@@ -0,0 +1,98 @@
+"""
+Event stream route — Server-Sent Events for notifications and goal activity.
+
+Replaces polling: a connected client receives 'notification' events for the
+current user and 'goal_comment' events for any goals passed in ?goals= that
+the user may see (owner, creator, their manager, or HR).
+Browsers open it with EventSource, which can't set an Authorization header:
+they POST /api/stream/token first and pass the result as ?token=.
+The stream starts with a 'ready' event and closes after STREAM_MAX_SECONDS;
+the client reconnects and catches up on anything missed (or after a
+'resync' event) with the ?since= list endpoints.
+"""
+import json
+import time
+
+from flask import Blueprint, Response, current_app, g, jsonify, request
+from sqlalchemy import or_
+
+from extensions import db
+from models.goal import Goal
+from models.user_profile import UserProfile
+from services.event_bus import event_bus, goal_channel, user_channel
+from utils.decorators import require_auth
+from utils.jwt_utils import STREAM_TOKEN_EXPIRY_SECONDS, create_stream_token
+
+stream_bp = Blueprint('stream', __name__)
+
+MAX_GOALS_PER_STREAM = 50
+RECONNECT_MILLISECONDS = 5000
+
+
+def _format_event(event_type, data):
+    return f'event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+def _visible_goal_ids(ctx, goal_ids):
+    """The subset of goal_ids whose comments the caller may follow."""
+    query = db.session.query(Goal.id).filter(Goal.id.in_(goal_ids))
+    if ctx['role'] not in ('hr_admin', 'super_admin'):
+        query = query.outerjoin(UserProfile, UserProfile.id == Goal.employee_id).filter(or_(
+            Goal.employee_id == ctx['user_id'],
+            Goal.created_by == ctx['user_id'],
+            UserProfile.manager_id == ctx['user_id'],
+        ))
+    return {goal_id for goal_id, in query}
+
+
+@stream_bp.route('/token', methods=['POST'])
+@require_auth
+def stream_token():
+    """Issue a short-lived ?token= for opening the stream with EventSource."""
+    return jsonify({
+        'token': create_stream_token(g.current_user['user_id']),
+        'expires_in': STREAM_TOKEN_EXPIRY_SECONDS,
+    })
+
+
+@stream_bp.route('', methods=['GET'])
+@require_auth(allow_stream_token=True)
+def stream():
+    """Open an SSE stream of events for the current user (and ?goals=<id>,<id>)."""
+    user_id = g.current_user['user_id']
+    goal_ids = [goal_id for goal_id in request.args.get('goals', '').split(',') if goal_id]
+    if len(goal_ids) > MAX_GOALS_PER_STREAM:
+        return jsonify({'error': f'At most {MAX_GOALS_PER_STREAM} goals per stream'}), 400
+    if goal_ids and not _visible_goal_ids(g.current_user, goal_ids).issuperset(goal_ids):
+        return jsonify({'error': 'Forbidden'}), 403
+
+    heartbeat = current_app.config.get('STREAM_HEARTBEAT_SECONDS', 15)
+    max_seconds = current_app.config.get('STREAM_MAX_SECONDS', 300)
+    subscription = event_bus.subscribe(
+        [user_channel(user_id)] + [goal_channel(goal_id) for goal_id in goal_ids]
+    )
+
+    # No request/app context inside: the DB session is released as soon as
+    # the view returns, so an open stream does not hold a connection.
+    def generate():
+        with subscription:
+            yield f'retry: {RECONNECT_MILLISECONDS}\n\n'
+            yield _format_event('ready', {'user_id': user_id, 'goals': goal_ids})
+            deadline = time.monotonic() + max_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                item = subscription.get(timeout=min(heartbeat, remaining))
+                if item is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield _format_event(item['event'], item['data'])
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # don't let nginx buffer the stream
+    })
+    # Also unsubscribe if the client goes away before the generator starts.
+    response.call_on_close(subscription.close)
+    return response
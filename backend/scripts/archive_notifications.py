@@ -0,0 +1,30 @@
+"""
+Archive read notifications older than the retention window (cron entry point).
+
+Moves them from notifications to notifications_archive in chunks and
+re-derives the cached unread counters.
+
+Usage:
+    python scripts/archive_notifications.py [older_than_days]   (default: NOTIFICATION_RETENTION_DAYS)
+"""
+import os
+import sys
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services.notification_service import NotificationService
+
+
+def main(argv):
+    app = create_app()
+    with app.app_context():
+        days = int(argv[0]) if argv else app.config['NOTIFICATION_RETENTION_DAYS']
+        result = NotificationService.archive_read_notifications(days)
+        print(f"Archived {result['archived']} notifications older than {days} days; "
+              f"reconciled {result['counters_reconciled']} unread counters")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+"""
+Benchmark scalar vs batch eligibility evaluation.
+
+Compares calling check_eligibility() once per user with
+evaluate_population() over the same synthetic population, and checks that
+both return identical results. No database needed.
+
+Usage:
+    python scripts/benchmark_eligibility.py [population sizes...]   (default: 10000 100000)
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.eligibility_engine import check_eligibility, evaluate_population
+
+
+def _make_population(size, seed=42):
+    rng = random.Random(seed)
+    first_day = date(2015, 1, 1)
+    span = (date(2026, 12, 31) - first_day).days
+    users = []
+    for i in range(size):
+        users.append(SimpleNamespace(
+            id=f'user-{i}',
+            email=f'user-{i}@example.com',
+            start_date=None if i % 500 == 0 else first_day + timedelta(days=rng.randrange(span)),
+            employment_type=rng.choice(('full_time', 'full_time', 'full_time', 'contract', 'probation')),
+        ))
+    return users
+
+
+def _as_user_data(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'start_date': user.start_date.isoformat() if user.start_date else None,
+        'employment_type': user.employment_type,
+    }
+
+
+def _cycle(cycle_type):
+    return SimpleNamespace(
+        cycle_type=cycle_type,
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+        eligibility_cutoff_date=date(2026, 1, 31),
+        minimum_service_months=3,
+        include_probation_employees=True,
+        prorated_evaluation_allowed=True,
+    )
+
+
+def _time(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(sizes):
+    import logging
+    logging.disable(logging.WARNING)  # missing start_date warnings
+
+    print(f"{'cycle':<10} | {'users':>8} | {'scalar (s)':>10} | {'batch (s)':>10} | {'speedup':>8}")
+    print('-' * 60)
+    for cycle_type in ('annual', 'probation'):
+        cycle = _cycle(cycle_type)
+        for size in sizes:
+            users = _make_population(size)
+            # The scalar path is what activation used to do: to_dict() then check.
+            scalar, scalar_s = _time(lambda: [check_eligibility(_as_user_data(u), cycle) for u in users])
+            batch, batch_s = _time(lambda: evaluate_population(cycle, users))
+            if scalar != batch:
+                print(f'MISMATCH for {cycle_type} / {size} users')
+                sys.exit(1)
+            print(f'{cycle_type:<10} | {size:>8} | {scalar_s:>10.3f} | {batch_s:>10.3f} | {scalar_s / batch_s:>7.1f}x')
+
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,61 @@
+"""
+Benchmark refresh-token verification: legacy bcrypt vs rt2 HMAC digests.
+
+Times the CPU cost /api/auth/refresh pays to verify one token:
+  - legacy '<id>:<secret>': bcrypt.checkpw against the row's hash (rounds=10)
+  - legacy scan: the unprefixed fallback, bcrypt-checking every active row
+  - rt2.<secret>: HMAC-SHA256 of the secret, then an indexed equality lookup
+No database needed; the lookup itself is the same primary-key / unique-index
+probe in both indexed cases.
+
+Usage:
+    python scripts/benchmark_refresh_tokens.py [iterations] [active tokens for the scan]   (default: 50 20)
+"""
+import os
+import secrets
+import sys
+import time
+
+import bcrypt
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jwt_utils import refresh_token_digest
+
+
+def _per_second(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed, elapsed / iterations * 1000
+
+
+def run(iterations, scan_size):
+    secret = secrets.token_urlsafe(32)
+    token_hash = bcrypt.hashpw(secret.encode(), bcrypt.gensalt(rounds=10))
+    other_hashes = [bcrypt.hashpw(secrets.token_hex(32).encode(), bcrypt.gensalt(rounds=10))
+                    for _ in range(scan_size - 1)]
+    digests = {refresh_token_digest(secret): 'row'}
+
+    def legacy_scan():
+        for candidate in other_hashes + [token_hash]:
+            if bcrypt.checkpw(secret.encode(), candidate):
+                return candidate
+
+    cases = [
+        ('bcrypt (id:secret)', lambda: bcrypt.checkpw(secret.encode(), token_hash), iterations),
+        (f'bcrypt scan ({scan_size} rows)', legacy_scan, max(1, iterations // scan_size)),
+        ('hmac digest (rt2.)', lambda: digests[refresh_token_digest(secret)], iterations * 1000),
+    ]
+    print(f"{'verification':<24} | {'refreshes/s':>12} | {'ms each':>10}")
+    print('-' * 52)
+    for label, fn, runs in cases:
+        rate, ms = _per_second(fn, runs)
+        print(f'{label:<24} | {rate:>12.0f} | {ms:>10.4f}')
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(args[0] if args else 50, args[1] if len(args) > 1 else 20)
@@ -0,0 +1,72 @@
+"""
+Benchmark per-appraisal vs cycle-wide score recalculation.
+
+Seeds two identical cycles in an in-memory SQLite database, recalculates one
+with ReviewService.calculate_scores() per appraisal and the other with
+ReviewService.calculate_scores_for_cycle(), and checks the stored results
+match. Statement counts are reported alongside wall time.
+
+Usage:
+    python scripts/benchmark_scoring.py [appraisal counts...]   (default: 500 2000)
+"""
+import os
+import sys
+import time
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import create_app
+from extensions import db
+from models.appraisal import Appraisal
+from services.review_service import ReviewService
+from scripts.scoring_fixtures import reviews_by_employee, seed_scoring_cycle
+
+
+def _measure(fn):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    try:
+        fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return elapsed, len(statements)
+
+
+def run(sizes):
+    import logging
+    logging.disable(logging.INFO)
+
+    print(f"{'appraisals':>10} | {'per-appraisal (s)':>17} | {'stmts':>7} | {'cycle (s)':>9} | {'stmts':>5} | {'speedup':>7}")
+    print('-' * 72)
+    for size in sizes:
+        app = create_app('testing')
+        with app.app_context():
+            employees = [f'emp-{i}' for i in range(size)]
+            scalar_cycle = seed_scoring_cycle(employees, goals_weight=60, attributes_weight=20, peer_feedback_weight=20)
+            batch_cycle = seed_scoring_cycle(employees, goals_weight=60, attributes_weight=20, peer_feedback_weight=20)
+            appraisal_ids = [a_id for (a_id,) in db.session.query(Appraisal.id).filter_by(cycle_id=scalar_cycle.id)]
+            db.session.expire_all()
+
+            scalar_s, scalar_n = _measure(lambda: [ReviewService.calculate_scores(a_id) for a_id in appraisal_ids])
+            batch_s, batch_n = _measure(lambda: ReviewService.calculate_scores_for_cycle(batch_cycle.id))
+
+            if reviews_by_employee(scalar_cycle.id) != reviews_by_employee(batch_cycle.id):
+                print(f'MISMATCH at {size} appraisals')
+                sys.exit(1)
+            print(f'{size:>10} | {scalar_s:>17.3f} | {scalar_n:>7} | {batch_s:>9.3f} | {batch_n:>5} | {scalar_s / batch_s:>6.1f}x')
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('JWT_SECRET', 'benchmark-only-secret')
+    run([int(arg) for arg in sys.argv[1:]] or [500, 2000])
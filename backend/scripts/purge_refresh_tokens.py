@@ -0,0 +1,26 @@
+"""
+Delete expired and long-revoked refresh tokens (cron entry point).
+
+Usage:
+    python scripts/purge_refresh_tokens.py [revoked_retention_hours]   (default: REFRESH_TOKEN_REVOKED_RETENTION_HOURS)
+"""
+import os
+import sys
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services.refresh_token_service import purge_refresh_tokens
+
+
+def main(argv):
+    app = create_app()
+    with app.app_context():
+        hours = int(argv[0]) if argv else app.config['REFRESH_TOKEN_REVOKED_RETENTION_HOURS']
+        result = purge_refresh_tokens(hours)
+        print(f"Purged {result['purged']} refresh tokens (revoked tokens kept for {hours}h)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
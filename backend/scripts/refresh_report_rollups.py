@@ -0,0 +1,38 @@
+"""
+Rebuild stale appraisal report rollups and check them against live data (cron entry point).
+
+Usage:
+    python scripts/refresh_report_rollups.py [--full]   (--full rebuilds every cycle)
+
+Exits non-zero if any fresh cycle's rollups disagree with the live aggregate.
+"""
+import os
+import sys
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models.appraisal_cycle import AppraisalCycle
+from services import reporting_rollups
+
+
+def main(argv):
+    app = create_app()
+    with app.app_context():
+        if '--full' in argv:
+            cycle_ids = [cycle_id for (cycle_id,) in db.session.query(AppraisalCycle.id)]
+            for cycle_id in cycle_ids:
+                reporting_rollups.refresh_cycle(cycle_id)
+            refreshed = len(cycle_ids)
+        else:
+            refreshed = reporting_rollups.ensure_fresh()
+        result = reporting_rollups.check_consistency()
+        print(f"Refreshed {refreshed} cycles; checked {len(result['checked'])}, "
+              f"mismatched {len(result['mismatched'])}")
+        return 1 if result['mismatched'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""
+Scoring fixtures — reproducible appraisal cycles with mixed scoring inputs.
+
+Shared by scripts/benchmark_scoring.py and the review service tests. Needs
+an app context; writes to whatever database it is bound to, so only use it
+against a scratch (e.g. in-memory) database.
+"""
+import random
+from datetime import date
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.appraisal_review import AppraisalReview
+from models.attribute_template import AttributeTemplate
+from models.employee_attribute import EmployeeAttribute
+from models.goal import Goal
+from models.manager_review import ManagerReview
+from models.peer_feedback import PeerFeedback
+
+
+def seed_scoring_cycle(employee_ids, seed=7, **weights):
+    """A cycle with a randomised but reproducible mix of scoring inputs per employee."""
+    rng = random.Random(seed)
+    cycle = AppraisalCycle(name='Scoring', start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+                           status='active', **weights)
+    db.session.add(cycle)
+    db.session.flush()
+    templates = [AttributeTemplate(cycle_id=cycle.id, title=f'Attr {i}', created_by='hr') for i in range(3)]
+    db.session.add_all(templates)
+    db.session.flush()
+
+    for n, employee_id in enumerate(employee_ids):
+        appraisal = Appraisal(cycle_id=cycle.id, employee_id=employee_id, status='manager_review')
+        db.session.add(appraisal)
+        db.session.flush()
+        for i in range(rng.randint(0, 4)):
+            goal_type = 'performance' if i < 3 else 'development'
+            goal = Goal(employee_id=employee_id, appraisal_cycle_id=cycle.id, title=f'G{i}', goal_type=goal_type)
+            db.session.add(goal)
+            db.session.flush()
+            if rng.random() < 0.8:
+                db.session.add(ManagerReview(appraisal_id=appraisal.id, goal_id=goal.id,
+                                             manager_rating=rng.choice([None, 1, 2.5, 3, 4, 5])))
+        for template in templates[:rng.randint(0, 3)]:
+            db.session.add(EmployeeAttribute(attribute_template_id=template.id, cycle_id=cycle.id,
+                                             employee_id=employee_id, manager_rating=rng.choice([None, 2, 3.5, 4])))
+        for _ in range(rng.randint(0, 2)):
+            db.session.add(PeerFeedback(appraisal_id=appraisal.id, reviewer_id='peer',
+                                        status=rng.choice(['submitted', 'pending']),
+                                        feedback=rng.choice([None, {'rating': 3}, {'rating': 4.5}, {'text': 'x'}])))
+        if n % 4 == 0:
+            db.session.add(AppraisalReview(appraisal_id=appraisal.id, overall_rating=rng.choice([None, 2.0])))
+    db.session.commit()
+    return cycle
+
+
+def reviews_by_employee(cycle_id):
+    """employee_id -> the stored AppraisalReview scoring fields, for comparing two runs."""
+    rows = db.session.query(AppraisalReview, Appraisal.employee_id) \
+        .join(Appraisal, Appraisal.id == AppraisalReview.appraisal_id) \
+        .filter(Appraisal.cycle_id == cycle_id).all()
+    return {
+        employee_id: (r.goals_avg_rating, r.attributes_avg_rating, r.peer_feedback_avg_rating,
+                      r.calculated_rating, r.overall_rating)
+        for r, employee_id in rows
+    }
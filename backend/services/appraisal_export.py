@@ -0,0 +1,162 @@
+"""
+Appraisal export — streaming XLSX / CSV rows for /api/reports/export/appraisals.
+
+Rows are read through a server-side cursor (yield_per) as plain column
+tuples, so neither the ORM identity map nor the finished sheet is ever held
+in memory:
+  - CSV is yielded in chunks straight into the response.
+  - XLSX uses an openpyxl write-only workbook, which spools rows to a temp
+    file; the finished .xlsx is sent from a temp file as well.
+
+XLSX stores column widths ahead of the cell data, so widths for the
+free-text columns come from one MAX(LENGTH(...)) query over the same filter
+rather than a second pass over the written sheet.
+"""
+import csv
+import tempfile
+from io import StringIO
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.appraisal_review import AppraisalReview
+from models.department import Department
+from models.user_profile import UserProfile
+
+FETCH_SIZE = 1000
+MAX_COLUMN_WIDTH = 50
+
+HEADERS = [
+    'Employee Name', 'Employee Email', 'Department',
+    'Cycle Name', 'Cycle Type',
+    'Status', 'Self Submitted', 'Manager Submitted',
+    'Overall Rating', 'Calculated Rating',
+    'Goals Avg', 'Attributes Avg',
+    'Is Dispute', 'Employee Comments',
+    'Acknowledged At', 'Manager Review Submitted At',
+]
+
+# Widest value of the fixed-format columns: 'Yes'/'No', ratings, YYYY-MM-DD.
+_FIXED_WIDTHS = {6: 3, 7: 3, 8: 4, 9: 18, 10: 18, 11: 18, 12: 3, 14: 10, 15: 10}
+
+
+def _filtered(stmt, cycle_id):
+    stmt = stmt.select_from(Appraisal) \
+        .join(UserProfile, UserProfile.id == Appraisal.employee_id) \
+        .join(AppraisalCycle, AppraisalCycle.id == Appraisal.cycle_id) \
+        .outerjoin(Department, Department.id == UserProfile.department_id)
+    if cycle_id:
+        stmt = stmt.where(Appraisal.cycle_id == cycle_id)
+    return stmt
+
+
+def _row_query(cycle_id):
+    stmt = select(
+        UserProfile.first_name, UserProfile.last_name, UserProfile.email,
+        Department.name,
+        AppraisalCycle.name, AppraisalCycle.cycle_type,
+        Appraisal.status, Appraisal.self_submitted, Appraisal.manager_submitted,
+        AppraisalReview.overall_rating, AppraisalReview.calculated_rating,
+        AppraisalReview.goals_avg_rating, AppraisalReview.attributes_avg_rating,
+        Appraisal.is_dispute, Appraisal.employee_comments,
+        Appraisal.employee_acknowledgement_date, Appraisal.manager_assessment_submitted_at,
+    )
+    # Reviews are joined per row, so only the filtered cycle's reviews are read.
+    stmt = _filtered(stmt, cycle_id).outerjoin(AppraisalReview, AppraisalReview.appraisal_id == Appraisal.id)
+    return stmt.order_by(Appraisal.created_at.desc())
+
+
+def iter_rows(cycle_id=None):
+    """Yield export rows (lists of cell values, in HEADERS order)."""
+    result = db.session.execute(_row_query(cycle_id).execution_options(yield_per=FETCH_SIZE))
+    for (first_name, last_name, email, dept_name, cycle_name, cycle_type,
+         status, self_submitted, manager_submitted,
+         overall, calculated, goals_avg, attributes_avg,
+         is_dispute, comments, acknowledged_at, manager_submitted_at) in result:
+        yield [
+            f'{first_name or ""} {last_name or ""}'.strip() or email,
+            email,
+            dept_name or '',
+            cycle_name,
+            cycle_type,
+            status,
+            'Yes' if self_submitted else 'No',
+            'Yes' if manager_submitted else 'No',
+            overall if overall is not None else '',
+            calculated if calculated is not None else '',
+            goals_avg if goals_avg is not None else '',
+            attributes_avg if attributes_avg is not None else '',
+            'Yes' if is_dispute else 'No',
+            comments or '',
+            acknowledged_at.strftime('%Y-%m-%d') if acknowledged_at else '',
+            manager_submitted_at.strftime('%Y-%m-%d') if manager_submitted_at else '',
+        ]
+
+
+def _longest(column):
+    return func.coalesce(func.max(func.length(column)), 0)
+
+
+def column_widths(cycle_id=None):
+    """Column widths (header or longest value + 2, capped) for the filtered rows."""
+    text_lengths = db.session.execute(_filtered(select(
+        _longest(func.coalesce(UserProfile.first_name, '') + ' ' + func.coalesce(UserProfile.last_name, '')),
+        _longest(UserProfile.email),
+        _longest(Department.name),
+        _longest(AppraisalCycle.name),
+        _longest(AppraisalCycle.cycle_type),
+        _longest(Appraisal.status),
+        _longest(Appraisal.employee_comments),
+    ), cycle_id)).one()
+    name, email, dept, cycle_name, cycle_type, status, comments = text_lengths
+    lengths = {0: max(name, email), 1: email, 2: dept, 3: cycle_name, 4: cycle_type, 5: status, 13: comments}
+    lengths.update(_FIXED_WIDTHS)
+    return [min(max(len(header), lengths[i]) + 2, MAX_COLUMN_WIDTH) for i, header in enumerate(HEADERS)]
+
+
+def iter_csv(cycle_id=None, chunk_rows=FETCH_SIZE):
+    """Yield the CSV export as text chunks of up to chunk_rows rows."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADERS)
+    pending = 0
+    for row in iter_rows(cycle_id):
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def write_xlsx(cycle_id=None):
+    """Write the XLSX export to a temporary file and return it, rewound."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Appraisals')
+    for index, width in enumerate(column_widths(cycle_id), 1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    bold = Font(bold=True)
+    header_cells = []
+    for header in HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = bold
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in iter_rows(cycle_id):
+        ws.append(row)
+
+    out = tempfile.TemporaryFile()
+    wb.save(out)
+    out.seek(0)
+    return out
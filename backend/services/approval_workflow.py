@@ -1,157 +1,186 @@
 """
 Goal Approval Workflow — submit, approve, reject goals.
 Migrated from goal-service/services/approval_workflow.py.
+
+The *_many variants move a batch of goals in one transaction: employee
+managers are looked up with one query, version snapshots, audit rows and
+notifications are bulk-inserted, and the session commits once. The
+single-goal methods are the one-element case.
 """
 from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+
 from extensions import db
-from models.goal import Goal
 from models.goal_audit import GoalAudit
 from models.goal_version import GoalVersion
 from models.user_profile import UserProfile
 from services.notification_service import NotificationService
 
+SUBMITTABLE_STATUSES = ('draft', 'rejected', 'revision_requested')
 
 
 class ApprovalWorkflow:
     @staticmethod
     def submit_for_approval(goal, user_id, user_role):
         """Transition from DRAFT/REJECTED -> PENDING_APPROVAL"""
-        if goal.approval_status not in ['draft', 'rejected', 'revision_requested']:
-            raise ValueError(f"Cannot submit goal in status {goal.approval_status}")
-
-        ApprovalWorkflow._create_version(goal)
-
-        old_status = goal.approval_status
-        goal.approval_status = 'pending_approval'
-        goal.rejected_reason = None
+        return ApprovalWorkflow._single(ApprovalWorkflow.submit_many([goal], user_id, user_role))
 
-        db.session.add(goal)
+    @staticmethod
+    def approve_goal(goal, user_id, user_role, comment=''):
+        """Transition from PENDING_APPROVAL -> APPROVED"""
+        return ApprovalWorkflow._single(ApprovalWorkflow.approve_many([goal], user_id, user_role, comment))
 
-        ApprovalWorkflow._log_audit(goal, old_status, 'pending_approval', user_id, user_role)
+    @staticmethod
+    def reject_goal(goal, user_id, user_role, reason):
+        """Transition from PENDING_APPROVAL -> REJECTED"""
+        return ApprovalWorkflow._single(ApprovalWorkflow.reject_many([goal], user_id, user_role, reason))
 
-        # Notify based on who is doing the submission
-        profile = UserProfile.query.get(goal.employee_id)
-        if user_id == goal.employee_id:
-            # Employee submitting — notify manager
-            if profile and profile.manager_id:
+    @staticmethod
+    def submit_many(goals, user_id, user_role):
+        """Submit goals for approval in one transaction.
+
+        Returns (submitted, failed) where failed is a list of (goal, message)
+        for goals that were not in a submittable status.
+        """
+        def check(goal):
+            if goal.approval_status not in SUBMITTABLE_STATUSES:
+                raise ValueError(f"Cannot submit goal in status {goal.approval_status}")
+
+        submitted_at = datetime.now(timezone.utc)
+
+        def apply(goal, old_status, manager_id):
+            goal.approval_status = 'pending_approval'
+            goal.submitted_at = submitted_at
+            goal.rejected_reason = None
+            # Notify based on who is doing the submission
+            if user_id == goal.employee_id:
+                # Employee submitting — notify manager
                 event = 'goal_resubmitted' if old_status in ['rejected', 'revision_requested'] else 'goal_submitted'
-                NotificationService.create_notification(
-                    recipient_id=profile.manager_id,
-                    event=event,
-                    goal_id=goal.id,
-                    triggered_by=user_id,
-                )
-        else:
+                return manager_id, event
             # Manager/Admin assigning — notify employee
-            NotificationService.create_notification(
-                recipient_id=goal.employee_id,
-                event='goal_assigned_pending',
-                goal_id=goal.id,
-                triggered_by=user_id,
-            )
-
-        db.session.commit()
+            return goal.employee_id, 'goal_assigned_pending'
 
-        return goal
+        return ApprovalWorkflow._apply_many(goals, user_id, user_role, check, apply, snapshot=True)
 
     @staticmethod
-    def approve_goal(goal, user_id, user_role, comment=''):
-        """Transition from PENDING_APPROVAL -> APPROVED"""
-        if goal.approval_status != 'pending_approval':
-            raise ValueError("Goal is not pending approval")
+    def approve_many(goals, user_id, user_role, comment=''):
+        """Approve pending goals in one transaction. Returns (approved, failed)."""
+        approved_date = datetime.now(timezone.utc)
 
-        old_status = goal.approval_status
-        goal.approval_status = 'approved'
-        goal.approved_date = datetime.now(timezone.utc)
-        goal.approved_by = user_id
-        if comment:
-            goal.manager_comment = comment
+        def apply(goal, old_status, manager_id):
+            goal.approval_status = 'approved'
+            goal.approved_date = approved_date
+            goal.approved_by = user_id
+            if comment:
+                goal.manager_comment = comment
+            return ApprovalWorkflow._other_party(goal, user_id, manager_id), 'goal_approved'
 
-        db.session.add(goal)
+        return ApprovalWorkflow._apply_many(goals, user_id, user_role, ApprovalWorkflow._check_pending, apply)
 
-        ApprovalWorkflow._log_audit(goal, old_status, 'approved', user_id, user_role)
+    @staticmethod
+    def reject_many(goals, user_id, user_role, reason):
+        """Reject pending goals in one transaction. Returns (rejected, failed)."""
+        def check(goal):
+            ApprovalWorkflow._check_pending(goal)
+            if not reason:
+                raise ValueError("Rejection reason is required")
 
-        # Notify the other party
-        recipient_id = goal.employee_id
-        if user_id == goal.employee_id:
-            profile = UserProfile.query.get(goal.employee_id)
-            if profile and profile.manager_id:
-                recipient_id = profile.manager_id
+        def apply(goal, old_status, manager_id):
+            goal.approval_status = 'rejected'
+            goal.rejected_reason = reason
+            return ApprovalWorkflow._other_party(goal, user_id, manager_id), 'goal_rejected'
 
-        if recipient_id:
-            NotificationService.create_notification(
-                recipient_id=recipient_id,
-                event='goal_approved',
-                goal_id=goal.id,
-                triggered_by=user_id,
-            )
+        return ApprovalWorkflow._apply_many(goals, user_id, user_role, check, apply)
 
+    @staticmethod
+    def _apply_many(goals, user_id, user_role, check, apply, snapshot=False):
+        """Validate, transition, audit and notify a batch of goals, then commit once.
+
+        `check(goal)` raises ValueError to skip a goal; `apply(goal,
+        old_status, manager_id)` changes it and returns the (recipient_id,
+        event) to notify. Nothing is committed when every goal fails check().
+        """
+        managers = ApprovalWorkflow.manager_ids({goal.employee_id for goal in goals})
+        done, failed = [], []
+        versions, audits, notifications = [], [], []
+        for goal in goals:
+            try:
+                check(goal)
+            except ValueError as e:
+                failed.append((goal, str(e)))
+                continue
+
+            if snapshot:
+                versions.append(ApprovalWorkflow._version_row(goal))
+                goal.version_number += 1
+            old_status = goal.approval_status
+            recipient_id, event = apply(goal, old_status, managers.get(goal.employee_id))
+            db.session.add(goal)
+            audits.append({
+                'goal_id': goal.id,
+                'old_status': old_status,
+                'new_status': goal.approval_status,
+                'changed_by_user_id': user_id,
+                'changed_by_role': user_role,
+                'version_number': goal.version_number,
+            })
+            notifications.append({
+                'recipient_id': recipient_id, 'event': event, 'goal_id': goal.id, 'triggered_by': user_id,
+            })
+            done.append(goal)
+
+        if not done:
+            return done, failed
+        if versions:
+            db.session.execute(insert(GoalVersion.__table__), versions)
+        if audits:
+            db.session.execute(insert(GoalAudit.__table__), audits)
+        NotificationService.create_notifications_many(notifications)
         db.session.commit()
+        return done, failed
 
-        return goal
+    @staticmethod
+    def manager_ids(employee_ids):
+        """{employee_id: manager_id} for the given employees, in one query."""
+        if not employee_ids:
+            return {}
+        return dict(db.session.execute(
+            select(UserProfile.id, UserProfile.manager_id).where(UserProfile.id.in_(list(employee_ids)))
+        ).all())
 
     @staticmethod
-    def reject_goal(goal, user_id, user_role, reason):
-        """Transition from PENDING_APPROVAL -> REJECTED"""
+    def _single(result):
+        # A failed single goal leaves done empty, so _apply_many committed nothing
+        done, failed = result
+        if failed:
+            raise ValueError(failed[0][1])
+        return done[0]
+
+    @staticmethod
+    def _check_pending(goal):
         if goal.approval_status != 'pending_approval':
             raise ValueError("Goal is not pending approval")
 
-        if not reason:
-            raise ValueError("Rejection reason is required")
-
-        old_status = goal.approval_status
-        goal.approval_status = 'rejected'
-        goal.rejected_reason = reason
-
-        db.session.add(goal)
-
-        ApprovalWorkflow._log_audit(goal, old_status, 'rejected', user_id, user_role)
-
-        # Notify the other party
-        recipient_id = goal.employee_id
-        if user_id == goal.employee_id:
-            profile = UserProfile.query.get(goal.employee_id)
-            if profile and profile.manager_id:
-                recipient_id = profile.manager_id
-
-        if recipient_id:
-            NotificationService.create_notification(
-                recipient_id=recipient_id,
-                event='goal_rejected',
-                goal_id=goal.id,
-                triggered_by=user_id,
-            )
-
-        db.session.commit()
-
-        return goal
-
     @staticmethod
-    def _create_version(goal):
-        version = GoalVersion(
-            goal_id=goal.id,
-            version_number=goal.version_number,
-            title=goal.title,
-            description=goal.description,
-            category=goal.category,
-            priority=goal.priority,
-            start_date=goal.start_date,
-            target_date=goal.target_date,
-            approval_status=goal.approval_status,
-            rejected_reason=goal.rejected_reason,
-            created_by=goal.created_by,
-        )
-        db.session.add(version)
-        goal.version_number += 1
+    def _other_party(goal, user_id, manager_id):
+        # The employee acting on their own goal notifies their manager
+        if user_id == goal.employee_id and manager_id:
+            return manager_id
+        return goal.employee_id
 
     @staticmethod
-    def _log_audit(goal, old_status, new_status, user_id, user_role):
-        audit = GoalAudit(
-            goal_id=goal.id,
-            old_status=old_status,
-            new_status=new_status,
-            changed_by_user_id=user_id,
-            changed_by_role=user_role,
-            version_number=goal.version_number,
-        )
-        db.session.add(audit)
+    def _version_row(goal):
+        return {
+            'goal_id': goal.id,
+            'version_number': goal.version_number,
+            'title': goal.title,
+            'description': goal.description,
+            'category': goal.category,
+            'priority': goal.priority,
+            'start_date': goal.start_date,
+            'target_date': goal.target_date,
+            'approval_status': goal.approval_status,
+            'rejected_reason': goal.rejected_reason,
+            'created_by': goal.created_by,
+        }
@@ -0,0 +1,133 @@
+"""
+Cycle activation — set-based appraisal generation for a cycle.
+
+Replaces the per-user loop (existence query + flush + per-template attribute
+lookups + per-notification add) with a fixed number of statements:
+
+  1. load the cycle's existing appraisal employee ids into a set
+  2. load active users as plain column rows (no ORM objects / to_dict)
+  3. evaluate eligibility in memory (eligibility_engine.evaluate_population)
+  4. bulk-insert appraisals, employee attributes and `cycle_started`
+     notifications in chunks
+
+The caller owns the transaction, so the whole activation commits once —
+except under the job runner, whose report_progress callback commits after
+each chunk to keep the job's heartbeat fresh. Generation is idempotent, so
+a run that fails part-way is completed by running it again.
+"""
+import logging
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import insert, select
+
+from extensions import db
+from models.appraisal import Appraisal
+from services.notification_service import NotificationService
+from models.user_profile import UserProfile
+from services.eligibility_engine import evaluate_population
+from services import reporting_rollups
+from services.provisioning import provision_attributes_for_employees
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _active_user_rows(criteria=None):
+    """Active users matching the activation criteria, as lightweight rows."""
+    stmt = select(
+        UserProfile.id,
+        UserProfile.email,
+        UserProfile.manager_id,
+        UserProfile.start_date,
+        UserProfile.employment_type,
+    ).where(UserProfile.is_active.is_(True))
+
+    if criteria:
+        dept_id = criteria.get('department_id')
+        if dept_id and dept_id != 'all':
+            stmt = stmt.where(UserProfile.department_id == dept_id)
+        emp_type = criteria.get('employment_type')
+        if emp_type and emp_type != 'all':
+            stmt = stmt.where(UserProfile.employment_type == emp_type)
+
+    return db.session.execute(stmt).all()
+
+
+def generate_cycle_appraisals(cycle, criteria=None, chunk_size=DEFAULT_CHUNK_SIZE, report_progress=None):
+    """Create appraisals for every eligible active user without one in `cycle`.
+
+    Idempotent: users who already have an appraisal for the cycle are left
+    untouched. Caller handles commit. `report_progress(percent, message)`,
+    if given, is called after eligibility and after every chunk.
+
+    Returns:
+        dict: {'created': int, 'skipped': int, 'notified': int}
+    """
+    counts = {'created': 0, 'skipped': 0, 'notified': 0}
+
+    users = _active_user_rows(criteria)
+    if not users:
+        logger.info('No active users found for cycle %s', cycle.id)
+        return counts
+
+    existing = set(db.session.execute(
+        select(Appraisal.employee_id).where(Appraisal.cycle_id == cycle.id)
+    ).scalars())
+
+    candidates = [user for user in users if user.id not in existing]
+    results = evaluate_population(cycle, candidates)
+    if report_progress:
+        report_progress(10, f'Checked eligibility for {len(candidates)} users')
+
+    appraisal_rows = []
+    for user, eligibility in zip(candidates, results):
+        if not eligibility['is_eligible']:
+            logger.debug('Skipping %s: %s', user.email, eligibility['reason'])
+            counts['skipped'] += 1
+            continue
+
+        appraisal_start_date = None
+        appraisal_end_date = None
+
+        # Dynamic Probation Window Overrides
+        if cycle.cycle_type == 'probation' and user.start_date:
+            appraisal_start_date = user.start_date
+            appraisal_end_date = user.start_date + relativedelta(months=3)
+
+        appraisal_rows.append({
+            'cycle_id': cycle.id,
+            'employee_id': user.id,
+            'manager_id': user.manager_id,
+            'status': 'not_started',
+            'eligibility_status': 'eligible',
+            'eligibility_reason': eligibility['reason'],
+            'is_prorated': eligibility['is_prorated'],
+            'start_date': appraisal_start_date,
+            'end_date': appraisal_end_date,
+        })
+
+    if not appraisal_rows:
+        return counts
+
+    total = len(appraisal_rows)
+    for start in range(0, total, chunk_size):
+        chunk = appraisal_rows[start:start + chunk_size]
+        employee_ids = [row['employee_id'] for row in chunk]
+
+        # Core insert on the table: one executemany per chunk. The ORM bulk
+        # path would split a chunk into sub-batches by which values are NULL.
+        db.session.execute(insert(Appraisal.__table__), chunk)
+        # Core insert: the flush hook does not see it
+        reporting_rollups.add_appraisals(cycle.id, employee_ids, start_tracking=not existing and start == 0)
+        provision_attributes_for_employees(cycle.id, employee_ids, chunk_size=chunk_size)
+        notified = NotificationService.create_notifications_bulk(
+            employee_ids, 'cycle_started', triggered_by='system',
+            resource_type='appraisal_cycle', resource_id=cycle.id, chunk_size=chunk_size,
+        )
+
+        counts['created'] += len(chunk)
+        counts['notified'] += notified['created']
+        if report_progress:
+            report_progress(10 + 80 * counts['created'] // total, f"Created {counts['created']}/{total} appraisals")
+    return counts
@@ -6,10 +6,11 @@ Supports three cycle types:
   - probation: employees who joined AFTER the cutoff (new joiners)
   - mid_year:  employees who transferred teams during the cycle period
 """
+import calendar
 from datetime import date
 import datetime
-from dateutil.relativedelta import relativedelta
 import logging
+from typing import NamedTuple, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -48,78 +49,91 @@ def _check_annual_eligibility(user_data, cycle):
     If start_date is not set, the user is included by default — we cannot
     penalise employees for missing profile data.
     """
+    ctx = _CycleContext(cycle)
     start_date_raw = user_data.get('start_date')
 
     if not start_date_raw:
-        # No start_date → cannot apply date-based rules, default to eligible.
-        logger.warning(
-            'User %s has no start_date — defaulting to eligible for annual cycle',
-            user_data.get('email', user_data.get('id')),
+        return _missing_start_date_result(ctx, user_data.get('email', user_data.get('id')))
+
+    return _annual_for_join_date(
+        ctx, _parse_date(start_date_raw), user_data.get('employment_type'),
+        who=user_data.get('email', user_data.get('id')),
+    )
+
+
+def _annual_for_join_date(ctx, join_date, employment_type, who=None):
+    dates = _annual_date_rules(ctx, join_date)
+    if dates.after_cutoff and who is not None:
+        logger.info(
+            'User %s joined %s, after cutoff %s → not eligible for annual',
+            who, join_date, ctx.cutoff_date,
         )
-        return _result(True, 'eligible', 'No start_date on record — included by default')
+    if dates.result is not None:
+        return dates.result
+    return _annual_employment_rules(ctx, employment_type, dates.is_prorated)
+
+
+class _AnnualDateOutcome(NamedTuple):
+    """The annual rules that depend only on the join date.
+
+    result is None when they all pass and employment type decides.
+    after_cutoff is True when the eligibility cutoff deferred the user.
+    """
+    result: Optional[dict]
+    is_prorated: bool = False
+    after_cutoff: bool = False
+
 
-    join_date = _parse_date(start_date_raw)
-    today = date.today()
-    probation_end_date = join_date + relativedelta(months=3)
-    
-    # Use cycle start year, falling back to current year
-    cycle_year = cycle.start_date.year if cycle.start_date else today.year
+def _annual_date_rules(ctx, join_date):
+    probation_end_date = _add_months(join_date, 3)
 
     # 1. Mandatory 3-month Probation check (regardless of year)
-    if today < probation_end_date:
-        return _result(
+    if ctx.today < probation_end_date:
+        return _AnnualDateOutcome(_result(
             False, 'deferred_to_probation',
             f'Still in mandatory 3-month probation (ends {probation_end_date})'
-        )
+        ))
 
     # 2. Seasonal Logic: Do they have enough time left in the cycle after probation?
-    if cycle.end_date and probation_end_date >= cycle.end_date:
-        return _result(
+    if ctx.end_date and probation_end_date >= ctx.end_date:
+        return _AnnualDateOutcome(_result(
             False, 'deferred_to_probation',
-            f'Probation ({probation_end_date}) ends too close to or after cycle end ({cycle.end_date})'
-        )
+            f'Probation ({probation_end_date}) ends too close to or after cycle end ({ctx.end_date})'
+        ))
 
     # 3. Eligibility Cutoff - Only applies if they were hired *before* the cycle started
     # For new joiners (hired mid-cycle), they bypass this cutoff if they completed probation (handled above)
-    if cycle.start_date and join_date < cycle.start_date:
-        if cycle.eligibility_cutoff_date and join_date > cycle.eligibility_cutoff_date:
-            logger.info(
-                'User %s joined %s, after cutoff %s → not eligible for annual',
-                user_data.get('email', user_data.get('id')),
-                join_date, cycle.eligibility_cutoff_date,
-            )
-            return _result(
+    if ctx.start_date and join_date < ctx.start_date:
+        if ctx.cutoff_date and join_date > ctx.cutoff_date:
+            return _AnnualDateOutcome(_result(
                 False, 'deferred_to_probation',
-                f'Joined {join_date} after annual cutoff ({cycle.eligibility_cutoff_date})',
-            )
+                f'Joined {join_date} after annual cutoff ({ctx.cutoff_date})',
+            ), after_cutoff=True)
 
 
     # Minimum Service
-    if cycle.end_date:
-        diff = relativedelta(cycle.end_date, join_date)
-        service_months = diff.years * 12 + diff.months
-        min_months = getattr(cycle, 'minimum_service_months', 0) or 0
-        if service_months < min_months:
-            return _result(
+    if ctx.end_date:
+        service_months = _months_between(ctx.end_date, join_date)
+        if service_months < ctx.minimum_service_months:
+            return _AnnualDateOutcome(_result(
                 False, 'not_eligible_min_service',
-                f'Service {service_months}m < Minimum {min_months}m',
-            )
+                f'Service {service_months}m < Minimum {ctx.minimum_service_months}m',
+            ))
+
+    return _AnnualDateOutcome(None, is_prorated=bool(ctx.start_date and join_date > ctx.start_date))
 
+
+def _annual_employment_rules(ctx, employment_type, is_prorated):
     # Probation exclusion
-    include_probation = getattr(cycle, 'include_probation_employees', True)
-    if user_data.get('employment_type') == 'probation' and not include_probation:
+    if employment_type == 'probation' and not ctx.include_probation_employees:
         return _result(False, 'not_eligible_probation', 'Probation employees excluded')
 
     # Proration
-    is_prorated = False
-    if cycle.start_date and join_date > cycle.start_date:
-        is_prorated = True
-        prorated_allowed = getattr(cycle, 'prorated_evaluation_allowed', True)
-        if not prorated_allowed:
-            return _result(
-                False, 'not_eligible_prorata_disabled',
-                'Joined after start date and proration disabled',
-            )
+    if is_prorated and not ctx.prorated_evaluation_allowed:
+        return _result(
+            False, 'not_eligible_prorata_disabled',
+            'Joined after start date and proration disabled',
+        )
 
     return _result(True, 'eligible', 'Criteria met', is_prorated)
 
@@ -132,80 +146,117 @@ def _check_probation_eligibility(user_data, cycle):
 
     If start_date is missing, include if no cutoff is set.
     """
+    ctx = _CycleContext(cycle)
     start_date_raw = user_data.get('start_date')
 
     if not start_date_raw:
-        if not cycle.eligibility_cutoff_date:
-            return _result(True, 'eligible', 'No start_date — included by default (no cutoff)')
-        return _result(False, 'deferred', 'Missing start_date, cannot verify probation eligibility')
+        return _missing_start_date_result(ctx, user_data.get('email', user_data.get('id')))
+
+    return _probation_for_join_date(ctx, _parse_date(start_date_raw))
 
-    join_date = _parse_date(start_date_raw)
 
+def _probation_for_join_date(ctx, join_date):
     # For probation cycles, we catch those deferred from annual
-    today = date.today()
-    probation_end_date = join_date + relativedelta(months=3)
-    cycle_year = cycle.start_date.year if cycle.start_date else today.year
+    probation_end_date = _add_months(join_date, 3)
 
     # 1. Check if they are in their first 3 months
-    if today < probation_end_date:
+    if ctx.today < probation_end_date:
         return _result(True, 'eligible', f'New joiner — in mandatory 3-month probation (ends {probation_end_date})')
 
     # 2. Seasonal Logic: Does their probation end too close to or after the cycle end?
-    if cycle.end_date and probation_end_date >= cycle.end_date:
-        return _result(True, 'eligible', f'Probation ({probation_end_date}) ends too close to or after cycle end ({cycle.end_date})')
+    if ctx.end_date and probation_end_date >= ctx.end_date:
+        return _result(True, 'eligible', f'Probation ({probation_end_date}) ends too close to or after cycle end ({ctx.end_date})')
 
     # 3. Fallback to standard cutoff logic - only applies if hired before cycle started
-    if cycle.start_date and join_date < cycle.start_date:
-        if cycle.eligibility_cutoff_date:
-            if join_date <= cycle.eligibility_cutoff_date:
+    if ctx.start_date and join_date < ctx.start_date:
+        if ctx.cutoff_date:
+            if join_date <= ctx.cutoff_date:
                 return _result(
                     False, 'not_eligible_for_probation',
-                    f'Joined {join_date} on/before cutoff ({cycle.eligibility_cutoff_date}) — eligible for annual instead',
+                    f'Joined {join_date} on/before cutoff ({ctx.cutoff_date}) — eligible for annual instead',
                 )
 
 
     # Must have started by cycle end date to be eligible
-    if cycle.end_date and join_date > cycle.end_date:
+    if ctx.end_date and join_date > ctx.end_date:
         return _result(
             False, 'not_eligible_not_yet_joined',
-            f'Join date {join_date} is after cycle end ({cycle.end_date})',
+            f'Join date {join_date} is after cycle end ({ctx.end_date})',
         )
 
     # 4. Safety net: If the employee completed probation well before this cycle started,
     #    they belong in the annual cycle, not the probation cycle.
-    if cycle.start_date and probation_end_date < cycle.start_date:
+    if ctx.start_date and probation_end_date < ctx.start_date:
         return _result(
             False, 'not_eligible_for_probation',
-            f'Completed probation ({probation_end_date}) before cycle start ({cycle.start_date}) — belongs in annual cycle',
+            f'Completed probation ({probation_end_date}) before cycle start ({ctx.start_date}) — belongs in annual cycle',
         )
 
     return _result(True, 'eligible', 'New joiner — probation cycle')
 
 
+def _missing_start_date_result(ctx, who):
+    """Outcome for a user with no start_date (date-based rules can't apply)."""
+    if ctx.cycle_type == 'probation':
+        if not ctx.cutoff_date:
+            return _result(True, 'eligible', 'No start_date — included by default (no cutoff)')
+        return _result(False, 'deferred', 'Missing start_date, cannot verify probation eligibility')
+
+    # No start_date → cannot apply date-based rules, default to eligible.
+    logger.warning(
+        'User %s has no start_date — defaulting to eligible for annual cycle', who,
+    )
+    return _result(True, 'eligible', 'No start_date on record — included by default')
+
+
 def _check_mid_year_eligibility(user_data, cycle):
     """Mid-year cycle: eligible if employee transferred teams during the cycle period.
 
     Checks the team_transfers table for transfers between cycle start and end dates.
     """
-    from models.team_transfer import TeamTransfer
-
     user_id = user_data.get('id')
     if not user_id:
         return _result(False, 'deferred', 'Missing user ID')
 
-    start = cycle.start_date
-    end = cycle.end_date or date.today()
+    # Query for transfers during the cycle period (earliest first)
+    transfer = _transfer_window_query(_CycleContext(cycle)).filter_by(user_id=user_id).first()
+    return _mid_year_result(transfer)
 
-    # Query for transfers during the cycle period
-    transfer_query = TeamTransfer.query.filter(
-        TeamTransfer.user_id == user_id,
-    )
+
+def _transfer_window_query(ctx):
+    from models.team_transfer import TeamTransfer
+
+    start = ctx.start_date
+    end = ctx.end_date or ctx.today
+
+    query = TeamTransfer.query.filter(TeamTransfer.transfer_date <= end)
     if start:
-        transfer_query = transfer_query.filter(TeamTransfer.transfer_date >= start)
-    transfer_query = transfer_query.filter(TeamTransfer.transfer_date <= end)
+        query = query.filter(TeamTransfer.transfer_date >= start)
+    return query.order_by(TeamTransfer.transfer_date, TeamTransfer.created_at)
 
-    transfer = transfer_query.first()
 
+def load_transfer_index(cycle):
+    """Load every team transfer in the cycle window with a single query.
+
+    Returns:
+        dict: user_id -> list of (user_id, transfer_date, from_department_id,
+        to_department_id) rows, sorted by transfer_date.
+    """
+    from models.team_transfer import TeamTransfer
+
+    query = _transfer_window_query(_CycleContext(cycle)).with_entities(
+        TeamTransfer.user_id,
+        TeamTransfer.transfer_date,
+        TeamTransfer.from_department_id,
+        TeamTransfer.to_department_id,
+    )
+    index = {}
+    for row in query:
+        index.setdefault(row.user_id, []).append(row)
+    return index
+
+
+def _mid_year_result(transfer):
     if not transfer:
         return _result(
             False, 'not_eligible_no_transfer',
@@ -230,12 +281,117 @@ def get_ineligible_users_for_spillover(cycle, users):
     Returns:
         list of UserProfile: users who should go to probation.
     """
-    ineligible = []
+    results = evaluate_population(cycle, users)
+    return [
+        user for user, result in zip(users, results)
+        if not result['is_eligible'] and result['status'] == 'deferred_to_probation'
+    ]
+
+
+# ── Batch evaluation ─────────────────────────────────────────────────
+
+def evaluate_population(cycle, users, transfer_index=None):
+    """Evaluate check_eligibility() for a whole population in one pass.
+
+    Cycle fields and today's date are resolved once. The date rules
+    (probation end, season, cutoff, minimum service) run once per distinct
+    start_date, and only employment type is checked per user on top of
+    them. An org of N people typically has far fewer start dates than N.
+
+    Args:
+        cycle (AppraisalCycle): The cycle to evaluate against.
+        users (iterable): UserProfile instances, result rows or dicts exposing
+            id, email, start_date and employment_type. No relationships are
+            touched.
+        transfer_index (dict, optional): Mid-year cycles only — a prebuilt
+            load_transfer_index(cycle). Loaded with one query when omitted.
+
+    Returns:
+        list of dict: one check_eligibility()-shaped result per user, in input order.
+    """
+    ctx = _CycleContext(cycle)
+
+    if ctx.cycle_type == 'mid_year':
+        if transfer_index is None:
+            transfer_index = load_transfer_index(cycle)
+        results = []
+        for user in users:
+            user_id = _user_field(user, 'id')
+            if not user_id:
+                results.append(_result(False, 'deferred', 'Missing user ID'))
+                continue
+            transfers = transfer_index.get(user_id)
+            results.append(_mid_year_result(transfers[0] if transfers else None))
+        return results
+
+    probation = ctx.cycle_type == 'probation'
+    by_date = {}   # start_date -> probation outcome, or annual date-rule outcome
+    outcomes = {}  # (start_date, employment_type) -> annual outcome
+    after_cutoff = 0
+    results = []
     for user in users:
-        result = check_eligibility(user.to_dict(), cycle)
-        if not result['is_eligible'] and result['status'] == 'deferred_to_probation':
-            ineligible.append(user)
-    return ineligible
+        start_date = _user_field(user, 'start_date')
+        if not start_date:
+            who = _user_field(user, 'email') or _user_field(user, 'id')
+            results.append(_missing_start_date_result(ctx, who))
+            continue
+
+        dated = by_date.get(start_date)
+        if dated is None:
+            join_date = _parse_date(start_date)
+            dated = by_date[start_date] = (
+                _probation_for_join_date(ctx, join_date) if probation else _annual_date_rules(ctx, join_date)
+            )
+        if probation:
+            results.append(dict(dated))
+            continue
+
+        if dated.after_cutoff:
+            after_cutoff += 1
+        if dated.result is not None:
+            results.append(dict(dated.result))
+            continue
+        key = (start_date, _user_field(user, 'employment_type'))
+        outcome = outcomes.get(key)
+        if outcome is None:
+            outcome = outcomes[key] = _annual_employment_rules(ctx, key[1], dated.is_prorated)
+        results.append(dict(outcome))
+
+    if after_cutoff:
+        # One line per batch in place of the scalar path's line per user
+        logger.info('%d users joined after cutoff %s → not eligible for annual', after_cutoff, ctx.cutoff_date)
+    logger.debug(
+        'Evaluated %d users against %s cycle using %d distinct start dates',
+        len(results), ctx.cycle_type, len(by_date),
+    )
+    return results
+
+
+class _CycleContext:
+    """Cycle configuration and today's date, resolved once per evaluation."""
+
+    __slots__ = (
+        'cycle_type', 'start_date', 'end_date', 'cutoff_date', 'minimum_service_months',
+        'include_probation_employees', 'prorated_evaluation_allowed', 'today',
+    )
+
+    def __init__(self, cycle):
+        cycle_type = getattr(cycle, 'cycle_type', 'annual')
+        # Unknown types follow annual rules (see check_eligibility)
+        self.cycle_type = cycle_type if cycle_type in ('probation', 'mid_year') else 'annual'
+        self.start_date = cycle.start_date
+        self.end_date = cycle.end_date
+        self.cutoff_date = getattr(cycle, 'eligibility_cutoff_date', None)
+        self.minimum_service_months = getattr(cycle, 'minimum_service_months', 0) or 0
+        self.include_probation_employees = getattr(cycle, 'include_probation_employees', True)
+        self.prorated_evaluation_allowed = getattr(cycle, 'prorated_evaluation_allowed', True)
+        self.today = date.today()
+
+
+def _user_field(user, name):
+    if isinstance(user, dict):
+        return user.get(name)
+    return getattr(user, name, None)
 
 
 # ── Helpers ──────────────────────────────────────────────────────────
@@ -250,6 +406,25 @@ def _parse_date(d):
     return d
 
 
+def _add_months(d, months):
+    """d + relativedelta(months=months): the day is clamped to the target month's length."""
+    index = d.month - 1 + months
+    year, month = d.year + index // 12, index % 12 + 1
+    return d.replace(year=year, month=month, day=min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def _months_between(later, earlier):
+    """Whole months from earlier to later, as relativedelta(later, earlier) counts them."""
+    months = (later.year - earlier.year) * 12 + later.month - earlier.month
+    if later >= earlier:
+        while later < _add_months(earlier, months):
+            months -= 1
+    else:
+        while later > _add_months(earlier, months):
+            months += 1
+    return months
+
+
 def _result(is_eligible, status, reason, is_prorated=False):
     return {
         'is_eligible': is_eligible,
@@ -0,0 +1,240 @@
+"""
+Event bus — pushes notification and goal activity events to /api/stream.
+
+Producers call event_bus.publish() inside their normal unit of work. Events
+are held on the session and only go out when the transaction commits, so
+subscribers never see an event for a row that was rolled back. Subscribers
+(one per open SSE connection) receive events for the channels they asked
+for: 'user:<id>' for their own notifications, 'goal:<id>' for goal comment
+activity.
+
+Backends (EVENT_BUS_BACKEND):
+  - 'local':    in-process fan-out. Fine for tests and single-worker runs, but
+                a subscriber only sees events published by its own worker.
+  - 'postgres': events are sent with pg_notify() as part of the committing
+                transaction; every worker runs a LISTEN thread that fans them
+                out to its local subscribers.
+  - 'auto':     'postgres' when the database is Postgres, else 'local'.
+
+Delivery is best effort. A subscriber that falls behind by more than
+EVENT_BUS_QUEUE_SIZE events is told to resync (clients then catch up with the
+?since= endpoints) instead of blocking producers.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = 'app_events'
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+PG_MAX_PAYLOAD = 7900
+DEFAULT_QUEUE_SIZE = 100
+PG_NOTIFY_BATCH = 500
+_PG_NOTIFY_MANY = text('SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload')
+
+_PENDING_KEY = 'event_bus_pending'
+_READY_KEY = 'event_bus_ready'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def goal_channel(goal_id):
+    return f'goal:{goal_id}'
+
+
+class Subscription:
+    """A bounded queue of events for one consumer. Use as a context manager."""
+
+    RESYNC = {'event': 'resync', 'data': {}}
+
+    def __init__(self, bus, channels, maxsize):
+        self.channels = tuple(channels)
+        self._bus = bus
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lagged = False
+
+    def _offer(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._lagged = True
+
+    def get(self, timeout=None):
+        """Next event dict ({'event', 'data'}), or None if nothing arrived in time.
+
+        After an overflow the backlog is dropped and a single 'resync' event
+        is returned instead.
+        """
+        if self._lagged:
+            self._lagged = False
+            with self._queue.mutex:
+                self._queue.queue.clear()
+            return self.RESYNC
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBus:
+    def __init__(self):
+        self.backend = 'local'
+        self.queue_size = DEFAULT_QUEUE_SIZE
+        self._app = None
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def init_app(self, app, session):
+        """Read the backend from config and hook publishing into session commits."""
+        from extensions import db
+
+        self._app = app
+        self.queue_size = app.config.get('EVENT_BUS_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)
+        backend = app.config.get('EVENT_BUS_BACKEND', 'auto')
+        if backend == 'auto':
+            with app.app_context():
+                backend = 'postgres' if db.engine.dialect.name == 'postgresql' else 'local'
+        self.backend = backend
+
+        if not event.contains(session, 'before_commit', _prepare_events):
+            event.listen(session, 'before_commit', _prepare_events)
+            event.listen(session, 'after_commit', _deliver_events)
+            event.listen(session, 'after_soft_rollback', _discard_events)
+
+    # ── Producers ────────────────────────────────────────────────────
+
+    def publish(self, channel, event_type, data):
+        """Queue an event for delivery when the current transaction commits.
+
+        `data` may be a dict or a zero-argument callable returning one; a
+        callable is evaluated after the session's final flush, so it can read
+        ids and defaults of rows added in the same transaction.
+        """
+        from extensions import db
+
+        db.session.info.setdefault(_PENDING_KEY, []).append((channel, event_type, data))
+
+    # ── Consumers ────────────────────────────────────────────────────
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        if self.backend == 'postgres':
+            self._ensure_listener()
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def dispatch(self, channel, event_type, data):
+        """Hand an already-committed event to this process's subscribers."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        item = {'event': event_type, 'data': data}
+        for subscription in subscribers:
+            subscription._offer(item)
+
+    # ── Postgres LISTEN/NOTIFY ───────────────────────────────────────
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen_forever, name='event-bus-listener', daemon=True)
+            self._listener.start()
+
+    def _listen_forever(self):
+        from extensions import db
+
+        while True:
+            try:
+                with self._app.app_context():
+                    raw = db.engine.raw_connection()
+                try:
+                    connection = raw.driver_connection
+                    connection.autocommit = True
+                    connection.cursor().execute(f'LISTEN {PG_CHANNEL}')
+                    while True:
+                        if select.select([connection], [], [], 30) == ([], [], []):
+                            continue
+                        connection.poll()
+                        while connection.notifies:
+                            self._dispatch_notify(connection.notifies.pop(0).payload)
+                finally:
+                    raw.invalidate()
+            except Exception:
+                logger.exception('Event bus listener failed; reconnecting in 5s')
+                time.sleep(5)
+
+    def _dispatch_notify(self, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning('Ignoring malformed event bus payload')
+            return
+        self.dispatch(message['channel'], message['event'], message['data'])
+
+
+event_bus = EventBus()
+
+
+# ── Session hooks ────────────────────────────────────────────────────
+
+def _prepare_events(session):
+    """before_commit: resolve payloads, and for Postgres send them inside the transaction."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    session.flush()
+    ready = [(channel, event_type, data() if callable(data) else data) for channel, event_type, data in pending]
+
+    if event_bus.backend != 'postgres':
+        session.info[_READY_KEY] = ready
+        return
+    payloads = []
+    for channel, event_type, data in ready:
+        payload = json.dumps({'channel': channel, 'event': event_type, 'data': data}, default=str)
+        if len(payload.encode()) > PG_MAX_PAYLOAD:
+            # Too big to send; subscribers fall back to fetching the resource.
+            payload = json.dumps({'channel': channel, 'event': event_type, 'data': {'truncated': True}})
+        payloads.append(payload)
+    # One round trip per batch rather than per event (bulk fan-out can queue thousands).
+    for start in range(0, len(payloads), PG_NOTIFY_BATCH):
+        session.execute(_PG_NOTIFY_MANY, {'channel': PG_CHANNEL, 'payloads': payloads[start:start + PG_NOTIFY_BATCH]})
+
+
+def _deliver_events(session):
+    for channel, event_type, data in session.info.pop(_READY_KEY, ()):
+        event_bus.dispatch(channel, event_type, data)
+
+
+def _discard_events(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_READY_KEY, None)
@@ -0,0 +1,58 @@
+"""
+Goal progress classification — shared SQL expressions for list filters and stats.
+
+A goal's progress state is derived from its status and progress_percentage:
+
+  completed    status 'completed', or progress at 100%
+  in_progress  status 'in_progress', or 'active' with progress between 0 and 100
+  not_started  status 'not_started', or 'active' with no progress
+  overdue      past its target date, not completed and not cancelled
+
+The states are not exclusive (an 'in_progress' goal at 100% is both
+in_progress and completed), matching how the endpoints have always counted.
+/api/goals?status= and the stats endpoints both use progress_state_clause(),
+so a goal counted as "in progress" is one the in-progress filter returns.
+"""
+from datetime import date
+
+from sqlalchemy import and_, func, or_
+
+from extensions import db
+from models.goal import Goal
+
+PROGRESS_STATES = ('completed', 'in_progress', 'not_started', 'overdue')
+
+
+def progress_state_clause(state, today=None):
+    """WHERE clause selecting goals in a progress state (one of PROGRESS_STATES)."""
+    progress = func.coalesce(Goal.progress_percentage, 0)
+    if state == 'completed':
+        return or_(Goal.status == 'completed', progress >= 100)
+    if state == 'in_progress':
+        return or_(Goal.status == 'in_progress', and_(Goal.status == 'active', progress > 0, progress < 100))
+    if state == 'not_started':
+        return or_(Goal.status == 'not_started', and_(Goal.status == 'active', progress == 0))
+    if state == 'overdue':
+        return and_(
+            Goal.target_date < (today or date.today()),
+            db.not_(progress_state_clause('completed')),
+            func.coalesce(Goal.status, 'active') != 'cancelled',
+        )
+    raise ValueError(f'Unknown progress state: {state}')
+
+
+def summarize_goals(*criteria):
+    """Total, per-state counts and average progress of the goals matching `criteria`, in one query."""
+    total, completed, in_progress, not_started, overdue, average = db.session.query(
+        func.count(Goal.id),
+        *(func.count(Goal.id).filter(progress_state_clause(state)) for state in PROGRESS_STATES),
+        func.avg(func.coalesce(Goal.progress_percentage, 0)),
+    ).filter(*criteria).one()
+    return {
+        'total': total,
+        'completed': completed,
+        'in_progress': in_progress,
+        'not_started': not_started,
+        'overdue': overdue,
+        'average_progress': float(average) if total else 0,
+    }
@@ -0,0 +1,263 @@
+"""
+Job runner — DB-backed background jobs executed by a bounded in-process pool.
+
+Routes enqueue work (cycle activation, user sync, probation spillover) and
+return 202 with the job id; clients poll GET /api/jobs/<id>.
+
+  - Every job is a row in background_jobs, so status/progress survive the
+    request and are visible from any worker.
+  - Execution happens on a ThreadPoolExecutor of JOB_WORKER_POOL_SIZE
+    threads, each inside its own app context / DB session.
+  - Handlers must be idempotent: a failed job, or one whose worker died
+    (running with a heartbeat older than JOB_STALE_AFTER_SECONDS, or queued
+    and never picked up within JOB_QUEUED_STALE_AFTER_SECONDS while not
+    waiting in this process's pool), can be resumed and simply runs again.
+    Long handlers call report_progress at least once per chunk of work so a
+    healthy job never looks stale.
+  - Job types registered with the same `slot` share one queued/running job
+    per resource_id (job_type itself by default). A partial unique index on
+    (slot, resource_id) enforces it; enqueue() returns the live job when it
+    loses that race, and retires a stale one before starting its
+    replacement.
+  - A worker claims its job with a conditional UPDATE (queued -> running)
+    and writes the outcome only while the job is still running, so a job
+    retired or resumed meanwhile is never run or overwritten twice.
+  - JOBS_RUN_INLINE executes jobs synchronously on enqueue (used in tests).
+
+Handlers are registered with @job_runner.handler('<job_type>', slot=None)
+and called as handler(job, report_progress). They return a
+JSON-serialisable result dict and raise to mark the job failed.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.background_job import ACTIVE_JOB_STATUSES, BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_STALE_AFTER_SECONDS = 600
+DEFAULT_QUEUED_STALE_AFTER_SECONDS = 3600
+
+
+def _as_utc(dt):
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+class JobRunner:
+    def __init__(self):
+        self._handlers = {}
+        self._slots = {}       # job_type -> slot
+        self._pending = set()  # ids submitted to this process's pool, not yet started
+        self._executor = None
+        self._app = None
+        self.pool_size = DEFAULT_POOL_SIZE
+        self.stale_after = timedelta(seconds=DEFAULT_STALE_AFTER_SECONDS)
+        self.queued_stale_after = timedelta(seconds=DEFAULT_QUEUED_STALE_AFTER_SECONDS)
+        self.run_inline = False
+
+    def init_app(self, app):
+        self._app = app
+        self.pool_size = app.config.get('JOB_WORKER_POOL_SIZE', DEFAULT_POOL_SIZE)
+        self.stale_after = timedelta(
+            seconds=app.config.get('JOB_STALE_AFTER_SECONDS', DEFAULT_STALE_AFTER_SECONDS)
+        )
+        self.queued_stale_after = timedelta(
+            seconds=app.config.get('JOB_QUEUED_STALE_AFTER_SECONDS', DEFAULT_QUEUED_STALE_AFTER_SECONDS)
+        )
+        self.run_inline = app.config.get('JOBS_RUN_INLINE', False)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def handler(self, job_type, slot=None):
+        """Decorator registering the function that executes `job_type` jobs.
+
+        Job types registered with the same `slot` never have two live jobs
+        for the same resource at once.
+        """
+        def decorator(fn):
+            self._handlers[job_type] = fn
+            self._slots[job_type] = slot or job_type
+            return fn
+        return decorator
+
+    def slot_types(self, job_type):
+        """Every registered job type sharing `job_type`'s slot."""
+        slot = self._slots.get(job_type, job_type)
+        return tuple(t for t, s in self._slots.items() if s == slot) or (job_type,)
+
+    # ── Lifecycle ────────────────────────────────────────────────────
+
+    def is_stale(self, job, now=None):
+        """True if an active job has stopped making progress (its worker died).
+
+        Running jobs go stale when their heartbeat goes quiet. Queued jobs
+        only when nobody has picked them up for queued_stale_after and they
+        aren't waiting in this process's pool — a queue backlog is not death.
+        """
+        now = now or datetime.now(timezone.utc)
+        if job.status == 'running':
+            last_seen = _as_utc(job.heartbeat_at or job.started_at or job.created_at)
+            return last_seen is None or now - last_seen > self.stale_after
+        if job.status == 'queued':
+            if job.id in self._pending:
+                return False
+            queued_at = _as_utc(job.heartbeat_at or job.created_at)
+            return queued_at is None or now - queued_at > self.queued_stale_after
+        return False
+
+    def find_active(self, job_types, resource_id):
+        """Return a live queued/running job of one of `job_types` for resource_id, if any."""
+        jobs = BackgroundJob.query.filter(
+            BackgroundJob.job_type.in_(job_types),
+            BackgroundJob.resource_id == resource_id,
+            BackgroundJob.status.in_(ACTIVE_JOB_STATUSES),
+        ).order_by(BackgroundJob.created_at.desc()).all()
+        return next((job for job in jobs if not self.is_stale(job)), None)
+
+    def enqueue(self, job_type, resource_id=None, payload=None, created_by=None):
+        """Create and schedule a job.
+
+        De-duplicates on (slot, resource_id): if a live job of `job_type` or
+        a type sharing its slot already exists, it is returned instead of
+        starting a second one.
+
+        Returns:
+            tuple: (BackgroundJob, created: bool)
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f'No handler registered for job type {job_type!r}')
+
+        existing = self.find_active(self.slot_types(job_type), resource_id)
+        if existing:
+            return existing, False
+
+        self._retire_stale(job_type, resource_id)
+        job = BackgroundJob(
+            job_type=job_type,
+            slot=self._slots[job_type],
+            resource_id=resource_id,
+            payload=payload or {},
+            created_by=created_by,
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent enqueue won the live-job slot (uq_background_jobs_live_slot)
+            db.session.rollback()
+            existing = self.find_active(self.slot_types(job_type), resource_id)
+            if existing is None:
+                raise
+            return existing, False
+        self._submit(job.id)
+        return job, True
+
+    def _retire_stale(self, job_type, resource_id):
+        """Fail stale live jobs holding `job_type`'s slot for resource_id. Caller commits."""
+        now = datetime.now(timezone.utc)
+        for job in BackgroundJob.query.filter(
+            BackgroundJob.job_type.in_(self.slot_types(job_type)),
+            BackgroundJob.resource_id == resource_id,
+            BackgroundJob.status.in_(ACTIVE_JOB_STATUSES),
+        ):
+            if self.is_stale(job, now):
+                job.status = 'failed'
+                job.error = 'Worker stopped responding; superseded by a new job'
+                job.finished_at = now
+        db.session.flush()  # Free the slot before the caller's insert / requeue is flushed
+
+    def resume(self, job):
+        """Re-run a failed or stale job. Returns False if the job is not resumable."""
+        if not (job.status == 'failed' or self.is_stale(job)):
+            return False
+        self._retire_stale(job.job_type, job.resource_id)
+        job.status = 'queued'
+        job.slot = self._slots.get(job.job_type, job.job_type)
+        job.error = None
+        job.progress_message = 'Resumed'
+        job.heartbeat_at = datetime.now(timezone.utc)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # Another live job already holds the slot
+            return False
+        self._submit(job.id)
+        return True
+
+    # ── Execution ────────────────────────────────────────────────────
+
+    def _submit(self, job_id):
+        if self.run_inline:
+            self._run(job_id)
+            db.session.expire_all()
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.pool_size, thread_name_prefix='eas-job',
+            )
+        self._pending.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        self._pending.discard(job_id)
+        with self._app.app_context():
+            try:
+                self._execute(job_id)
+            finally:
+                db.session.remove()
+
+    def _claim(self, job_id):
+        """Atomically move the job from queued to running. False if it is no longer queued."""
+        now = datetime.now(timezone.utc)
+        claimed = db.session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == 'queued')
+            .values(status='running', attempts=BackgroundJob.attempts + 1,
+                    started_at=now, heartbeat_at=now, finished_at=None)
+        ).rowcount
+        db.session.commit()
+        return bool(claimed)
+
+    def _execute(self, job_id):
+        if not self._claim(job_id):
+            # Missing, or retired / already picked up since it was submitted
+            logger.warning('Background job %s is no longer queued; not running it', job_id)
+            return
+        job = db.session.get(BackgroundJob, job_id)
+
+        def report_progress(percent, message=None):
+            job.progress = max(0, min(100, int(percent)))
+            job.progress_message = message
+            job.heartbeat_at = datetime.now(timezone.utc)
+            db.session.commit()
+
+        try:
+            outcome = {'status': 'succeeded', 'progress': 100,
+                       'result': self._handlers[job.job_type](job, report_progress)}
+        except Exception as e:
+            db.session.rollback()
+            logger.error('Background job %s (%s) failed: %s', job_id, job.job_type, e, exc_info=True)
+            outcome = {'status': 'failed', 'error': str(e)}
+        now = datetime.now(timezone.utc)
+        finished = db.session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == 'running')
+            .values(finished_at=now, heartbeat_at=now, **outcome)
+        ).rowcount
+        db.session.commit()
+        if not finished:
+            logger.warning('Background job %s was retired while running; outcome %s discarded',
+                           job_id, outcome['status'])
+
+
+job_runner = JobRunner()
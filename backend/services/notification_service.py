@@ -2,8 +2,75 @@
 Notification service — creates and manages in-app notifications.
 Migrated from goal-service/services/notification_service.py.
 """
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, delete, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
 from extensions import db
 from models.notification import Notification
+from models.notification_archive import NotificationArchive
+from models.notification_counter import NotificationCounter
+from services.event_bus import event_bus, user_channel
+from services.job_runner import job_runner
+from utils import sync_cursor
+
+ARCHIVE_CHUNK_SIZE = 1000
+BULK_CHUNK_SIZE = 1000
+
+
+def _matches(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _upsert_counter():
+    dialect = postgresql if db.session.get_bind().dialect.name == 'postgresql' else sqlite
+    return dialect.insert(NotificationCounter)
+
+
+def _actual_unread(user_id):
+    return select(db.func.count(Notification.id)).where(
+        Notification.recipient_id == user_id, Notification.is_read.is_(False),
+    ).scalar_subquery()
+
+
+def _clamped(delta):
+    adjusted = NotificationCounter.unread_count + delta
+    return case((adjusted > 0, adjusted), else_=0)
+
+
+def _adjust_unread(user_ids, delta):
+    """Apply delta to each user's counter, creating missing rows from a COUNT.
+
+    Existing rows take a plain UPDATE. Rows that are missing are inserted
+    seeded from the table (which already reflects this transaction's change);
+    if one appears concurrently, the conflict applies the delta to it.
+    """
+    updated = set(db.session.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id.in_(user_ids))
+        .values(unread_count=_clamped(delta))
+        .returning(NotificationCounter.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+    missing = [user_id for user_id in user_ids if user_id not in updated]
+    for start in range(0, len(missing), BULK_CHUNK_SIZE):
+        db.session.execute(
+            _upsert_counter()
+            .values([
+                {'user_id': user_id, 'unread_count': _actual_unread(user_id)}
+                for user_id in missing[start:start + BULK_CHUNK_SIZE]
+            ])
+            .on_conflict_do_update(
+                index_elements=['user_id'], set_={'unread_count': _clamped(delta), 'updated_at': _now()},
+            )
+        )
 
 
 class NotificationService:
@@ -23,20 +90,254 @@ class NotificationService:
             resource_id=resource_id,
         )
         db.session.add(notification)
+        NotificationService.increment_unread([recipient_id])
+        event_bus.publish(user_channel(recipient_id), 'notification', notification.to_dict)
         # Caller handles commit (usually part of a larger transaction)
+        return notification
+
+    @staticmethod
+    def create_notifications_bulk(recipient_ids, event, goal_id=None, triggered_by=None,
+                                  resource_type=None, resource_id=None, chunk_size=BULK_CHUNK_SIZE):
+        """Send the same notification to many recipients with a fixed number of statements per chunk.
+
+        Rows are built as plain dicts and inserted with one multi-row INSERT
+        per chunk. Repeated recipients, and recipients who already have an
+        identical unread notification, are skipped. Returns
+        {'created': n, 'skipped': n}; caller handles commit.
+        """
+        requested = [recipient_id for recipient_id in recipient_ids if recipient_id]
+        recipients = list(dict.fromkeys(requested))
+        identical = [
+            Notification.event == event,
+            _matches(Notification.goal_id, goal_id),
+            _matches(Notification.resource_type, resource_type),
+            _matches(Notification.resource_id, resource_id),
+        ]
+
+        created = []
+        for start in range(0, len(recipients), chunk_size):
+            chunk = recipients[start:start + chunk_size]
+            pending = set(db.session.execute(
+                select(Notification.recipient_id).where(
+                    Notification.recipient_id.in_(chunk), Notification.is_read.is_(False), *identical,
+                )
+            ).scalars())
+            now = datetime.now(timezone.utc)
+            rows = [
+                {
+                    'id': str(uuid.uuid4()),
+                    'recipient_id': recipient_id,
+                    'event': event,
+                    'goal_id': goal_id,
+                    'resource_type': resource_type,
+                    'resource_id': resource_id,
+                    'triggered_by': triggered_by,
+                    'is_read': False,
+                    'created_at': now,
+                    'updated_at': now,
+                }
+                for recipient_id in chunk if recipient_id not in pending
+            ]
+            if rows:
+                db.session.execute(insert(Notification.__table__), rows)
+                created.extend(rows)
+
+        NotificationService._after_insert(created)
+        return {'created': len(created), 'skipped': len(requested) - len(created)}
+
+    @staticmethod
+    def create_notifications_many(notifications, chunk_size=BULK_CHUNK_SIZE):
+        """Insert several different notifications (dicts of create_notification kwargs) in one go.
+
+        Unlike create_notifications_bulk there is no de-duplication; each
+        dict becomes a row. Entries without a recipient are dropped. Returns
+        the number created; caller handles commit.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                'id': str(uuid.uuid4()),
+                'recipient_id': spec['recipient_id'],
+                'event': spec['event'],
+                'goal_id': spec.get('goal_id'),
+                'resource_type': spec.get('resource_type'),
+                'resource_id': spec.get('resource_id'),
+                'triggered_by': spec.get('triggered_by'),
+                'is_read': False,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for spec in notifications if spec.get('recipient_id')
+        ]
+        for start in range(0, len(rows), chunk_size):
+            db.session.execute(insert(Notification.__table__), rows[start:start + chunk_size])
+        NotificationService._after_insert(rows)
+        return len(rows)
+
+    @staticmethod
+    def _after_insert(rows):
+        """Counters and stream events for notification rows inserted outside the ORM."""
+        NotificationService.increment_unread([row['recipient_id'] for row in rows])
+        for row in rows:
+            event_bus.publish(user_channel(row['recipient_id']), 'notification', Notification.row_to_dict(row))
 
     @staticmethod
-    def get_notifications(user_id, unread_only=False):
+    def get_notifications(user_id, unread_only=False, limit=None):
         query = Notification.query.filter_by(recipient_id=user_id)
         if unread_only:
             query = query.filter_by(is_read=False)
-        return query.order_by(Notification.created_at.desc()).all()
+        query = query.order_by(Notification.created_at.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def get_changes_since(user_id, since, unread_only=False, limit=100):
+        """Notifications created or updated after a ?since= cursor, oldest first.
+
+        Returns (notifications, next_cursor, has_more). Raises
+        sync_cursor.InvalidCursor for a malformed cursor.
+        """
+        query = Notification.query.filter_by(recipient_id=user_id)
+        if unread_only:
+            query = query.filter_by(is_read=False)
+        return sync_cursor.page_after(query, Notification.updated_at, Notification.id, since, limit)
+
+    @staticmethod
+    def fingerprint(user_id):
+        """(count, latest updated_at) of a user's notifications — changes whenever any of them does."""
+        return db.session.query(
+            db.func.count(Notification.id), db.func.max(Notification.updated_at),
+        ).filter(Notification.recipient_id == user_id).one()
+
+    @staticmethod
+    def get_inbox(user_id, before=None, limit=20, unread_only=False):
+        """Newest-first keyset page of a user's notifications.
+
+        Returns (notifications, next_cursor); pass next_cursor as `before` for
+        the following page. Raises sync_cursor.InvalidCursor for a bad cursor.
+        """
+        query = Notification.query.filter_by(recipient_id=user_id)
+        if unread_only:
+            query = query.filter_by(is_read=False)
+        return sync_cursor.page_before(query, Notification.created_at, Notification.id, before, limit)
 
     @staticmethod
     def mark_read(notification_id):
         notification = Notification.query.get(notification_id)
-        if notification:
+        if not notification:
+            return False
+        if not notification.is_read:
             notification.is_read = True
+            NotificationService._decrement_unread(notification.recipient_id)
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def mark_all_read(user_id):
+        Notification.query.filter_by(recipient_id=user_id, is_read=False).update({'is_read': True})
+        db.session.execute(
+            _upsert_counter().values(user_id=user_id, unread_count=0)
+            .on_conflict_do_update(index_elements=['user_id'], set_={'unread_count': 0, 'updated_at': _now()})
+        )
+        db.session.commit()
+
+    # ── Unread counter ───────────────────────────────────────────────
+    #
+    # A missing counter row means "not known yet". Whoever creates it —
+    # first read or first change — seeds it from a COUNT in the same
+    # INSERT ... ON CONFLICT statement, and a change that loses that race
+    # applies its delta to the winner's row instead, so no update falls
+    # between the COUNT and the row appearing.
+
+    @staticmethod
+    def unread_count(user_id):
+        """Cached unread count; the counter row is created from a COUNT on first use."""
+        cached = db.session.execute(
+            select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
+        ).scalar()
+        if cached is not None:
+            return cached
+
+        db.session.execute(
+            _upsert_counter().values(user_id=user_id, unread_count=_actual_unread(user_id))
+            .on_conflict_do_nothing(index_elements=['user_id'])
+        )
+        db.session.commit()
+        return db.session.execute(
+            select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
+        ).scalar_one()
+
+    @staticmethod
+    def increment_unread(user_ids):
+        """Add one unread notification per occurrence of each id (in the caller's transaction)."""
+        by_delta = {}
+        for user_id, delta in Counter(user_ids).items():
+            by_delta.setdefault(delta, []).append(user_id)
+        for delta, ids in by_delta.items():
+            _adjust_unread(ids, delta)
+
+    @staticmethod
+    def _decrement_unread(user_id):
+        _adjust_unread([user_id], -1)
+
+    @staticmethod
+    def reconcile_unread_counters():
+        """Re-derive every cached counter from the notifications table; returns how many were off."""
+        actual = select(db.func.count(Notification.id)).where(
+            Notification.recipient_id == NotificationCounter.user_id,
+            Notification.is_read.is_(False),
+        ).scalar_subquery()
+        result = db.session.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.unread_count != actual)
+            .values(unread_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    # ── Retention ────────────────────────────────────────────────────
+
+    @staticmethod
+    def archive_read_notifications(older_than_days, chunk_size=ARCHIVE_CHUNK_SIZE, report_progress=None):
+        """Move read notifications created more than `older_than_days` ago into notifications_archive.
+
+        Works in chunks, committing each one, so it can be interrupted and
+        re-run safely. Unread notifications are never archived.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        now = datetime.now(timezone.utc)
+        columns = [c.name for c in Notification.__table__.columns]
+        archived = 0
+        while True:
+            ids = db.session.execute(
+                select(Notification.id)
+                .where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+                .limit(chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+            source = select(
+                *[Notification.__table__.c[name] for name in columns],
+                literal(now, NotificationArchive.archived_at.type),
+            ).where(Notification.id.in_(ids))
+            db.session.execute(
+                insert(NotificationArchive.__table__).from_select(columns + ['archived_at'], source)
+            )
+            db.session.execute(
+                delete(Notification).where(Notification.id.in_(ids)).execution_options(synchronize_session=False)
+            )
             db.session.commit()
-            return True
-        return False
+            archived += len(ids)
+            if report_progress:
+                report_progress(50, f'Archived {archived} notifications')
+
+        return {'archived': archived, 'counters_reconciled': NotificationService.reconcile_unread_counters()}
+
+
+@job_runner.handler('notification_retention')
+def _run_notification_retention(job, report_progress):
+    days = (job.payload or {}).get('older_than_days')
+    report_progress(5, 'Archiving read notifications')
+    return NotificationService.archive_read_notifications(days, report_progress=report_progress)
@@ -5,6 +5,9 @@ Goals are NOT auto-provisioned. Managers assign goal templates to individual
 team members via the /api/goals/push-templates-to-team endpoint.
 """
 import logging
+
+from sqlalchemy import insert, select
+
 from extensions import db
 from models.attribute_template import AttributeTemplate
 from models.employee_attribute import EmployeeAttribute
@@ -44,3 +47,42 @@ def provision_appraisal_templates(appraisal):
         'Goals will be assigned by the manager.',
         len(attr_templates), appraisal.id, appraisal.employee_id,
     )
+
+
+def provision_attributes_for_employees(cycle_id, employee_ids, chunk_size=1000):
+    """Set-based variant of provision_appraisal_templates for many employees.
+
+    Loads the cycle's active templates and the existing (template, employee)
+    pairs once, then bulk-inserts the missing EmployeeAttribute rows in chunks.
+    Caller handles commit. Returns the number of rows inserted.
+    """
+    template_ids = [
+        t_id for (t_id,) in db.session.execute(
+            select(AttributeTemplate.id).where(
+                AttributeTemplate.cycle_id == cycle_id,
+                AttributeTemplate.is_active.is_(True),
+            )
+        )
+    ]
+    if not template_ids or not employee_ids:
+        return 0
+
+    existing = set(db.session.execute(
+        select(EmployeeAttribute.attribute_template_id, EmployeeAttribute.employee_id)
+        .where(EmployeeAttribute.cycle_id == cycle_id)
+    ).tuples())
+
+    rows = [
+        {'attribute_template_id': t_id, 'employee_id': emp_id, 'cycle_id': cycle_id}
+        for emp_id in employee_ids
+        for t_id in template_ids
+        if (t_id, emp_id) not in existing
+    ]
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(insert(EmployeeAttribute.__table__), rows[start:start + chunk_size])
+
+    logger.info(
+        'Provisioned %d attributes (%d templates) for %d employees in cycle %s',
+        len(rows), len(template_ids), len(employee_ids), cycle_id,
+    )
+    return len(rows)
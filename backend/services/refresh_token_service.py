@@ -0,0 +1,98 @@
+"""
+Refresh-token housekeeping — purging dead rows and per-user token stats.
+
+Rows are never deleted on revoke or expiry (reuse detection needs a
+revoked token's row to find its family), so refresh_tokens is trimmed by
+the 'refresh_token_purge' job / cron script instead:
+  - expired tokens are deleted
+  - revoked tokens are deleted once they have been revoked for longer than
+    REFRESH_TOKEN_REVOKED_RETENTION_HOURS; until then a replay still
+    revokes the rest of the family
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, distinct, func, or_, select
+
+from extensions import db
+from models.refresh_token import RefreshToken
+from models.user_auth import UserAuth
+from services.job_runner import job_runner
+
+PURGE_CHUNK_SIZE = 1000
+
+
+def purge_refresh_tokens(revoked_retention_hours, chunk_size=PURGE_CHUNK_SIZE, report_progress=None):
+    """Delete expired tokens and tokens revoked more than `revoked_retention_hours` ago.
+
+    Works in chunks, committing each one, so it can be interrupted and re-run
+    safely and never holds long locks on the table.
+    """
+    now = datetime.now(timezone.utc)
+    revoked_before = now - timedelta(hours=revoked_retention_hours)
+    dead = or_(
+        RefreshToken.expires_at < now,
+        db.and_(RefreshToken.is_revoked.is_(True),
+                or_(RefreshToken.revoked_at.is_(None), RefreshToken.revoked_at < revoked_before)),
+    )
+    purged = 0
+    while True:
+        ids = db.session.execute(select(RefreshToken.id).where(dead).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        db.session.execute(
+            delete(RefreshToken).where(RefreshToken.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        purged += len(ids)
+        if report_progress:
+            report_progress(50, f'Purged {purged} refresh tokens')
+    return {'purged': purged}
+
+
+def token_stats(limit=20):
+    """Table-wide token counts plus the users holding the most live tokens."""
+    now = datetime.now(timezone.utc)
+    live = db.and_(RefreshToken.is_revoked.is_(False), RefreshToken.expires_at >= now)
+    total, live_count, expired, revoked = db.session.query(
+        func.count(RefreshToken.id),
+        func.count(RefreshToken.id).filter(live),
+        func.count(RefreshToken.id).filter(RefreshToken.expires_at < now),
+        func.count(RefreshToken.id).filter(RefreshToken.is_revoked.is_(True), RefreshToken.expires_at >= now),
+    ).one()
+
+    live_tokens = func.count(RefreshToken.id).label('live_tokens')
+    top_users = db.session.query(
+        RefreshToken.user_id,
+        UserAuth.email,
+        live_tokens,
+        func.count(distinct(RefreshToken.family_id)).label('families'),
+        func.max(RefreshToken.created_at).label('last_issued_at'),
+    ).join(UserAuth, UserAuth.id == RefreshToken.user_id) \
+        .filter(live) \
+        .group_by(RefreshToken.user_id, UserAuth.email) \
+        .order_by(live_tokens.desc(), RefreshToken.user_id) \
+        .limit(limit).all()
+
+    return {
+        'total': total,
+        'live': live_count,
+        'expired': expired,
+        'revoked': revoked,
+        'users': [
+            {
+                'user_id': row.user_id,
+                'email': row.email,
+                'live_tokens': row.live_tokens,
+                'families': row.families,
+                'last_issued_at': row.last_issued_at.isoformat() if row.last_issued_at else None,
+            }
+            for row in top_users
+        ],
+    }
+
+
+@job_runner.handler('refresh_token_purge')
+def _run_refresh_token_purge(job, report_progress):
+    hours = (job.payload or {}).get('revoked_retention_hours')
+    report_progress(5, 'Purging expired and revoked refresh tokens')
+    return purge_refresh_tokens(hours, report_progress=report_progress)
@@ -0,0 +1,423 @@
+"""
+Reporting rollups — pre-aggregated appraisal counts behind /api/reports.
+
+appraisal_rollups holds COUNT(*) per (cycle, department, status, overall
+rating, created month), so the report endpoints read a few rows per
+department instead of scanning appraisals joined to user_profiles and
+departments on every dashboard load.
+
+Maintenance is incremental: any flushed change to an appraisal's status,
+rating, cycle, employee or creation time, or to a user's department, is
+applied as +/- counts to the affected rows in the same transaction (see
+register_rollup_hooks); Core bulk inserts call add_appraisals() themselves.
+New cycles are tracked from the flush that creates them.
+
+appraisal_rollup_state records which cycles have been built. Report reads
+call build_missing() first, which builds any cycle that has never been
+built (e.g. cycles that predate the rollups) with one INSERT ... SELECT;
+they never rebuild a built cycle. A cycle whose deltas could not be applied
+(drift) is marked stale and served as last built, flagged with an
+X-Rollups-Stale header, until the 'report_rollup_refresh' job / cron script
+rebuilds it. check_consistency() compares fresh rollups against the live
+aggregate.
+"""
+import logging
+from collections import Counter
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Date, cast, delete, event, func, inspect, insert, select, type_coerce, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.appraisal_rollup import AppraisalRollup
+from models.appraisal_rollup_state import AppraisalRollupState
+from models.department import Department
+from models.user_profile import UserProfile
+from services.job_runner import job_runner
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_KEY = ('cycle_id', 'department_id', 'status', 'overall_rating', 'month')
+
+# Appraisal fields that determine its rollup row, in _key() order.
+_KEY_FIELDS = ('cycle_id', 'employee_id', 'status', 'overall_rating', 'created_at')
+
+
+# ── Building ─────────────────────────────────────────────────────────
+
+def _month(column):
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return cast(func.date_trunc('month', func.timezone('UTC', column)), Date)
+    return type_coerce(func.date(column, 'start of month'), Date)  # SQLite
+
+
+def _live_rows(cycle_ids):
+    """The rollup aggregate computed from appraisals, for the given cycles."""
+    return select(
+        Appraisal.cycle_id,
+        UserProfile.department_id,
+        Appraisal.status,
+        Appraisal.overall_rating,
+        _month(Appraisal.created_at).label('month'),
+        func.count(Appraisal.id).label('appraisal_count'),
+    ).select_from(Appraisal) \
+        .outerjoin(UserProfile, UserProfile.id == Appraisal.employee_id) \
+        .where(Appraisal.cycle_id.in_(cycle_ids)) \
+        .group_by(Appraisal.cycle_id, UserProfile.department_id, Appraisal.status,
+                  Appraisal.overall_rating, _month(Appraisal.created_at))
+
+
+def refresh_cycle(cycle_id):
+    """Rebuild one cycle's rollups and mark them fresh. Commits.
+
+    The cycle's state row is locked for the rebuild, so concurrent refreshes
+    of the same cycle serialize and writers applying deltas wait for it
+    (or it waits for them) rather than interleaving.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.add(AppraisalRollupState(cycle_id=cycle_id, is_stale=True))
+    except IntegrityError:
+        pass  # Already tracked
+    db.session.execute(
+        select(AppraisalRollupState.cycle_id).where(AppraisalRollupState.cycle_id == cycle_id).with_for_update()
+    )
+    db.session.execute(delete(AppraisalRollup).where(AppraisalRollup.cycle_id == cycle_id))
+    db.session.execute(insert(AppraisalRollup).from_select(list(ROLLUP_KEY) + ['appraisal_count'],
+                                                           _live_rows([cycle_id])))
+    db.session.execute(
+        update(AppraisalRollupState).where(AppraisalRollupState.cycle_id == cycle_id)
+        .values(is_stale=False, refreshed_at=datetime.now(timezone.utc))
+    )
+    db.session.commit()
+
+
+def stale_cycle_ids(cycle_ids=None):
+    """Cycles (all, or among `cycle_ids`) whose rollups are stale or were never built."""
+    query = select(AppraisalCycle.id).outerjoin(
+        AppraisalRollupState, AppraisalRollupState.cycle_id == AppraisalCycle.id,
+    ).where(db.or_(AppraisalRollupState.cycle_id.is_(None), AppraisalRollupState.is_stale.is_(True)))
+    if cycle_ids is not None:
+        query = query.where(AppraisalCycle.id.in_(cycle_ids))
+    return list(db.session.execute(query).scalars())
+
+
+def build_missing(cycle_ids=None):
+    """Build the rollups of whichever of the given cycles (default: all) were never built.
+
+    Cheap once every cycle is tracked: one query finds nothing to do. Built
+    but stale cycles are left for the refresh job. Returns how many were built.
+    """
+    query = select(AppraisalCycle.id).outerjoin(
+        AppraisalRollupState, AppraisalRollupState.cycle_id == AppraisalCycle.id,
+    ).where(AppraisalRollupState.cycle_id.is_(None))
+    if cycle_ids is not None:
+        query = query.where(AppraisalCycle.id.in_(cycle_ids))
+    missing = list(db.session.execute(query).scalars())
+    for cycle_id in missing:
+        refresh_cycle(cycle_id)
+    return len(missing)
+
+
+def ensure_fresh(cycle_ids=None):
+    """Refresh whichever of the given cycles (default: all) are stale. Returns how many were rebuilt."""
+    stale = stale_cycle_ids(cycle_ids)
+    for cycle_id in stale:
+        refresh_cycle(cycle_id)
+    return len(stale)
+
+
+def mark_stale(cycle_ids=None, connection=None):
+    """Flag cycles' rollups (all when `cycle_ids` is None) for rebuilding, in the current transaction."""
+    stmt = update(AppraisalRollupState).values(is_stale=True, marked_stale_at=datetime.now(timezone.utc))
+    if cycle_ids is not None:
+        if not cycle_ids:
+            return
+        stmt = stmt.where(AppraisalRollupState.cycle_id.in_(list(cycle_ids)))
+    (connection or db.session).execute(stmt)
+
+
+def drop_cycle(cycle_id):
+    """Remove a deleted cycle's rollups. Caller handles commit."""
+    db.session.execute(delete(AppraisalRollup).where(AppraisalRollup.cycle_id == cycle_id))
+    db.session.execute(delete(AppraisalRollupState).where(AppraisalRollupState.cycle_id == cycle_id))
+
+
+def check_consistency(cycle_ids=None):
+    """Compare fresh rollups with the live aggregate.
+
+    Returns {'checked': [...], 'stale': [...], 'mismatched': [...]}; stale
+    cycles are listed but not compared since they are expected to differ.
+    """
+    states = db.session.execute(select(AppraisalRollupState.cycle_id, AppraisalRollupState.is_stale)).all()
+    if cycle_ids is not None:
+        states = [state for state in states if state.cycle_id in set(cycle_ids)]
+    fresh = [state.cycle_id for state in states if not state.is_stale]
+
+    def by_cycle(rows):
+        grouped = {cycle_id: Counter() for cycle_id in fresh}
+        for row in rows:
+            grouped[row.cycle_id][tuple(getattr(row, key) for key in ROLLUP_KEY)] += row.appraisal_count
+        return grouped
+
+    live = by_cycle(db.session.execute(_live_rows(fresh)).all()) if fresh else {}
+    stored = by_cycle(db.session.execute(
+        select(AppraisalRollup).where(AppraisalRollup.cycle_id.in_(fresh))
+    ).scalars()) if fresh else {}
+    mismatched = [cycle_id for cycle_id in fresh if live[cycle_id] != stored[cycle_id]]
+    for cycle_id in mismatched:
+        logger.warning('Appraisal rollups for cycle %s disagree with live data', cycle_id)
+    return {
+        'checked': fresh,
+        'stale': [state.cycle_id for state in states if state.is_stale],
+        'mismatched': mismatched,
+    }
+
+
+# ── Reading ──────────────────────────────────────────────────────────
+
+def _counts(*columns, cycle_id=None, criteria=()):
+    """SUM(appraisal_count) grouped by `columns` over (optionally one cycle's) rollups."""
+    query = db.session.query(*columns, func.sum(AppraisalRollup.appraisal_count)).filter(*criteria)
+    if cycle_id:
+        query = query.filter(AppraisalRollup.cycle_id == cycle_id)
+    return query.group_by(*columns)
+
+
+def _weighted_average(rows):
+    """Average rating from (rating, count) pairs, ignoring unrated appraisals like AVG() does."""
+    rated = [(rating, int(count)) for rating, count in rows if rating is not None]
+    total = sum(count for _, count in rated)
+    return sum(rating * count for rating, count in rated) / total if total else None
+
+
+def status_counts(cycle_id):
+    return {status: int(count) for status, count in _counts(AppraisalRollup.status, cycle_id=cycle_id)}
+
+
+def completed_average_rating(cycle_id):
+    return _weighted_average(_counts(
+        AppraisalRollup.overall_rating, cycle_id=cycle_id, criteria=[AppraisalRollup.status == 'completed'],
+    ))
+
+
+def completed_rating_counts(cycle_id=None):
+    """{rating: count} of completed, rated appraisals."""
+    return {rating: int(count) for rating, count in _counts(
+        AppraisalRollup.overall_rating, cycle_id=cycle_id,
+        criteria=[AppraisalRollup.status == 'completed', AppraisalRollup.overall_rating.isnot(None)],
+    )}
+
+
+def department_stats(cycle_id=None):
+    """[(department name, average rating, appraisals, completed)] for employees with a department."""
+    rows = _counts(
+        Department.name, AppraisalRollup.status, AppraisalRollup.overall_rating, cycle_id=cycle_id,
+    ).join(Department, Department.id == AppraisalRollup.department_id).all()
+    by_department = {}
+    for name, status, rating, count in rows:
+        by_department.setdefault(name, []).append((status, rating, int(count)))
+    return [
+        (
+            name,
+            _weighted_average((rating, count) for _, rating, count in items),
+            sum(count for *_, count in items),
+            sum(count for status, _, count in items if status == 'completed'),
+        )
+        for name, items in by_department.items()
+    ]
+
+
+def monthly_status_counts():
+    """[(month, {status: count})] across all cycles, oldest month first."""
+    months = {}
+    for month, status, count in _counts(AppraisalRollup.month, AppraisalRollup.status) \
+            .order_by(AppraisalRollup.month):
+        months.setdefault(month, {})[status] = int(count)
+    return list(months.items())
+
+
+# ── Incremental maintenance ─────────────────────────────────────────
+
+def _value_before(obj, field):
+    """`field` as it was before this flush (its current value if unchanged)."""
+    history = inspect(obj).attrs[field].history
+    return history.deleted[0] if history.deleted else getattr(obj, field)
+
+
+def _month_of(moment):
+    """Python twin of _month(): first day of the UTC month."""
+    if moment is None:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def _key(values, department_id):
+    """ROLLUP_KEY tuple for an appraisal's (cycle_id, employee_id, status, overall_rating, created_at)."""
+    cycle_id, _, status, rating, created_at = values
+    return cycle_id, department_id, status, rating, _month_of(created_at)
+
+
+def _matches(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def apply_deltas(deltas, connection=None):
+    """Add signed counts to rollup rows, keyed by ROLLUP_KEY tuples.
+
+    Only cycles whose rollups have been built are touched (a later build
+    covers the rest). Their state rows are share-locked so a concurrent
+    refresh_cycle, which takes them FOR UPDATE, can't lose these deltas.
+    A decrement with no row to apply to means the rollups had drifted, so
+    that cycle is marked stale for the next refresh instead.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    conn = connection or db.session
+    built = set(conn.execute(
+        select(AppraisalRollupState.cycle_id)
+        .where(AppraisalRollupState.cycle_id.in_({key[0] for key in deltas}))
+        .with_for_update(read=True)
+    ).scalars())
+    drifted = set()
+    for key, delta in deltas.items():
+        if key[0] not in built:
+            continue
+        match = [_matches(getattr(AppraisalRollup, name), value) for name, value in zip(ROLLUP_KEY, key)]
+        updated = conn.execute(
+            update(AppraisalRollup).where(*match)
+            .values(appraisal_count=AppraisalRollup.appraisal_count + delta)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            continue
+        if delta > 0:
+            conn.execute(insert(AppraisalRollup).values(**dict(zip(ROLLUP_KEY, key)), appraisal_count=delta))
+        else:
+            drifted.add(key[0])
+    conn.execute(
+        delete(AppraisalRollup)
+        .where(AppraisalRollup.cycle_id.in_(built), AppraisalRollup.appraisal_count <= 0)
+        .execution_options(synchronize_session=False)
+    )
+    if drifted:
+        logger.warning('Appraisal rollups drifted for cycles %s; marking stale', sorted(drifted))
+        mark_stale(drifted, connection=conn)
+
+
+def add_appraisals(cycle_id, employee_ids, start_tracking=False, chunk_size=1000):
+    """Count appraisals just bulk-inserted (Core) for `employee_ids` into the cycle's rollups.
+
+    With `start_tracking` (the cycle had no appraisals before), a cycle that
+    was never built starts being tracked: these rows are all it contains.
+    """
+    if start_tracking:
+        try:
+            with db.session.begin_nested():
+                db.session.add(AppraisalRollupState(cycle_id=cycle_id, is_stale=False))
+        except IntegrityError:
+            pass  # Already tracked
+    for start in range(0, len(employee_ids), chunk_size):
+        chunk = employee_ids[start:start + chunk_size]
+        rows = db.session.execute(_live_rows([cycle_id]).where(Appraisal.employee_id.in_(chunk))).all()
+        apply_deltas({tuple(getattr(row, key) for key in ROLLUP_KEY): row.appraisal_count for row in rows})
+
+
+def _collect_deltas(session, flush_context):
+    """after_flush: track new cycles, and turn appraisal / department changes into rollup deltas."""
+    new_cycle_ids = [obj.id for obj in session.new if isinstance(obj, AppraisalCycle)]
+    if new_cycle_ids:
+        # A new cycle has no appraisals yet, so its (empty) rollups are built
+        session.connection().execute(insert(AppraisalRollupState), [
+            {'cycle_id': cycle_id, 'is_stale': False, 'refreshed_at': datetime.now(timezone.utc)}
+            for cycle_id in new_cycle_ids
+        ])
+
+    appraisal_changes = []  # (values before or None, values after or None)
+    counted = set()  # ids of appraisals whose deltas are in appraisal_changes
+    for obj in session.new:
+        if isinstance(obj, Appraisal):
+            counted.add(obj.id)
+            appraisal_changes.append((None, tuple(getattr(obj, f) for f in _KEY_FIELDS)))
+    for obj in session.deleted:
+        if isinstance(obj, Appraisal):
+            counted.add(obj.id)
+            appraisal_changes.append((tuple(_value_before(obj, f) for f in _KEY_FIELDS), None))
+    moved = {}  # employee_id -> (old department_id, new department_id)
+    for obj in session.dirty:
+        if isinstance(obj, Appraisal) and _changed(obj, _KEY_FIELDS):
+            counted.add(obj.id)
+            appraisal_changes.append((
+                tuple(_value_before(obj, f) for f in _KEY_FIELDS),
+                tuple(getattr(obj, f) for f in _KEY_FIELDS),
+            ))
+        elif isinstance(obj, UserProfile) and _changed(obj, ('department_id',)):
+            moved[obj.id] = (_value_before(obj, 'department_id'), obj.department_id)
+    if not appraisal_changes and not moved:
+        return
+
+    connection = session.connection()
+    employee_ids = {values[1] for change in appraisal_changes for values in change if values}
+    department_after = dict(connection.execute(
+        select(UserProfile.id, UserProfile.department_id).where(UserProfile.id.in_(employee_ids))
+    ).all()) if employee_ids else {}
+
+    def department_before(employee_id):
+        return moved[employee_id][0] if employee_id in moved else department_after.get(employee_id)
+
+    deltas = Counter()
+    for before, after in appraisal_changes:
+        if before:
+            deltas[_key(before, department_before(before[1]))] -= 1
+        if after:
+            deltas[_key(after, department_after.get(after[1]))] += 1
+
+    if moved:
+        # Appraisals not counted above move between departments as they are
+        query = select(
+            Appraisal.cycle_id, Appraisal.employee_id, Appraisal.status, Appraisal.overall_rating,
+            _month(Appraisal.created_at).label('month'), func.count(Appraisal.id),
+        ).where(Appraisal.employee_id.in_(moved))
+        if counted:
+            query = query.where(Appraisal.id.notin_(counted))
+        query = query.group_by(Appraisal.cycle_id, Appraisal.employee_id, Appraisal.status,
+                               Appraisal.overall_rating, _month(Appraisal.created_at))
+        for cycle_id, employee_id, status, rating, month, count in connection.execute(query):
+            old_department, new_department = moved[employee_id]
+            deltas[(cycle_id, old_department, status, rating, month)] -= count
+            deltas[(cycle_id, new_department, status, rating, month)] += count
+
+    apply_deltas(deltas, connection=connection)
+
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def register_rollup_hooks(session):
+    """Attach the incremental rollup listener to the given session (or session class)."""
+    if not event.contains(session, 'after_flush', _collect_deltas):
+        event.listen(session, 'after_flush', _collect_deltas)
+
+
+# ── Background refresh ───────────────────────────────────────────────
+
+@job_runner.handler('report_rollup_refresh')
+def _run_rollup_refresh(job, report_progress):
+    payload = job.payload or {}
+    cycle_ids = [payload['cycle_id']] if payload.get('cycle_id') else None
+    if payload.get('full'):
+        targets = cycle_ids or list(db.session.execute(select(AppraisalCycle.id)).scalars())
+    else:
+        targets = stale_cycle_ids(cycle_ids)
+    for done, cycle_id in enumerate(targets, start=1):
+        refresh_cycle(cycle_id)
+        report_progress(int(done / len(targets) * 90), f'Refreshed {done}/{len(targets)} cycles')
+    report_progress(95, 'Checking rollups against live data')
+    return {'refreshed': len(targets), **check_consistency(cycle_ids)}
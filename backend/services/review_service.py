@@ -1,11 +1,20 @@
 """Review Service — core logic for calculating weighted appraisal scores."""
+from collections import namedtuple
+from datetime import datetime, timezone
 from decimal import Decimal
+
+from sqlalchemy import insert, select, update
+
 from extensions import db
 from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.appraisal_review import AppraisalReview
 from models.goal import Goal
 from models.employee_attribute import EmployeeAttribute
+from models.manager_review import ManagerReview
 from models.peer_feedback import PeerFeedback
 
+
 class ReviewService:
     @staticmethod
     def calculate_scores(appraisal_id):
@@ -29,136 +38,325 @@ class ReviewService:
         if not appraisal:
             return None
 
-        # Read configurable weights from cycle; fall back to 70/30/0
-        goals_w = 70
-        attrs_w = 30
-        peer_w = 0
-        if appraisal.cycle:
-            goals_w = appraisal.cycle.goals_weight or 70
-            attrs_w = appraisal.cycle.attributes_weight or 30
-            peer_w = getattr(appraisal.cycle, 'peer_feedback_weight', 0) or 0
-
-        # 1. Calculate Performance Goals Average (Weighted)
+        # 1. Performance goal ratings (manager review per goal)
         perf_goals = Goal.query.filter_by(
             employee_id=appraisal.employee_id,
             appraisal_cycle_id=appraisal.cycle_id,
             goal_type='performance'
         ).all()
 
-        from models.manager_review import ManagerReview
         manager_reviews = ManagerReview.query.filter_by(appraisal_id=appraisal_id).all()
         manager_review_map = {r.goal_id: r for r in manager_reviews}
 
-        total_rating = Decimal('0.00')
-        perf_count = 0
-
+        goal_ratings = []
         for goal in perf_goals:
             review = manager_review_map.get(goal.id)
-            if review and review.manager_rating is not None:
-                total_rating += Decimal(str(review.manager_rating))
-                perf_count += 1
+            if review:
+                goal_ratings.append(review.manager_rating)
 
-        goal_score = Decimal('0.00')
-        if perf_count > 0:
-            goal_score = total_rating / Decimal(str(perf_count))
-
-        # 2. Calculate Attribute Average
+        # 2. Attribute ratings
         attributes = EmployeeAttribute.query.filter_by(
             employee_id=appraisal.employee_id,
             cycle_id=appraisal.cycle_id
         ).all()
+        attr_ratings = [attr.manager_rating for attr in attributes]
 
-        total_attr_rating = Decimal('0.00')
-        attr_count = 0
-
-        for attr in attributes:
-            if attr.manager_rating is not None:
-                total_attr_rating += Decimal(str(attr.manager_rating))
-                attr_count += 1
-
-        attr_score = Decimal('0.00')
-        if attr_count > 0:
-            attr_score = total_attr_rating / Decimal(str(attr_count))
-
-        # 3. Calculate Peer Feedback Average
+        # 3. Peer feedback ratings
         peer_feedbacks = PeerFeedback.query.filter_by(
             appraisal_id=appraisal_id,
         ).filter(PeerFeedback.status == 'submitted').all()
+        peer_ratings = [_peer_rating(pf.feedback) for pf in peer_feedbacks]
 
-        total_peer_rating = Decimal('0.00')
-        peer_count = 0
-
-        for pf in peer_feedbacks:
-            if pf.feedback and isinstance(pf.feedback, dict):
-                rating = pf.feedback.get('rating')
-                if rating is not None:
-                    total_peer_rating += Decimal(str(rating))
-                    peer_count += 1
-
-        peer_score = Decimal('0.00')
-        if peer_count > 0:
-            peer_score = total_peer_rating / Decimal(str(peer_count))
-
-        # 4. Calculate effective weights with fallback
-        effective_goals_w = goals_w
-        effective_attrs_w = attrs_w
-        effective_peer_w = peer_w
-
-        if peer_w > 0 and peer_count == 0:
-            # No peer feedback submitted — redistribute peer weight proportionally
-            base = goals_w + attrs_w
-            if base > 0:
-                ratio = Decimal('100') / Decimal(str(base))
-                effective_goals_w = round(float(Decimal(str(goals_w)) * ratio))
-                effective_attrs_w = 100 - effective_goals_w
-            else:
-                effective_goals_w = 70
-                effective_attrs_w = 30
-            effective_peer_w = 0
-
-        # Normalise in case of misconfiguration
-        total_w = effective_goals_w + effective_attrs_w + effective_peer_w
-        if total_w != 100:
-            effective_goals_w = round(effective_goals_w / total_w * 100)
-            effective_attrs_w = round(effective_attrs_w / total_w * 100)
-            effective_peer_w = 100 - effective_goals_w - effective_attrs_w
-
-        goals_pct = Decimal(str(effective_goals_w)) / Decimal('100')
-        attrs_pct = Decimal(str(effective_attrs_w)) / Decimal('100')
-        peer_pct = Decimal(str(effective_peer_w)) / Decimal('100')
-
-        # 5. Calculate Combined Score
-        combined_score = (goal_score * goals_pct) + (attr_score * attrs_pct) + (peer_score * peer_pct)
+        scores = compute_scores(_cycle_weights(appraisal.cycle), goal_ratings, attr_ratings, peer_ratings)
 
         # 6. Save to AppraisalReview
-        from models.appraisal_review import AppraisalReview
         overall_review = AppraisalReview.query.filter_by(appraisal_id=appraisal_id).first()
 
         if not overall_review:
              overall_review = AppraisalReview(appraisal_id=appraisal_id)
              db.session.add(overall_review)
 
-        overall_review.goals_avg_rating = float(goal_score)
-        overall_review.attributes_avg_rating = float(attr_score)
-        overall_review.peer_feedback_avg_rating = float(peer_score) if peer_count > 0 else None
-        overall_review.calculated_rating = float(combined_score)
+        overall_review.goals_avg_rating = scores['goals_avg']
+        overall_review.attributes_avg_rating = scores['attributes_avg']
+        overall_review.peer_feedback_avg_rating = scores['peer_feedback_avg']
+        overall_review.calculated_rating = scores['calculated']
 
         # Round to nearest integer for overall_rating only if not already set by manager
         if overall_review.overall_rating is None:
-            overall_review.overall_rating = int(combined_score.quantize(Decimal('1'), rounding='ROUND_HALF_UP'))
+            overall_review.overall_rating = scores['rounded']
 
         db.session.commit()
 
-        return {
-            'goals_avg': float(goal_score),
-            'attributes_avg': float(attr_score),
-            'peer_feedback_avg': float(peer_score) if peer_count > 0 else None,
-            'peer_feedback_count': peer_count,
-            'calculated': float(combined_score),
-            'overall': overall_review.overall_rating,
-            'weights': {
-                'goals': effective_goals_w,
-                'attributes': effective_attrs_w,
-                'peer_feedback': effective_peer_w,
-            },
+        return _public_result(scores, overall_review.overall_rating)
+
+    @staticmethod
+    def calculate_scores_for_cycle(cycle_id, commit=True):
+        """Recalculate scores for every appraisal in a cycle in one pass.
+
+        Produces the same numbers as calculate_scores() for each appraisal,
+        but loads all inputs with one query per source table and writes the
+        AppraisalReview rows with one bulk UPDATE and one bulk INSERT inside
+        a single transaction.
+
+        Returns:
+            dict: {'created': int, 'updated': int,
+                   'results': {appraisal_id: calculate_scores()-shaped dict}},
+            or None if the cycle does not exist.
+        """
+        cycle = AppraisalCycle.query.get(cycle_id)
+        if not cycle:
+            return None
+
+        components = load_cycle_components(cycle_id)
+        in_cycle = select(Appraisal.id).where(Appraisal.cycle_id == cycle_id)
+
+        existing = {
+            row.appraisal_id: row for row in db.session.execute(
+                select(AppraisalReview.id, AppraisalReview.appraisal_id, AppraisalReview.overall_rating)
+                .where(AppraisalReview.appraisal_id.in_(in_cycle))
+            )
         }
+
+        weights = _cycle_weights(cycle)
+        now = datetime.now(timezone.utc)
+        results, inserts, updates = {}, [], []
+
+        for component in components:
+            appraisal_id = component.appraisal_id
+            scores = combine_scores(weights, component)
+            values = {
+                'goals_avg_rating': scores['goals_avg'],
+                'attributes_avg_rating': scores['attributes_avg'],
+                'peer_feedback_avg_rating': scores['peer_feedback_avg'],
+                'calculated_rating': scores['calculated'],
+                'updated_at': now,
+            }
+
+            current = existing.get(appraisal_id)
+            overall = current.overall_rating if current else None
+            # Round to nearest integer for overall_rating only if not already set by manager
+            if overall is None:
+                overall = scores['rounded']
+
+            if current:
+                updates.append({'id': current.id, 'overall_rating': overall, **values})
+            else:
+                inserts.append({'appraisal_id': appraisal_id, 'overall_rating': overall, **values})
+            results[appraisal_id] = _public_result(scores, overall)
+
+        if updates:
+            db.session.execute(update(AppraisalReview), updates)
+        if inserts:
+            db.session.execute(insert(AppraisalReview.__table__), inserts)
+        if commit:
+            db.session.commit()
+
+        return {'created': len(inserts), 'updated': len(updates), 'results': results}
+
+
+# ── Cycle-wide inputs ─────────────────────────────────────────────────
+
+class ScoreComponents(namedtuple('ScoreComponents', [
+    'appraisal_id', 'employee_id', 'goals_avg', 'attributes_avg', 'peer_avg', 'peer_count',
+])):
+    """Per-appraisal averages that the weighted score is built from (Decimals)."""
+
+
+def load_cycle_components(cycle_id):
+    """Goal / attribute / peer averages for every appraisal in a cycle.
+
+    Loads all inputs with one query per source table. The result does not
+    depend on the cycle's weights, so it can be reused to score any number
+    of weight combinations (see services.score_simulation).
+
+    Returns:
+        list of ScoreComponents, one per appraisal.
+    """
+    appraisals = db.session.execute(
+        select(Appraisal.id, Appraisal.employee_id).where(Appraisal.cycle_id == cycle_id)
+    ).all()
+    in_cycle = select(Appraisal.id).where(Appraisal.cycle_id == cycle_id)
+
+    # Performance goals per employee
+    perf_goals = {}
+    for goal_id, employee_id in db.session.execute(
+        select(Goal.id, Goal.employee_id).where(
+            Goal.appraisal_cycle_id == cycle_id,
+            Goal.goal_type == 'performance',
+        )
+    ):
+        perf_goals.setdefault(employee_id, []).append(goal_id)
+
+    # Manager rating per (appraisal, goal) — last row wins, as in calculate_scores
+    manager_ratings = {}
+    for appraisal_id, goal_id, rating in db.session.execute(
+        select(ManagerReview.appraisal_id, ManagerReview.goal_id, ManagerReview.manager_rating)
+        .where(ManagerReview.appraisal_id.in_(in_cycle))
+    ):
+        manager_ratings.setdefault(appraisal_id, {})[goal_id] = rating
+
+    attr_ratings = {}
+    for employee_id, rating in db.session.execute(
+        select(EmployeeAttribute.employee_id, EmployeeAttribute.manager_rating)
+        .where(EmployeeAttribute.cycle_id == cycle_id)
+    ):
+        attr_ratings.setdefault(employee_id, []).append(rating)
+
+    peer_ratings = {}
+    for appraisal_id, feedback in db.session.execute(
+        select(PeerFeedback.appraisal_id, PeerFeedback.feedback).where(
+            PeerFeedback.appraisal_id.in_(in_cycle),
+            PeerFeedback.status == 'submitted',
+        )
+    ):
+        peer_ratings.setdefault(appraisal_id, []).append(_peer_rating(feedback))
+
+    components = []
+    for appraisal_id, employee_id in appraisals:
+        reviews = manager_ratings.get(appraisal_id, {})
+        goal_ratings = [
+            reviews[goal_id] for goal_id in perf_goals.get(employee_id, ()) if goal_id in reviews
+        ]
+        components.append(_components(
+            appraisal_id, employee_id,
+            goal_ratings, attr_ratings.get(employee_id, ()), peer_ratings.get(appraisal_id, ()),
+        ))
+    return components
+
+
+# ── Scoring math (shared by the single and cycle-wide paths) ──────────
+
+def _cycle_weights(cycle):
+    """(goals, attributes, peer) weights from the cycle; fall back to 70/30/0."""
+    if not cycle:
+        return 70, 30, 0
+    return normalize_weights(cycle.goals_weight, cycle.attributes_weight,
+                             getattr(cycle, 'peer_feedback_weight', 0))
+
+
+def normalize_weights(goals_weight, attributes_weight, peer_feedback_weight):
+    """Weights as scoring applies them: a missing or 0 goals / attributes weight means 70 / 30."""
+    return goals_weight or 70, attributes_weight or 30, peer_feedback_weight or 0
+
+
+def _peer_rating(feedback):
+    if feedback and isinstance(feedback, dict):
+        return feedback.get('rating')
+    return None
+
+
+def _average(ratings):
+    """Decimal mean of the non-null ratings, and how many there were."""
+    total = Decimal('0.00')
+    count = 0
+    for rating in ratings:
+        if rating is not None:
+            total += Decimal(str(rating))
+            count += 1
+    if count == 0:
+        return Decimal('0.00'), 0
+    return total / Decimal(str(count)), count
+
+
+def _components(appraisal_id, employee_id, goal_ratings, attr_ratings, peer_ratings):
+    goals_avg, _ = _average(goal_ratings)
+    attributes_avg, _ = _average(attr_ratings)
+    peer_avg, peer_count = _average(peer_ratings)
+    return ScoreComponents(appraisal_id, employee_id, goals_avg, attributes_avg, peer_avg, peer_count)
+
+
+def compute_scores(weights, goal_ratings, attr_ratings, peer_ratings):
+    """Combine raw ratings into averages and the weighted overall score.
+
+    Args:
+        weights: (goals_w, attrs_w, peer_w) as configured on the cycle.
+        goal_ratings / attr_ratings / peer_ratings: iterables of manager goal
+            ratings, manager attribute ratings and peer ratings; None entries
+            are ignored.
+    """
+    return combine_scores(weights, _components(None, None, goal_ratings, attr_ratings, peer_ratings))
+
+
+def effective_weights(weights, peer_count):
+    """Weights actually applied to one appraisal, as integer percentages summing to 100."""
+    goals_w, attrs_w, peer_w = weights
+
+    # 4. Calculate effective weights with fallback
+    effective_goals_w = goals_w
+    effective_attrs_w = attrs_w
+    effective_peer_w = peer_w
+
+    if peer_w > 0 and peer_count == 0:
+        # No peer feedback submitted — redistribute peer weight proportionally
+        base = goals_w + attrs_w
+        if base > 0:
+            ratio = Decimal('100') / Decimal(str(base))
+            effective_goals_w = round(float(Decimal(str(goals_w)) * ratio))
+            effective_attrs_w = 100 - effective_goals_w
+        else:
+            effective_goals_w = 70
+            effective_attrs_w = 30
+        effective_peer_w = 0
+
+    # Normalise in case of misconfiguration
+    total_w = effective_goals_w + effective_attrs_w + effective_peer_w
+    if total_w != 100:
+        effective_goals_w = round(effective_goals_w / total_w * 100)
+        effective_attrs_w = round(effective_attrs_w / total_w * 100)
+        effective_peer_w = 100 - effective_goals_w - effective_attrs_w
+
+    return effective_goals_w, effective_attrs_w, effective_peer_w
+
+
+def combined_score(weights, components):
+    """Weighted combination of one appraisal's averages, as a Decimal."""
+    return _weighted_sum(effective_weights(weights, components.peer_count), components)
+
+
+def _weighted_sum(effective, components):
+    goals_w, attrs_w, peer_w = effective
+    goals_pct = Decimal(str(goals_w)) / Decimal('100')
+    attrs_pct = Decimal(str(attrs_w)) / Decimal('100')
+    peer_pct = Decimal(str(peer_w)) / Decimal('100')
+
+    # 5. Calculate Combined Score
+    return (components.goals_avg * goals_pct) + (components.attributes_avg * attrs_pct) \
+        + (components.peer_avg * peer_pct)
+
+
+def rounded_rating(score):
+    """Integer rating for a combined score (half-up), as stored in overall_rating."""
+    return int(score.quantize(Decimal('1'), rounding='ROUND_HALF_UP'))
+
+
+def combine_scores(weights, components):
+    """calculate_scores()-shaped result for one appraisal's ScoreComponents."""
+    goals_w, attrs_w, peer_w = effective = effective_weights(weights, components.peer_count)
+    score = _weighted_sum(effective, components)
+    peer_count = components.peer_count
+
+    return {
+        'goals_avg': float(components.goals_avg),
+        'attributes_avg': float(components.attributes_avg),
+        'peer_feedback_avg': float(components.peer_avg) if peer_count > 0 else None,
+        'peer_feedback_count': peer_count,
+        'calculated': float(score),
+        'rounded': rounded_rating(score),
+        'weights': {
+            'goals': goals_w,
+            'attributes': attrs_w,
+            'peer_feedback': peer_w,
+        },
+    }
+
+
+def _public_result(scores, overall):
+    return {
+        'goals_avg': scores['goals_avg'],
+        'attributes_avg': scores['attributes_avg'],
+        'peer_feedback_avg': scores['peer_feedback_avg'],
+        'peer_feedback_count': scores['peer_feedback_count'],
+        'calculated': scores['calculated'],
+        'overall': overall,
+        'weights': scores['weights'],
+    }
@@ -0,0 +1,156 @@
+"""
+Score simulation — what-if weight scenarios for calibration.
+
+HR can try goals / attributes / peer feedback weight combinations on a cycle
+without touching the cycle or appraisal_reviews. The per-appraisal component
+averages (see review_service.load_cycle_components) don't depend on the
+weights, so they are loaded once per cycle and kept in-process; every scenario
+after that is pure arithmetic using the same scoring functions as
+ReviewService, so simulated numbers match what a recalculation would store.
+
+Caching:
+  - Components are cached per cycle for SCORE_SIMULATION_CACHE_TTL_SECONDS
+    (0 disables the cache). Ratings entered after the load show up once the
+    entry expires, or immediately when the caller passes refresh=True.
+  - At most SCORE_SIMULATION_CACHE_MAX_CYCLES cycles are kept (LRU).
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from services.review_service import (
+    _cycle_weights, combined_score, load_cycle_components, normalize_weights, rounded_rating,
+)
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_CYCLES = 16
+RATING_SCALE = (1, 2, 3, 4, 5)
+
+
+class _ComponentCache:
+    """Thread-safe TTL + LRU cache of load_cycle_components() results, keyed by cycle id."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, cycle_id, loader, ttl_seconds, max_entries, refresh=False):
+        """Return (components, loaded_at), calling loader() on a miss."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(cycle_id)
+            if entry and not refresh and entry[0] > now:
+                self._entries.move_to_end(cycle_id)
+                return entry[1], entry[2]
+
+        components = loader()
+        loaded_at = datetime.now(timezone.utc)
+        if ttl_seconds > 0 and max_entries > 0:
+            with self._lock:
+                self._entries[cycle_id] = (now + ttl_seconds, components, loaded_at)
+                self._entries.move_to_end(cycle_id)
+                while len(self._entries) > max_entries:
+                    self._entries.popitem(last=False)
+        return components, loaded_at
+
+    def invalidate(self, cycle_id):
+        with self._lock:
+            self._entries.pop(cycle_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+component_cache = _ComponentCache()
+
+
+def _components_for(cycle_id, refresh=False):
+    config = current_app.config
+    return component_cache.get_or_load(
+        cycle_id,
+        lambda: load_cycle_components(cycle_id),
+        ttl_seconds=config.get('SCORE_SIMULATION_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS),
+        max_entries=config.get('SCORE_SIMULATION_CACHE_MAX_CYCLES', DEFAULT_MAX_CYCLES),
+        refresh=refresh,
+    )
+
+
+def _score_scenario(weights, components):
+    """Calculated scores and rounded ratings per appraisal, plus the summary stats."""
+    scores = {}
+    ratings = {}
+    for component in components:
+        score = combined_score(weights, component)
+        scores[component.appraisal_id] = score
+        ratings[component.appraisal_id] = rounded_rating(score)
+
+    distribution = Counter(ratings.values())
+    count = len(scores)
+    return scores, ratings, {
+        'weights': {'goals': weights[0], 'attributes': weights[1], 'peer_feedback': weights[2]},
+        'mean_score': round(float(sum(scores.values()) / count), 4) if count else None,
+        'distribution': {str(r): distribution.get(r, 0) for r in sorted(set(RATING_SCALE) | set(distribution))},
+    }
+
+
+def simulate_weights(cycle, scenarios, refresh=False, include_appraisals=False):
+    """Score a cycle under several weight vectors without writing anything.
+
+    Args:
+        cycle: AppraisalCycle whose appraisals are simulated.
+        scenarios: list of dicts with goals_weight / attributes_weight /
+            peer_feedback_weight (already validated) and an optional name.
+            Weights are normalised like a cycle's (normalize_weights), so a
+            0 goals / attributes weight scores as the 70 / 30 default.
+        refresh: reload the component averages instead of using the cache.
+        include_appraisals: add per-appraisal calculated scores / ratings to
+            each scenario.
+
+    Returns:
+        dict with the cycle's current weights as 'baseline' and one entry per
+        scenario, each carrying its rating distribution, mean score and the
+        number of appraisals whose rounded rating differs from the baseline.
+        Manager overrides of overall_rating are not considered; ratings are
+        the rounded calculated score, as a recalculation would produce.
+    """
+    components, loaded_at = _components_for(cycle.id, refresh=refresh)
+
+    _, baseline_ratings, baseline = _score_scenario(_cycle_weights(cycle), components)
+    results = []
+    for index, scenario in enumerate(scenarios):
+        weights = normalize_weights(scenario['goals_weight'], scenario['attributes_weight'],
+                                    scenario['peer_feedback_weight'])
+        scores, ratings, summary = _score_scenario(weights, components)
+        summary['name'] = scenario.get('name') or f'Scenario {index + 1}'
+        summary['ratings_changed'] = sum(
+            1 for appraisal_id, rating in ratings.items() if rating != baseline_ratings[appraisal_id]
+        )
+        if summary['mean_score'] is not None:
+            summary['mean_delta'] = round(summary['mean_score'] - baseline['mean_score'], 4)
+        else:
+            summary['mean_delta'] = None
+        if include_appraisals:
+            summary['appraisals'] = [
+                {
+                    'appraisal_id': c.appraisal_id,
+                    'employee_id': c.employee_id,
+                    'calculated': float(scores[c.appraisal_id]),
+                    'rating': ratings[c.appraisal_id],
+                    'baseline_rating': baseline_ratings[c.appraisal_id],
+                }
+                for c in components
+            ]
+        results.append(summary)
+
+    return {
+        'cycle_id': cycle.id,
+        'appraisal_count': len(components),
+        'components_loaded_at': loaded_at.isoformat(),
+        'baseline': baseline,
+        'scenarios': results,
+    }
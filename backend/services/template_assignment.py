@@ -0,0 +1,149 @@
+"""
+Template assignment — set-based push of goal templates onto employees.
+
+Replaces the per (employee × template) existence query and one-at-a-time
+goal adds in /api/goals/push-templates-to-team with a fixed number of
+statements:
+
+  1. load the cycle's existing goals for the target employees, keyed by
+     (employee_id, title), in one query
+  2. work out which goals to insert and which to update in memory
+  3. bulk-insert new goals in chunks; update changed goals with one UPDATE
+     per distinct set of new values
+  4. notify employees who got a new goal in one batch
+
+plan_template_push() does steps 1–2 only, so it doubles as the dry run.
+"""
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select, update
+
+from extensions import db
+from models.goal import Goal
+from services.notification_service import NotificationService
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Fields a re-push copies from the template onto an existing goal.
+UPDATED_FIELDS = ('description', 'approval_status', 'department_id')
+
+TemplatePushPlan = namedtuple('TemplatePushPlan', ['inserts', 'updates', 'created', 'updated'])
+
+
+def plan_template_push(cycle_id, templates, employee_ids, created_by, start_date=None, end_date=None):
+    """Work out the goals a push would create and change, without writing anything.
+
+    Returns a TemplatePushPlan. `inserts` are Goal row dicts; `updates` are
+    {'goal_id', 'employee_id', 'title', 'changes'} where `changes` maps each
+    field that would change to {'from', 'to'}. `created` / `updated` count
+    (employee, template) pairs the same way the endpoint always has: a pair
+    whose goal already exists counts as updated even if nothing changes.
+    """
+    employee_ids = list(dict.fromkeys(employee_ids))
+    titles = list(dict.fromkeys(t.title for t in templates))
+
+    existing = {}
+    if employee_ids and titles:
+        rows = db.session.execute(
+            select(Goal.id, Goal.employee_id, Goal.title, *(getattr(Goal, f) for f in UPDATED_FIELDS))
+            .where(
+                Goal.appraisal_cycle_id == cycle_id,
+                Goal.employee_id.in_(employee_ids),
+                Goal.title.in_(titles),
+            )
+            .order_by(Goal.created_at, Goal.id)
+        ).all()
+        for row in rows:
+            # Duplicate titles: the oldest goal is the one that gets updated.
+            existing.setdefault((row.employee_id, row.title), row)
+
+    inserts = {}
+    updates = {}
+    created = updated = 0
+    for employee_id in employee_ids:
+        for template in templates:
+            key = (employee_id, template.title)
+            target = {
+                'description': template.description,
+                'approval_status': 'approved',
+                'department_id': template.department_id,
+            }
+            if key in inserts:
+                # Same title from an org-wide and a department template: the
+                # later one updates the goal the earlier one creates.
+                inserts[key].update(target)
+                updated += 1
+                continue
+            if key in existing:
+                current = existing[key]
+                changes = updates.setdefault(key, {
+                    'goal_id': current.id, 'employee_id': employee_id, 'title': template.title, 'changes': {},
+                })['changes']
+                for field, value in target.items():
+                    if getattr(current, field) == value:
+                        changes.pop(field, None)
+                    else:
+                        changes[field] = {'from': getattr(current, field), 'to': value}
+                updated += 1
+                continue
+
+            inserts[key] = {
+                'employee_id': employee_id,
+                'title': template.title,
+                'description': template.description,
+                'category': template.category,
+                'appraisal_cycle_id': cycle_id,
+                'created_by': created_by,
+                'status': 'active',
+                'goal_type': 'performance',
+                'weight': 0,
+                'start_date': start_date,
+                'target_date': end_date,
+                'approval_status': 'approved',  # Manager-assigned = auto-approved
+                'department_id': template.department_id,
+            }
+            created += 1
+
+    return TemplatePushPlan(list(inserts.values()), list(updates.values()), created, updated)
+
+
+def describe_plan(plan):
+    """The dry-run diff for a plan."""
+    return {
+        'create': [
+            {'employee_id': row['employee_id'], 'title': row['title'], 'department_id': row['department_id']}
+            for row in plan.inserts
+        ],
+        'update': [item for item in plan.updates if item['changes']],
+        'unchanged': sum(1 for item in plan.updates if not item['changes']),
+    }
+
+
+def apply_template_push(plan, triggered_by, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write a plan: bulk-insert, bulk-update and notify. Caller handles commit."""
+    for start in range(0, len(plan.inserts), chunk_size):
+        db.session.execute(insert(Goal.__table__), plan.inserts[start:start + chunk_size])
+
+    now = datetime.now(timezone.utc)
+    by_values = {}
+    for item in plan.updates:
+        if item['changes']:
+            values = tuple(sorted((field, change['to']) for field, change in item['changes'].items()))
+            by_values.setdefault(values, []).append(item['goal_id'])
+    for values, goal_ids in by_values.items():
+        for start in range(0, len(goal_ids), chunk_size):
+            db.session.execute(
+                update(Goal.__table__)
+                .where(Goal.__table__.c.id.in_(goal_ids[start:start + chunk_size]))
+                .values({**dict(values), 'updated_at': now})
+            )
+
+    # One notification per employee who got a new goal, however many templates.
+    NotificationService.create_notifications_bulk(
+        [row['employee_id'] for row in plan.inserts],
+        'goal_assigned',
+        triggered_by=triggered_by,
+        resource_type='goal',
+        chunk_size=chunk_size,
+    )
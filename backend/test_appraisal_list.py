@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+
+
+@pytest.fixture
+def cycle(app):
+    cycle = AppraisalCycle(name='FY26', start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), status='active')
+    db.session.add(cycle)
+    db.session.commit()
+    return cycle
+
+
+def _seed_appraisals(make_user, cycle, count, manager=None):
+    employees = [make_user(manager_id=manager.id if manager else None) for _ in range(count)]
+    for emp in employees:
+        db.session.add(Appraisal(
+            cycle_id=cycle.id,
+            employee_id=emp.id,
+            manager_id=manager.id if manager else None,
+            self_assessment={'summary': 'x' * 200},
+            manager_assessment={'summary': 'y' * 200},
+        ))
+    db.session.commit()
+    return employees
+
+
+def _list_query_count(client, headers, count_queries, url):
+    db.session.expire_all()
+    with count_queries() as counter:
+        resp = client.get(url, headers=headers)
+    assert resp.status_code == 200
+    return counter.count, resp.get_json()
+
+
+def test_list_issues_constant_queries(client, make_user, auth_headers, cycle, count_queries):
+    hr = make_user(role='hr_admin')
+    headers = auth_headers(hr.id)
+    manager = make_user(role='manager')
+    url = f'/api/appraisals/?scope=all&cycle_id={cycle.id}'
+    client.get(url, headers=headers)  # warm the identity cache
+
+    _seed_appraisals(make_user, cycle, 2, manager=manager)
+    small_count, small = _list_query_count(client, headers, count_queries, url)
+    _seed_appraisals(make_user, cycle, 10, manager=manager)
+    large_count, large = _list_query_count(client, headers, count_queries, url)
+
+    assert (len(small), len(large)) == (2, 12)
+    assert large_count == small_count
+    assert large[0]['employee_name'].startswith('Test')
+    assert large[0]['cycle_name'] == 'FY26'
+
+
+def test_fields_projection_skips_heavy_columns(client, make_user, auth_headers, cycle, count_queries):
+    hr = make_user(role='hr_admin')
+    _seed_appraisals(make_user, cycle, 3)
+
+    url = '/api/appraisals/?scope=all&fields=status,employee_name'
+    db.session.expire_all()
+    with count_queries() as counter:
+        rows = client.get(url, headers=auth_headers(hr.id)).get_json()
+
+    assert len(rows) == 3
+    assert all(set(row) == {'id', 'status', 'employee_name'} for row in rows)
+    select_sql = next(s for s in counter.statements if 'FROM appraisals' in s)
+    for column in Appraisal.HEAVY_FIELDS:
+        assert f'appraisals.{column} AS' not in select_sql
+
+
+def test_full_payload_unchanged_without_fields(client, make_user, auth_headers, cycle):
+    hr = make_user(role='hr_admin')
+    _seed_appraisals(make_user, cycle, 1)
+
+    rows = client.get('/api/appraisals/?scope=all', headers=auth_headers(hr.id)).get_json()
+    appraisal = db.session.get(Appraisal, rows[0]['id'])
+    assert rows[0] == appraisal.to_dict()
+    assert rows[0]['self_assessment'] == {'summary': 'x' * 200}
+
+
+def test_team_scope_includes_current_reports(client, make_user, auth_headers, cycle):
+    manager = make_user(role='manager')
+    reports = _seed_appraisals(make_user, cycle, 2)
+    for emp in reports:
+        emp.manager_id = manager.id
+    _seed_appraisals(make_user, cycle, 1)
+    db.session.commit()
+
+    rows = client.get('/api/appraisals/?scope=team', headers=auth_headers(manager.id)).get_json()
+    assert {r['employee_id'] for r in rows} == {emp.id for emp in reports}
@@ -0,0 +1,192 @@
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.attribute_template import AttributeTemplate
+from models.employee_attribute import EmployeeAttribute
+from models.notification import Notification
+from routes.cycles import _create_appraisals_for_active_users
+from services.cycle_activation import generate_cycle_appraisals
+from services.eligibility_engine import check_eligibility
+from services.notification_service import NotificationService
+from services.provisioning import provision_appraisal_templates
+
+TODAY = date.today()
+
+
+def _make_cycle(cycle_type='annual', **kwargs):
+    cycle = AppraisalCycle(
+        name=f'{cycle_type} cycle',
+        cycle_type=cycle_type,
+        status='active',
+        start_date=kwargs.pop('start_date', TODAY - timedelta(days=200)),
+        end_date=kwargs.pop('end_date', TODAY + timedelta(days=150)),
+        **kwargs,
+    )
+    db.session.add(cycle)
+    db.session.flush()
+    for title in ('Ownership', 'Teamwork'):
+        db.session.add(AttributeTemplate(cycle_id=cycle.id, title=title, created_by='hr'))
+    db.session.add(AttributeTemplate(cycle_id=cycle.id, title='Retired', created_by='hr', is_active=False))
+    db.session.commit()
+    return cycle
+
+
+def _seed_population(make_user, count):
+    manager = make_user(role='manager', start_date=TODAY - timedelta(days=2000))
+    users = [manager]
+    for i in range(count):
+        # Every third user is a recent joiner still in probation.
+        joined = TODAY - timedelta(days=20 if i % 3 == 0 else 800 + i)
+        users.append(make_user(manager_id=manager.id, start_date=joined, employment_type='full_time'))
+    users.append(make_user(start_date=None))
+    return users
+
+
+def _legacy_generate(cycle):
+    """The per-user loop that activation used before it went set-based."""
+    from models.user_profile import UserProfile
+
+    for user in UserProfile.query.filter_by(is_active=True).all():
+        if Appraisal.query.filter_by(cycle_id=cycle.id, employee_id=user.id).first():
+            continue
+        eligibility = check_eligibility(user.to_dict(), cycle)
+        if not eligibility['is_eligible']:
+            continue
+        appraisal = Appraisal(
+            cycle_id=cycle.id, employee_id=user.id, manager_id=user.manager_id,
+            status='not_started', eligibility_status='eligible',
+            eligibility_reason=eligibility['reason'], is_prorated=eligibility['is_prorated'],
+        )
+        db.session.add(appraisal)
+        db.session.flush()
+        provision_appraisal_templates(appraisal)
+        NotificationService.create_notification(
+            recipient_id=user.id, event='cycle_started', triggered_by='system',
+            resource_type='appraisal_cycle', resource_id=cycle.id,
+        )
+    db.session.commit()
+
+
+def _snapshot(cycle_id):
+    appraisals = sorted(
+        (a.employee_id, a.manager_id, a.status, a.eligibility_status, a.eligibility_reason,
+         a.is_prorated, a.start_date, a.end_date, a.goals_finalized)
+        for a in Appraisal.query.filter_by(cycle_id=cycle_id)
+    )
+    attributes = sorted(
+        (ea.attribute_template.title, ea.employee_id)
+        for ea in EmployeeAttribute.query.filter_by(cycle_id=cycle_id)
+    )
+    notifications = sorted(
+        (n.recipient_id, n.event, n.triggered_by, n.resource_type, n.is_read)
+        for n in Notification.query.filter_by(resource_id=cycle_id)
+    )
+    return appraisals, attributes, notifications
+
+
+def test_matches_legacy_per_user_generation(make_user):
+    _seed_population(make_user, 9)
+    legacy_cycle, bulk_cycle = _make_cycle(), _make_cycle()
+
+    _legacy_generate(legacy_cycle)
+    counts = _create_appraisals_for_active_users(bulk_cycle.id)
+
+    assert _snapshot(bulk_cycle.id) == _snapshot(legacy_cycle.id)
+    assert counts == {'created': 8, 'skipped': 3, 'notified': 8}
+
+
+def test_rerun_is_idempotent_and_keeps_existing_attributes(make_user):
+    users = _seed_population(make_user, 3)
+    cycle = _make_cycle()
+    ownership = AttributeTemplate.query.filter_by(cycle_id=cycle.id, title='Ownership').one()
+    db.session.add(EmployeeAttribute(attribute_template_id=ownership.id, cycle_id=cycle.id, employee_id=users[0].id))
+    db.session.commit()
+
+    first = _create_appraisals_for_active_users(cycle.id)
+    second = _create_appraisals_for_active_users(cycle.id)
+
+    assert first == {'created': 4, 'skipped': 1, 'notified': 4}
+    assert second == {'created': 0, 'skipped': 1, 'notified': 0}
+    assert EmployeeAttribute.query.filter_by(cycle_id=cycle.id).count() == 2 * 4
+
+
+def test_probation_cycle_sets_individual_window(make_user):
+    joined = TODAY - timedelta(days=20)
+    user = make_user(start_date=joined)
+    cycle = _make_cycle('probation')
+
+    _create_appraisals_for_active_users(cycle.id)
+
+    appraisal = Appraisal.query.filter_by(cycle_id=cycle.id, employee_id=user.id).one()
+    assert appraisal.start_date == joined
+    assert appraisal.end_date == joined + relativedelta(months=3)
+
+
+def test_criteria_filter_population(make_user):
+    make_user(start_date=TODAY - timedelta(days=900), employment_type='contract')
+    make_user(start_date=TODAY - timedelta(days=900), employment_type='full_time')
+    cycle = _make_cycle()
+
+    counts = generate_cycle_appraisals(cycle, {'employment_type': 'contract', 'department_id': 'all'})
+
+    assert counts['created'] == 1
+
+
+def test_statement_count_independent_of_population(make_user, count_queries):
+    cycle = _make_cycle()
+    counts = []
+    for n in (4, 40):
+        _seed_population(make_user, n)
+        db.session.expire_all()
+        with count_queries() as counter:
+            generate_cycle_appraisals(cycle)
+        counts.append(counter.count)
+        db.session.rollback()
+    assert counts[0] == counts[1]
+
+
+def _seed_transfers(make_user, cycle, count):
+    from models.team_transfer import TeamTransfer
+
+    users = [make_user(start_date=TODAY - timedelta(days=900)) for _ in range(count)]
+    for i, user in enumerate(users):
+        if i % 2:
+            continue  # every other user never transferred
+        # Outside the window, then two inside it (inserted latest-first).
+        for offset in (-400, 60, 10):
+            db.session.add(TeamTransfer(
+                user_id=user.id, transfer_date=cycle.start_date + timedelta(days=offset),
+                from_department_id=None, to_department_id=None,
+            ))
+    db.session.commit()
+    return users
+
+
+def test_mid_year_batch_matches_scalar_engine(make_user):
+    from services.eligibility_engine import evaluate_population
+
+    cycle = _make_cycle('mid_year')
+    users = _seed_transfers(make_user, cycle, 6)
+
+    expected = [check_eligibility(u.to_dict(), cycle) for u in users]
+    assert evaluate_population(cycle, users) == expected
+    assert sum(r['is_eligible'] for r in expected) == 3
+    # The earliest in-window transfer is the one reported.
+    first_transfer = cycle.start_date + timedelta(days=10)
+    assert str(first_transfer) in expected[0]['reason']
+
+
+def test_mid_year_activation_loads_transfers_once(make_user, count_queries):
+    cycle = _make_cycle('mid_year')
+    counts = []
+    for n in (4, 20):
+        _seed_transfers(make_user, cycle, n)
+        with count_queries() as counter:
+            generate_cycle_appraisals(cycle)
+        counts.append(sum('FROM team_transfers' in s for s in counter.statements))
+        db.session.rollback()
+    assert counts == [1, 1]
@@ -93,3 +93,69 @@ def test_legacy_employee(mock_date, annual_cycle):
     res_annual = check_eligibility(user_data, annual_cycle)
     assert res_annual['is_eligible']
     assert not res_annual['is_prorated']
+
+
+# ── Batch evaluation parity ──────────────────────────────────────────
+
+def _population():
+    from datetime import timedelta
+    users = []
+    day = date(2023, 6, 1)
+    i = 0
+    while day <= date(2027, 3, 1):
+        for employment_type in ('full_time', 'probation'):
+            users.append({'id': f'u{i}', 'email': f'u{i}@example.com',
+                          'start_date': day, 'employment_type': employment_type})
+            i += 1
+        day += timedelta(days=9)
+    users.append({'id': 'no-date', 'start_date': None, 'employment_type': 'full_time'})
+    users.append({'id': 'iso', 'start_date': '2025-03-04T00:00:00', 'employment_type': None})
+    return users
+
+
+@pytest.mark.parametrize('cycle_kwargs', [
+    {'cycle_type': 'annual'},
+    {'cycle_type': 'probation'},
+    {'cycle_type': 'probation', 'eligibility_cutoff_date': None},
+    {'cycle_type': 'annual', 'include_probation_employees': False, 'prorated_evaluation_allowed': False},
+    {'cycle_type': 'unknown'},
+])
+@pytest.mark.parametrize('today', [date(2026, 2, 15), date(2026, 8, 1), date(2026, 12, 20)])
+def test_evaluate_population_matches_scalar_engine(cycle_kwargs, today):
+    from services.eligibility_engine import evaluate_population
+
+    kwargs = dict(start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+                  eligibility_cutoff_date=date(2026, 1, 31))
+    kwargs.update(cycle_kwargs)
+    cycle = MockCycle(**kwargs)
+    cycle.minimum_service_months = 6
+    users = _population()
+
+    with patch('services.eligibility_engine.date') as mock_date:
+        mock_date.today.return_value = today
+        mock_date.side_effect = lambda *args, **kw: date(*args, **kw)
+        mock_date.fromisoformat = date.fromisoformat
+        expected = [check_eligibility(u, cycle) for u in users]
+        assert evaluate_population(cycle, users) == expected
+
+
+def test_evaluate_population_logs_one_cutoff_summary(caplog):
+    import logging
+    from services.eligibility_engine import evaluate_population
+
+    annual_cycle = MockCycle('annual', date(2026, 1, 1), date(2026, 12, 31), date(2025, 10, 31))
+    users = _population()
+    with patch('services.eligibility_engine.date') as mock_date:
+        mock_date.today.return_value = date(2026, 8, 1)
+        mock_date.side_effect = lambda *args, **kw: date(*args, **kw)
+        mock_date.fromisoformat = date.fromisoformat
+        with caplog.at_level(logging.INFO, logger='services.eligibility_engine'):
+            for user in users:
+                check_eligibility(user, annual_cycle)
+            per_user = sum('after cutoff' in r.getMessage() for r in caplog.records)
+            caplog.clear()
+            evaluate_population(annual_cycle, users)
+
+    summaries = [r.getMessage() for r in caplog.records if 'after cutoff' in r.getMessage()]
+    assert per_user > 0
+    assert summaries == [f'{per_user} users joined after cutoff 2025-10-31 → not eligible for annual']
@@ -0,0 +1,158 @@
+from datetime import date
+
+import pytest
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.goal import Goal
+from models.goal_audit import GoalAudit
+from models.goal_version import GoalVersion
+from models.notification import Notification
+
+
+@pytest.fixture
+def cycle(app):
+    cycle = AppraisalCycle(name='FY26', start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), status='active')
+    db.session.add(cycle)
+    db.session.commit()
+    return cycle
+
+
+@pytest.fixture
+def team(make_user):
+    manager = make_user(role='manager')
+    return manager, make_user(manager_id=manager.id)
+
+
+def _seed_goals(employee, cycle, count, status='draft'):
+    goals = [
+        Goal(employee_id=employee.id, appraisal_cycle_id=cycle.id, title=f'Goal {i}',
+             goal_type='performance', approval_status=status)
+        for i in range(count)
+    ]
+    db.session.add_all(goals)
+    db.session.add(Appraisal(cycle_id=cycle.id, employee_id=employee.id, status='not_started'))
+    db.session.commit()
+    return [goal.id for goal in goals]
+
+
+def test_bulk_submit_snapshots_audits_and_notifies_in_one_pass(client, team, cycle, auth_headers):
+    manager, employee = team
+    goal_ids = _seed_goals(employee, cycle, 4)
+
+    resp = client.post('/api/goals/bulk/submit', json={'employee_id': employee.id}, headers=auth_headers(manager.id))
+
+    assert resp.get_json()['submitted'] == 4
+    assert {g.approval_status for g in Goal.query.filter(Goal.id.in_(goal_ids))} == {'pending_approval'}
+    assert {g.version_number for g in Goal.query.filter(Goal.id.in_(goal_ids))} == {2}
+    assert sorted(v.goal_id for v in GoalVersion.query) == sorted(goal_ids)
+    assert {(a.old_status, a.new_status, a.version_number) for a in GoalAudit.query} == {('draft', 'pending_approval', 2)}
+    assert sorted(n.goal_id for n in Notification.query.filter_by(recipient_id=employee.id,
+                                                                  event='goal_assigned_pending')) == sorted(goal_ids)
+    assert Appraisal.query.filter_by(employee_id=employee.id).one().status == 'goals_pending_approval'
+
+
+def test_bulk_submit_query_count_is_independent_of_goal_count(client, make_user, cycle, auth_headers, count_queries):
+    from models.department import Department
+
+    counts = []
+    for n in (3, 7):
+        # A department of their own, so each submission touches rollup rows the same way
+        department = Department(name=f'Dept {n}')
+        db.session.add(department)
+        db.session.flush()
+        manager = make_user(role='manager')
+        employee = make_user(manager_id=manager.id, department_id=department.id)
+        _seed_goals(employee, cycle, n)
+        headers = auth_headers(manager.id)
+        db.session.expire_all()
+        with count_queries() as counter:
+            client.post('/api/goals/bulk/submit', json={'employee_id': employee.id}, headers=headers)
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
+
+
+def test_bulk_approve_reports_failures_and_syncs_appraisal(client, make_user, team, cycle, auth_headers):
+    manager, employee = team
+    goal_ids = _seed_goals(employee, cycle, 3, status='pending_approval')
+    stranger = make_user()
+    foreign_id = _seed_goals(stranger, cycle, 1, status='pending_approval')[0]
+    Goal.query.filter_by(id=goal_ids[0]).update({'approval_status': 'approved'})
+    db.session.commit()
+
+    body = client.post('/api/goals/bulk/approve', headers=auth_headers(manager.id),
+                       json={'goal_ids': goal_ids + [foreign_id, 'missing'], 'comment': 'Nice'}).get_json()
+
+    assert body['approved'] == 2
+    assert {f['goal_id']: f['error'] for f in body['failed']} == {
+        foreign_id: 'Forbidden: not a goal of your direct report',
+        'missing': 'Goal not found',
+        goal_ids[0]: 'Goal is not pending approval',
+    }
+    approved = Goal.query.filter(Goal.id.in_(goal_ids[1:])).all()
+    assert {(g.approval_status, g.approved_by, g.manager_comment) for g in approved} == {('approved', manager.id, 'Nice')}
+    assert Notification.query.filter_by(recipient_id=employee.id, event='goal_approved').count() == 2
+    assert db.session.get(Goal, foreign_id).approval_status == 'pending_approval'
+    assert Appraisal.query.filter_by(employee_id=employee.id).one().status == 'goals_approved'
+
+
+def test_bulk_reject_requires_reason(client, team, cycle, auth_headers):
+    manager, employee = team
+    goal_ids = _seed_goals(employee, cycle, 2, status='pending_approval')
+    headers = auth_headers(manager.id)
+
+    assert client.post('/api/goals/bulk/reject', json={'goal_ids': goal_ids}, headers=headers).status_code == 400
+
+    body = client.post('/api/goals/bulk/reject', json={'goal_ids': goal_ids, 'reason': 'Too vague'},
+                       headers=headers).get_json()
+    assert (body['rejected'], body['failed']) == (2, [])
+    assert {(g.approval_status, g.rejected_reason) for g in Goal.query} == {('rejected', 'Too vague')}
+
+
+def test_approval_queue_pages_oldest_first_with_counts(client, make_user, team, cycle, auth_headers):
+    manager, employee = team
+    teammate = make_user(manager_id=manager.id, first_name='Tea', last_name='Mate')
+    _seed_goals(employee, cycle, 3)
+    _seed_goals(teammate, cycle, 3)
+    _seed_goals(make_user(), cycle, 3, status='pending_approval')  # someone else's report
+    headers = auth_headers(manager.id)
+    for member in (employee, teammate):
+        client.post('/api/goals/bulk/submit', json={'employee_id': member.id}, headers=headers)
+    Goal.query.filter_by(employee_id=teammate.id, title='Goal 0').update({'approval_status': 'approved'})
+    db.session.commit()
+
+    first = client.get('/api/goals/approval-queue?limit=3', headers=headers).get_json()
+    rest = client.get(f"/api/goals/approval-queue?limit=3&after={first['next_cursor']}", headers=headers).get_json()
+
+    assert first['has_more'] is True and rest['has_more'] is False and rest['next_cursor'] is None
+    rows = first['goals'] + rest['goals']
+    assert len(rows) == len({r['id'] for r in rows}) == 5
+    assert [r['submitted_at'] for r in rows] == sorted(r['submitted_at'] for r in rows)
+    assert {r['employee_name'] for r in rows} == {'Tea Mate', f'{employee.first_name} {employee.last_name}'}
+    assert [(c['employee_id'], c['pending']) for c in first['pending_by_employee']] == \
+        [(employee.id, 3), (teammate.id, 2)]
+    assert first['total_pending'] == 5
+
+
+def test_approval_queue_all_scope_is_hr_only(client, team, make_user, auth_headers):
+    manager, _ = team
+    hr = make_user(role='hr_admin')
+    assert client.get('/api/goals/approval-queue?scope=all', headers=auth_headers(manager.id)).status_code == 403
+    assert client.get('/api/goals/approval-queue?scope=all', headers=auth_headers(hr.id)).status_code == 200
+    assert client.get('/api/goals/approval-queue?after=junk', headers=auth_headers(hr.id)).status_code == 400
+
+
+def test_single_transition_failure_commits_nothing(team, cycle):
+    from services.approval_workflow import ApprovalWorkflow
+
+    manager, employee = team
+    goal = db.session.get(Goal, _seed_goals(employee, cycle, 1)[0])
+    goal.title = 'Unsaved edit'
+
+    with pytest.raises(ValueError, match='not pending approval'):
+        ApprovalWorkflow.approve_goal(goal, manager.id, 'manager')
+
+    db.session.rollback()
+    assert db.session.get(Goal, goal.id).title == 'Goal 0'
+    assert GoalAudit.query.count() == 0
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from extensions import db
+from models.goal import Goal
+from models.goal_comment import GoalComment
+from models.goal_comment_reaction import GoalCommentReaction
+
+T0 = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def author(make_user):
+    return make_user(job_title='Engineer')
+
+
+def _seed_thread(author, top_level, replies_each=2):
+    goal = Goal(employee_id=author.id, title='Ship it', goal_type='performance')
+    db.session.add(goal)
+    db.session.flush()
+    tick = iter(range(10000))
+    for i in range(top_level):
+        comment = GoalComment(goal_id=goal.id, author_id=author.id, content=f'Update {i}',
+                              created_at=T0 + timedelta(minutes=next(tick)))
+        db.session.add(comment)
+        db.session.flush()
+        for j in range(replies_each):
+            reply = GoalComment(goal_id=goal.id, author_id=author.id if j else 'gone-user', content=f'Re {i}.{j}',
+                                reply_to_id=comment.id, is_deleted=(j == 1),
+                                created_at=T0 + timedelta(minutes=next(tick)))
+            db.session.add(reply)
+            db.session.flush()
+            db.session.add(GoalCommentReaction(comment_id=reply.id, user_id='u1', emoji='🎉'))
+        for user_id, emoji in (('u1', '👍'), ('u2', '👍'), ('u2', '🚀')):
+            db.session.add(GoalCommentReaction(comment_id=comment.id, user_id=user_id, emoji=emoji,
+                                               created_at=T0 + timedelta(seconds=next(tick))))
+    db.session.commit()
+    return goal
+
+
+def _legacy_threads(goal_id):
+    result = []
+    for comment in GoalComment.query.filter_by(goal_id=goal_id, reply_to_id=None) \
+            .order_by(GoalComment.created_at.desc()).all():
+        c = comment.to_dict()
+        replies = GoalComment.query.filter_by(reply_to_id=comment.id).order_by(GoalComment.created_at.asc()).all()
+        c['replies'] = [r.to_dict() for r in replies]
+        result.append(c)
+    return result
+
+
+def _sorted_users(threads):
+    for c in threads:
+        for summary in c['reactions'].values():
+            summary['users'].sort()
+        _sorted_users(c.get('replies', []))
+    return threads
+
+
+def test_list_comments_matches_per_comment_serialization(client, author, auth_headers):
+    goal = _seed_thread(author, 3)
+
+    resp = client.get(f'/api/goals/{goal.id}/comments', headers=auth_headers(author.id))
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert _sorted_users(body) == _sorted_users(_legacy_threads(goal.id))
+    assert body[0]['reply_count'] == 1
+    assert body[0]['reactions']['👍'] == {'count': 2, 'users': ['u1', 'u2']}
+
+
+def test_list_comments_uses_constant_queries(client, author, auth_headers, count_queries):
+    headers = auth_headers(author.id)
+    small, large = _seed_thread(author, 2), _seed_thread(author, 15)
+    client.get(f'/api/goals/{small.id}/comments', headers=headers)  # warm the identity cache
+
+    counts = []
+    for goal in (small, large):
+        db.session.expire_all()
+        with count_queries() as counter:
+            client.get(f'/api/goals/{goal.id}/comments', headers=headers)
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
+
+
+def test_list_comments_paginates_top_level(client, author, auth_headers):
+    goal = _seed_thread(author, 5, replies_each=1)
+
+    resp = client.get(f'/api/goals/{goal.id}/comments?page=2&per_page=2', headers=auth_headers(author.id))
+
+    body = resp.get_json()
+    assert body['total'] == 5
+    assert [c['content'] for c in body['comments']] == ['Update 2', 'Update 1']
+    assert [r['content'] for r in body['comments'][0]['replies']] == ['Re 2.0']
+
+
+def test_since_returns_changes_and_tombstones(client, author, auth_headers):
+    headers = auth_headers(author.id)
+    goal = _seed_thread(author, 2, replies_each=0)
+    first = client.get(f'/api/goals/{goal.id}/comments', headers=headers)
+    cursor = first.headers['X-Sync-Cursor']
+
+    old, edited = first.get_json()
+    # Comments changed within the overlap window are re-sent; clients upsert by id.
+    resent = client.get(f'/api/goals/{goal.id}/comments?since={cursor}', headers=headers).get_json()
+    assert sorted(c['id'] for c in resent['comments']) == sorted([old['id'], edited['id']])
+    assert resent['tombstones'] == [] and resent['has_more'] is False
+
+    client.delete(f"/api/goals/{goal.id}/comments/{old['id']}", headers=headers)
+    client.put(f"/api/goals/{goal.id}/comments/{edited['id']}", json={'content': 'Edited'}, headers=headers)
+    client.post(f'/api/goals/{goal.id}/comments', json={'content': 'New'}, headers=headers)
+
+    body = client.get(f'/api/goals/{goal.id}/comments?since={cursor}', headers=headers).get_json()
+
+    assert [t['id'] for t in body['tombstones']] == [old['id']]
+    assert [(c['content'], c['is_edited']) for c in body['comments']] == [('Edited', True), ('New', False)]
+    again = client.get(f"/api/goals/{goal.id}/comments?since={body['cursor']}", headers=headers).get_json()
+    assert [t['id'] for t in again['tombstones']] == [old['id']]
+    assert [c['content'] for c in again['comments']] == ['Edited', 'New']
+
+
+def test_since_sees_reaction_toggles(client, author, auth_headers):
+    headers = auth_headers(author.id)
+    goal = _seed_thread(author, 1, replies_each=0)
+    cursor = client.get(f'/api/goals/{goal.id}/comments', headers=headers).headers['X-Sync-Cursor']
+    comment_id = GoalComment.query.filter_by(goal_id=goal.id).one().id
+
+    client.post(f'/api/goals/{goal.id}/comments/{comment_id}/react', json={'emoji': '👀'}, headers=headers)
+
+    body = client.get(f'/api/goals/{goal.id}/comments?since={cursor}', headers=headers).get_json()
+    assert body['comments'][0]['reactions']['👀'] == {'count': 1, 'users': [author.id]}
+
+
+def test_unchanged_comment_poll_returns_304(client, author, auth_headers, count_queries):
+    headers = auth_headers(author.id)
+    goal = _seed_thread(author, 3)
+    etag = client.get(f'/api/goals/{goal.id}/comments', headers=headers).headers['ETag']
+
+    with count_queries() as counter:
+        resp = client.get(f'/api/goals/{goal.id}/comments', headers={**headers, 'If-None-Match': etag})
+    assert resp.status_code == 304
+    assert not any('FROM goal_comment_reactions' in sql for sql in counter.statements)
+
+    client.post(f'/api/goals/{goal.id}/comments', json={'content': 'New'}, headers=headers)
+    assert client.get(f'/api/goals/{goal.id}/comments', headers={**headers, 'If-None-Match': etag}).status_code == 200
+
+
+def test_since_rejects_garbage_cursor(client, author, auth_headers):
+    goal = _seed_thread(author, 1)
+    resp = client.get(f'/api/goals/{goal.id}/comments?since=not-a-cursor', headers=auth_headers(author.id))
+    assert resp.status_code == 400
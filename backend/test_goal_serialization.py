@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.department import Department
+from models.goal import Goal
+from models.key_result import KeyResult
+
+
+@pytest.fixture
+def cycle(app):
+    cycle = AppraisalCycle(name='FY26', start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), status='active')
+    db.session.add(cycle)
+    db.session.commit()
+    return cycle
+
+
+def _seed_goals(employee, cycle, count):
+    dept = Department(name=f'Dept {employee.id[:8]}')
+    db.session.add(dept)
+    db.session.flush()
+    goals = []
+    for i in range(count):
+        goal = Goal(
+            employee_id=employee.id,
+            appraisal_cycle_id=cycle.id,
+            title=f'Goal {i}',
+            goal_type='performance',
+            approval_status='approved',
+            department_id=dept.id if i % 2 else None,
+        )
+        db.session.add(goal)
+        db.session.flush()
+        for j in range(2):
+            db.session.add(KeyResult(goal_id=goal.id, title=f'KR {i}.{j}'))
+        goals.append(goal)
+    db.session.commit()
+    return goals
+
+
+def test_serialize_many_matches_to_dict(make_user, cycle):
+    employee = make_user()
+    goals = _seed_goals(employee, cycle, 4)
+    goals.append(Goal(employee_id='missing-user', title='Orphan', appraisal_cycle_id=cycle.id))
+    db.session.add(goals[-1])
+    db.session.commit()
+
+    assert Goal.serialize_many(goals) == [g.to_dict() for g in goals]
+    assert Goal.serialize_many([]) == []
+
+
+def _query_count(count_queries, fn):
+    db.session.expire_all()
+    with count_queries() as counter:
+        fn()
+    return counter.count
+
+
+@pytest.mark.parametrize('endpoint', ['/api/goals/?scope=mine', '/api/goals/stats/me'])
+def test_goal_endpoints_issue_constant_queries(client, make_user, auth_headers, cycle, count_queries, endpoint):
+    small, large = make_user(), make_user()
+    _seed_goals(small, cycle, 2)
+    _seed_goals(large, cycle, 12)
+
+    small_count = _query_count(count_queries, lambda: client.get(endpoint, headers=auth_headers(small.id)))
+    large_count = _query_count(count_queries, lambda: client.get(endpoint, headers=auth_headers(large.id)))
+
+    assert large_count == small_count
+
+
+def test_fetch_goals_for_appraisal_issues_constant_queries(make_user, cycle, count_queries):
+    from routes.appraisals import _fetch_goals_for_appraisal
+
+    counts = []
+    for n in (2, 12):
+        employee = make_user()
+        _seed_goals(employee, cycle, n)
+        appraisal = Appraisal(cycle_id=cycle.id, employee_id=employee.id)
+        db.session.add(appraisal)
+        db.session.commit()
+        counts.append(_query_count(count_queries, lambda: _fetch_goals_for_appraisal(appraisal)))
+
+    assert counts[0] == counts[1]
+
+
+def test_sync_appraisal_status_issues_constant_queries(make_user, cycle, count_queries):
+    from routes.goals import _sync_appraisal_status
+
+    counts = []
+    for n in (3, 7):
+        employee = make_user()
+        goals = _seed_goals(employee, cycle, n)
+        db.session.add(Appraisal(cycle_id=cycle.id, employee_id=employee.id, status='goals_approved'))
+        db.session.commit()
+        counts.append(_query_count(count_queries, lambda: _sync_appraisal_status(goals[0])))
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+from sqlalchemy import update
+
+from extensions import db
+from models.goal import Goal
+
+TODAY = date.today()
+
+# (status, progress, target offset in days, approval_status); None progress is stored as NULL
+GOALS = [
+    ('completed', 100, -10, 'approved'),
+    ('active', 100, -10, 'approved'),
+    ('active', 40, -3, 'approved'),      # overdue
+    ('active', None, 30, 'approved'),
+    ('active', None, -2, 'approved'),    # overdue
+    ('active', 0, None, 'approved'),
+    ('in_progress', 100, 5, 'approved'),  # counts as both in_progress and completed
+    ('not_started', 0, -1, 'approved'),   # overdue
+    ('cancelled', 10, -5, 'approved'),
+    ('on_hold', 20, None, 'approved'),
+    ('active', 0, 10, 'draft'),           # hidden performance draft
+]
+
+
+def _seed(employee):
+    for i, (status, progress, offset, approval) in enumerate(GOALS):
+        db.session.add(Goal(
+            employee_id=employee.id, title=f'Goal {i}', goal_type='performance', status=status,
+            progress_percentage=progress, approval_status=approval,
+            target_date=TODAY + timedelta(days=offset) if offset is not None else None,
+        ))
+    db.session.flush()
+    # The column default turns None into 0 on insert; force real NULLs
+    db.session.execute(update(Goal).where(Goal.employee_id == employee.id,
+                                          Goal.title.in_([f'Goal {i}' for i, g in enumerate(GOALS) if g[1] is None]))
+                       .values(progress_percentage=None))
+    db.session.commit()
+
+
+def test_stats_me_counts_in_sql(client, make_user, auth_headers, count_queries):
+    employee = make_user()
+    _seed(employee)
+    headers = auth_headers(employee.id)
+    client.get('/api/goals/stats/me', headers=headers)  # warm the identity cache
+
+    with count_queries() as counter:
+        body = client.get('/api/goals/stats/me', headers=headers).get_json()
+
+    assert body == {
+        'total': 10, 'completed': 3, 'in_progress': 2, 'not_started': 4, 'overdue': 3,
+        'average_progress': (100 + 100 + 40 + 0 + 0 + 0 + 100 + 0 + 10 + 20) / 10,
+    }
+    assert counter.count == 1
+
+
+def test_list_filters_agree_with_summary(client, make_user, auth_headers):
+    manager = make_user(role='manager')
+    employee = make_user(manager_id=manager.id)
+    _seed(employee)
+    headers = auth_headers(manager.id)
+
+    summary = client.get('/api/goals/reports/summary?scope=team', headers=headers).get_json()
+
+    assert summary['total'] == len(GOALS)
+    for state in ('completed', 'in_progress', 'not_started', 'overdue'):
+        listed = client.get(f'/api/goals/?scope=team&status={state}', headers=headers).get_json()
+        assert listed['total'] == summary[state], state
+
+
+def test_summary_all_scope_is_hr_only(client, make_user, auth_headers):
+    assert client.get('/api/goals/reports/summary?scope=all',
+                      headers=auth_headers(make_user().id)).status_code == 403
+    body = client.get('/api/goals/reports/summary?scope=all', headers=auth_headers(make_user(role='hr_admin').id))
+    assert body.get_json()['total'] == 0
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from extensions import db
+from models.user_auth import UserAuth
+from models.user_profile import UserProfile
+from utils import graph_client
+from utils.graph_client import GraphClient
+
+PHOTO = b'\x89PNG fake image'
+RESPONSES = {
+    '/me': {'id': 'oid-1', 'displayName': 'Ada Lovelace', 'mail': 'ada@example.com',
+            'department': 'Engineering', 'jobTitle': 'Engineer'},
+    '/me/manager': {'id': 'oid-boss', 'displayName': 'Boss', 'mail': 'boss@example.com'},
+    '/me/directReports': {'value': [{'id': 'oid-2', 'displayName': 'Report', 'mail': 'report@example.com'}]},
+}
+
+
+class FakeGraph:
+    """Local Graph API stub with per-path delays; records paths and client connections."""
+
+    def __init__(self):
+        self.delays = {}
+        self.paths = []
+        self.connections = set()
+        graph = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                graph.paths.append(path)
+                graph.connections.add(self.client_address)
+                time.sleep(graph.delays.get(path, 0))
+                if path == '/me/photo/$value':
+                    body, content_type = PHOTO, 'image/png'
+                elif path in RESPONSES:
+                    body, content_type = json.dumps(RESPONSES[path]).encode(), 'application/json'
+                else:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    fake = FakeGraph()
+    monkeypatch.setattr(graph_client, 'GRAPH_API_URL', fake.url)
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
+
+
+def test_login_lookups_run_concurrently_on_pooled_connections(graph):
+    graph.delays = {'/me': 0.3, '/me/manager': 0.3, '/me/directReports': 0.3}
+
+    started = time.monotonic()
+    context = GraphClient.get_login_context('token')
+    assert time.monotonic() - started < 0.8
+    assert context['me']['department'] == 'Engineering'
+    assert context['manager']['email'] == 'boss@example.com'
+    assert [r['azure_oid'] for r in context['direct_reports']] == ['oid-2']
+
+    connections = len(graph.connections)
+    GraphClient.get_login_context('token')
+    assert len(graph.connections) == connections  # second login reused the kept-alive connections
+
+
+def test_lookups_past_the_deadline_are_unknown(graph):
+    graph.delays = {'/me/manager': 1.5, '/me/directReports': 1.5}
+
+    started = time.monotonic()
+    context = GraphClient.get_login_context('token', deadline_seconds=0.3)
+    assert time.monotonic() - started < 1.0
+    assert context['manager'] is None and context['direct_reports'] is None
+    assert context['me']['azure_oid'] == 'oid-1'
+
+
+def test_deferred_work_does_not_delay_login_lookups(graph):
+    release = threading.Event()
+    blocked = [GraphClient.defer(release.wait) for _ in range(graph_client.GRAPH_POOL_SIZE * 2)]
+    try:
+        context = GraphClient.get_login_context('token', deadline_seconds=2)
+        assert context['direct_reports'] is not None
+    finally:
+        release.set()
+    assert all(future.result(5) for future in blocked)
+
+
+def test_unknown_direct_reports_keep_manager_role(client, make_user, graph, monkeypatch):
+    manager = make_user(role='manager', email='ada@example.com')
+    monkeypatch.setattr('routes.auth.validate_azure_token', lambda token: {
+        'oid': 'oid-1', 'preferred_username': 'ada@example.com', 'name': 'Ada Lovelace',
+    })
+    monkeypatch.setattr(graph_client, 'GRAPH_LOGIN_DEADLINE_SECONDS', 0.3)
+    graph.delays = {'/me/directReports': 1.5}
+
+    resp = client.post('/api/auth/azure/callback', json={'id_token': 'x', 'access_token': 'graph-token'})
+    assert resp.status_code == 200
+    assert resp.get_json()['user']['role'] == 'manager'
+    assert db.session.get(UserAuth, manager.id).role == 'manager'
+
+
+def test_azure_callback_fetches_photo_after_login(client, graph, monkeypatch):
+    monkeypatch.setattr('routes.auth.validate_azure_token', lambda token: {
+        'oid': 'oid-1', 'preferred_username': 'ada@example.com', 'name': 'Ada Lovelace',
+    })
+
+    resp = client.post('/api/auth/azure/callback', json={'id_token': 'x', 'access_token': 'graph-token'})
+    assert resp.status_code == 200
+    assert resp.get_json()['user']['role'] == 'manager'  # has direct reports
+
+    user = UserAuth.query.filter_by(email='ada@example.com').one()
+    profile = db.session.get(UserProfile, user.id)
+    db.session.refresh(profile)
+    assert profile.job_title == 'Engineer'
+    assert profile.avatar_url.startswith('data:image/png;base64,')
+    assert graph.paths[-1] == '/me/photo/$value'
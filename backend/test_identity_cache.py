@@ -0,0 +1,77 @@
+from extensions import db
+from models.user_auth import UserAuth
+from utils.identity_cache import IdentityCache, identity_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = IdentityCache(ttl_seconds=30, max_entries=10, clock=clock)
+    cache.set('u1', {'user_id': 'u1', 'role': 'employee'})
+
+    clock.now = 29
+    assert cache.get('u1')['role'] == 'employee'
+
+    clock.now = 30
+    assert cache.get('u1') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = IdentityCache(ttl_seconds=30, max_entries=2, clock=FakeClock())
+    cache.set('u1', {'user_id': 'u1'})
+    cache.set('u2', {'user_id': 'u2'})
+    cache.get('u1')  # u2 is now least recently used
+    cache.set('u3', {'user_id': 'u3'})
+
+    assert cache.get('u1') is not None
+    assert cache.get('u2') is None
+    assert cache.get('u3') is not None
+
+
+def test_zero_ttl_disables_cache():
+    cache = IdentityCache(ttl_seconds=0)
+    cache.set('u1', {'user_id': 'u1'})
+    assert cache.get('u1') is None
+
+
+def test_repeat_requests_skip_user_lookup(client, make_user, auth_headers, count_queries):
+    user = make_user(role='employee')
+    headers = auth_headers(user.id)
+
+    client.get('/api/users/me', headers=headers)
+    with count_queries() as counter:
+        resp = client.get('/api/users/me', headers=headers)
+
+    assert resp.status_code == 200
+    assert not any('FROM user_auth' in s for s in counter.statements)
+
+
+def test_role_change_invalidates_cached_identity(client, make_user, auth_headers):
+    admin = make_user(role='hr_admin')
+    headers = auth_headers(admin.id)
+    assert client.get('/api/reports/goal-stats', headers=headers).status_code == 200
+    assert identity_cache.get(admin.id)['role'] == 'hr_admin'
+
+    db.session.get(UserAuth, admin.id).role = 'employee'
+    db.session.commit()
+
+    assert identity_cache.get(admin.id) is None
+    assert client.get('/api/reports/goal-stats', headers=headers).status_code == 403
+
+
+def test_deactivation_invalidates_cached_identity(client, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user.id)
+    assert client.get('/api/users/me', headers=headers).status_code == 200
+
+    db.session.get(UserAuth, user.id).is_active = False
+    db.session.commit()
+
+    assert client.get('/api/users/me', headers=headers).status_code == 401
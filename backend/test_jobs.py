@@ -0,0 +1,205 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.background_job import BackgroundJob
+from services.job_runner import job_runner
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def hr_headers(make_user, auth_headers):
+    return auth_headers(make_user(role='hr_admin', start_date=TODAY - timedelta(days=900)).id)
+
+
+def _make_cycle(**kwargs):
+    cycle = AppraisalCycle(
+        name='FY',
+        cycle_type=kwargs.pop('cycle_type', 'annual'),
+        status=kwargs.pop('status', 'draft'),
+        start_date=TODAY - timedelta(days=200),
+        end_date=TODAY + timedelta(days=150),
+        **kwargs,
+    )
+    db.session.add(cycle)
+    db.session.commit()
+    return cycle
+
+
+def test_activate_enqueues_job_and_returns_202(client, make_user, hr_headers):
+    make_user(start_date=TODAY - timedelta(days=700))
+    cycle = _make_cycle()
+
+    resp = client.post(f'/api/cycles/{cycle.id}/activate', json={}, headers=hr_headers)
+
+    assert resp.status_code == 202
+    body = resp.get_json()
+    assert body['cycle']['status'] == 'active'
+    job_id = body['job']['id']
+
+    polled = client.get(f'/api/jobs/{job_id}', headers=hr_headers).get_json()
+    assert polled['status'] == 'succeeded'
+    assert polled['progress'] == 100
+    assert polled['result'] == {'created': 2, 'skipped': 0, 'notified': 2}
+    assert Appraisal.query.filter_by(cycle_id=cycle.id).count() == 2
+
+
+def test_annual_activation_chains_spillover_job(client, make_user, hr_headers):
+    make_user(start_date=TODAY - timedelta(days=20))  # still in probation
+    cycle = _make_cycle(eligibility_cutoff_date=TODAY - timedelta(days=180))
+
+    job = client.post(f'/api/cycles/{cycle.id}/activate', json={}, headers=hr_headers).get_json()['job']
+    job = client.get(f"/api/jobs/{job['id']}", headers=hr_headers).get_json()
+
+    spillover_job = db.session.get(BackgroundJob, job['result']['spillover_job_id'])
+    assert spillover_job.job_type == 'probation_spillover'
+    assert spillover_job.status == 'succeeded'
+    spillover = db.session.get(AppraisalCycle, spillover_job.result['spillover_cycle_id'])
+    assert spillover.parent_cycle_id == cycle.id
+    assert Appraisal.query.filter_by(cycle_id=spillover.id).count() == 1
+
+
+def test_sync_is_deduplicated_against_live_generation_job(client, hr_headers):
+    cycle = _make_cycle(status='active')
+    live = BackgroundJob(job_type='cycle_activation', resource_id=cycle.id, status='running',
+                         heartbeat_at=datetime.now(timezone.utc))
+    db.session.add(live)
+    db.session.commit()
+
+    resp = client.post(f'/api/cycles/{cycle.id}/sync-users', json={}, headers=hr_headers)
+
+    assert resp.status_code == 202
+    assert resp.get_json()['job']['id'] == live.id
+    assert BackgroundJob.query.count() == 1
+
+
+def test_resume_reruns_failed_and_stale_jobs_only(client, make_user, hr_headers):
+    make_user(start_date=TODAY - timedelta(days=700))
+    cycle = _make_cycle(status='active')
+    old = datetime.now(timezone.utc) - job_runner.stale_after - timedelta(seconds=1)
+    failed = BackgroundJob(job_type='cycle_sync', resource_id=cycle.id, status='failed', error='boom', attempts=1)
+    stale = BackgroundJob(job_type='cycle_sync', resource_id=cycle.id, status='running', heartbeat_at=old, attempts=1)
+    done = BackgroundJob(job_type='cycle_sync', resource_id=cycle.id, status='succeeded')
+    db.session.add_all([failed, stale, done])
+    db.session.commit()
+
+    assert client.get(f'/api/jobs/{stale.id}', headers=hr_headers).get_json()['is_stale'] is True
+
+    for job in (failed, stale):
+        resp = client.post(f'/api/jobs/{job.id}/resume', headers=hr_headers)
+        assert resp.status_code == 202
+        polled = client.get(f'/api/jobs/{job.id}', headers=hr_headers).get_json()
+        assert polled['status'] == 'succeeded'
+        assert polled['attempts'] == 2
+        assert polled['error'] is None
+
+    assert client.post(f'/api/jobs/{done.id}/resume', headers=hr_headers).status_code == 409
+    # Both runs were idempotent: one appraisal per eligible user.
+    assert Appraisal.query.filter_by(cycle_id=cycle.id).count() == 2
+
+
+def test_failed_handler_marks_job_failed(app, monkeypatch):
+    cycle = _make_cycle(status='active')
+    monkeypatch.setitem(job_runner._handlers, 'cycle_sync', lambda job, progress: 1 / 0)
+
+    job, created = job_runner.enqueue('cycle_sync', cycle.id)
+
+    assert created
+    job = db.session.get(BackgroundJob, job.id)
+    assert job.status == 'failed'
+    assert 'division by zero' in job.error
+
+
+def test_jobs_endpoints_require_hr(client, make_user, auth_headers):
+    job = BackgroundJob(job_type='cycle_sync', status='queued')
+    db.session.add(job)
+    db.session.commit()
+    headers = auth_headers(make_user().id)
+
+    assert client.get(f'/api/jobs/{job.id}', headers=headers).status_code == 403
+    assert client.post(f'/api/jobs/{job.id}/resume', headers=headers).status_code == 403
+
+
+def test_generation_reports_progress_per_chunk(make_user, monkeypatch):
+    from services.cycle_activation import generate_cycle_appraisals
+
+    for _ in range(5):
+        make_user(start_date=TODAY - timedelta(days=700))
+    cycle = _make_cycle(status='active')
+    reports = []
+
+    counts = generate_cycle_appraisals(cycle, chunk_size=2,
+                                       report_progress=lambda percent, message: reports.append(percent))
+
+    assert counts['created'] == 5
+    assert reports == [10, 42, 74, 90]  # eligibility, then one heartbeat per chunk of 2
+
+
+def test_one_live_job_per_slot_and_resource(app, monkeypatch):
+    cycle = _make_cycle(status='active')
+    live = BackgroundJob(job_type='cycle_activation', slot='cycle_generation', resource_id=cycle.id,
+                         status='running', heartbeat_at=datetime.now(timezone.utc))
+    db.session.add(live)
+    db.session.commit()
+
+    # A concurrent enqueue that missed the live job in find_active loses on the unique index
+    real_find_active = job_runner.find_active
+    calls = []
+
+    def find_active_missing_first(job_types, resource_id):
+        calls.append(resource_id)
+        return None if len(calls) == 1 else real_find_active(job_types, resource_id)
+
+    monkeypatch.setattr(job_runner, 'find_active', find_active_missing_first)
+    job, created = job_runner.enqueue('cycle_sync', cycle.id)
+
+    assert (job.id, created) == (live.id, False)
+    assert BackgroundJob.query.count() == 1
+
+
+def test_enqueue_retires_stale_job(app):
+    cycle = _make_cycle(status='active')
+    old = datetime.now(timezone.utc) - job_runner.stale_after - timedelta(seconds=1)
+    stale = BackgroundJob(job_type='cycle_sync', resource_id=cycle.id, status='running', heartbeat_at=old)
+    db.session.add(stale)
+    db.session.commit()
+
+    job, created = job_runner.enqueue('cycle_sync', cycle.id)
+
+    assert created and job.id != stale.id
+    assert db.session.get(BackgroundJob, job.id).status == 'succeeded'
+    assert db.session.get(BackgroundJob, stale.id).status == 'failed'
+
+
+def test_worker_only_runs_jobs_it_can_claim(app, monkeypatch):
+    cycle = _make_cycle(status='active')
+    calls = []
+    monkeypatch.setitem(job_runner._handlers, 'cycle_sync', lambda job, progress: calls.append(job.id) or {})
+    retired = BackgroundJob(job_type='cycle_sync', resource_id=cycle.id, status='failed', error='superseded')
+    db.session.add(retired)
+    db.session.commit()
+
+    job_runner._run(retired.id)  # e.g. the old future of a job retired while it waited in the pool
+
+    db.session.expire_all()
+    assert calls == []
+    assert (retired.status, retired.attempts) == ('failed', 0)
+
+
+def test_queued_jobs_are_not_stale_while_waiting(app, monkeypatch):
+    now = datetime.now(timezone.utc)
+    waiting = BackgroundJob(job_type='cycle_sync', status='queued',
+                            created_at=now - job_runner.stale_after - timedelta(seconds=1))
+    lost = BackgroundJob(job_type='cycle_sync', status='queued',
+                         created_at=now - job_runner.queued_stale_after - timedelta(seconds=1))
+    db.session.add_all([waiting, lost])
+    db.session.commit()
+
+    assert not job_runner.is_stale(waiting)  # just a backlog, well past the running-job threshold
+    assert job_runner.is_stale(lost)
+    monkeypatch.setattr(job_runner, '_pending', {lost.id})
+    assert not job_runner.is_stale(lost)  # still queued in this process's pool
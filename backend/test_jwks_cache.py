@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from utils import jwt_utils
+from utils.jwks_cache import JwksKeyCache
+
+TTL = 1000
+
+
+def _jwk(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key, {**json.loads(RSAAlgorithm.to_jwk(private_key.public_key())), 'kid': kid}
+
+
+class StubIdP:
+    """Local OIDC config + JWKS server counting the JWKS requests it serves."""
+
+    def __init__(self):
+        self.jwks = []
+        self.jwks_requests = 0
+        self.delay = 0
+        idp = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/.well-known/openid-configuration':
+                    body = {'jwks_uri': f'{idp.url}/keys'}
+                else:
+                    idp.jwks_requests += 1
+                    time.sleep(idp.delay)
+                    body = {'keys': idp.jwks}
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def cache(self, clock):
+        return JwksKeyCache(f'{self.url}/.well-known/openid-configuration', ttl_seconds=TTL, clock=clock)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def idp():
+    stub = StubIdP()
+    yield stub
+    stub.stop()
+
+
+def _wait_for_background_refresh():
+    for thread in threading.enumerate():
+        if thread.name == 'jwks-refresh':
+            thread.join(5)
+
+
+def test_keys_are_parsed_once_and_unknown_kids_negatively_cached(idp):
+    _, jwk = _jwk('k1')
+    idp.jwks = [jwk]
+    clock = FakeClock()
+    cache = idp.cache(clock)
+
+    key = cache.get_key('k1')
+    assert key is not None and cache.get_key('k1') is key
+    assert cache.get_key('bogus') is None  # just fetched: no refetch within min_refresh_interval
+    assert idp.jwks_requests == 1
+
+    clock.now = 60
+    assert cache.get_key('bogus') is None  # still negatively cached
+    assert cache.get_key('other') is None  # an unseen kid refetches once, in case keys rotated
+    assert cache.get_key('other') is None
+    assert idp.jwks_requests == 2
+
+
+def test_concurrent_cold_lookups_fetch_once(idp):
+    _, jwk = _jwk('k1')
+    idp.jwks, idp.delay = [jwk], 0.2
+    cache = idp.cache(FakeClock())
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_key('k1'))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert idp.jwks_requests == 1
+    assert len(results) == 10 and all(key is results[0] for key in results)
+
+
+def test_keys_refresh_in_background_before_expiry(idp):
+    _, old = _jwk('old')
+    _, new = _jwk('new')
+    idp.jwks = [old]
+    clock = FakeClock()
+    cache = idp.cache(clock)
+    assert cache.get_key('old') is not None
+
+    idp.jwks = [old, new]
+    clock.now = TTL * 0.9
+    assert cache.get_key('old') is not None  # served from cache while refreshing
+    _wait_for_background_refresh()
+    assert idp.jwks_requests == 2
+    assert cache.get_key('new') is not None
+
+    idp.stop()  # IdP unreachable: expired keys keep being served
+    clock.now = TTL * 3
+    assert cache.get_key('new') is not None
+
+
+def test_validate_azure_token_uses_cached_keys(idp, monkeypatch):
+    private_key, jwk = _jwk('signing')
+    idp.jwks = [jwk]
+    monkeypatch.setattr(jwt_utils, 'azure_jwks', idp.cache(FakeClock()))
+    monkeypatch.setattr(jwt_utils, 'AZURE_AD_CLIENT_ID', 'client-id')
+    monkeypatch.setattr(jwt_utils, 'AZURE_AD_TENANT_ID', 'tenant-id')
+    now = datetime.now(timezone.utc)
+    claims = {
+        'aud': jwt_utils.AZURE_AD_CLIENT_ID,
+        'iss': f'https://login.microsoftonline.com/{jwt_utils.AZURE_AD_TENANT_ID}/v2.0',
+        'iat': now, 'exp': now + timedelta(minutes=5), 'preferred_username': 'user@example.com',
+    }
+
+    for _ in range(3):
+        token = jwt.encode(claims, private_key, algorithm='RS256', headers={'kid': 'signing'})
+        assert jwt_utils.validate_azure_token(token)['preferred_username'] == 'user@example.com'
+    assert idp.jwks_requests == 1
+
+    forged = jwt.encode(claims, _jwk('signing')[0], algorithm='RS256', headers={'kid': 'signing'})
+    with pytest.raises(jwt.InvalidTokenError):
+        jwt_utils.validate_azure_token(forged)
+    with pytest.raises(jwt.InvalidTokenError):
+        jwt_utils.validate_azure_token(jwt.encode(claims, private_key, algorithm='RS256', headers={'kid': 'x'}))
@@ -0,0 +1,223 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from extensions import db
+from models.notification import Notification
+from models.notification_archive import NotificationArchive
+from models.notification_counter import NotificationCounter
+from services.notification_service import NotificationService
+
+T0 = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+def _seed(recipient_id, count):
+    notifications = [
+        Notification(recipient_id=recipient_id, event='goal_approved',
+                     created_at=T0 + timedelta(minutes=i), updated_at=T0 + timedelta(minutes=i))
+        for i in range(count)
+    ]
+    db.session.add_all(notifications)
+    db.session.commit()
+    return notifications
+
+
+def test_list_is_limited_newest_first(client, user, auth_headers):
+    notifications = _seed(user.id, 5)
+
+    body = client.get('/api/goals/notifications?limit=2', headers=auth_headers(user.id)).get_json()
+
+    assert [n['id'] for n in body] == [notifications[4].id, notifications[3].id]
+
+
+def test_since_returns_new_and_updated_notifications(client, user, auth_headers):
+    headers = auth_headers(user.id)
+    notifications = _seed(user.id, 3)
+    cursor = client.get('/api/goals/notifications', headers=headers).headers['X-Sync-Cursor']
+    _seed('someone-else', 1)
+
+    client.post(f'/api/goals/notifications/{notifications[0].id}/read', headers=headers)
+    fresh = Notification(recipient_id=user.id, event='cycle_started')
+    db.session.add(fresh)
+    db.session.commit()
+
+    body = client.get(f'/api/goals/notifications?since={cursor}', headers=headers).get_json()
+
+    assert [(n['id'], n['is_read']) for n in body['notifications']] == [(notifications[0].id, True), (fresh.id, False)]
+    assert body['has_more'] is False
+    # Changes inside the overlap window are re-sent, never dropped.
+    again = client.get(f"/api/goals/notifications?since={body['cursor']}", headers=headers).get_json()
+    assert [n['id'] for n in again['notifications']] == [notifications[0].id, fresh.id]
+
+
+def test_since_sees_rows_that_commit_after_later_timestamps(client, user, auth_headers):
+    headers = auth_headers(user.id)
+    _seed(user.id, 1)
+    delivered = Notification(recipient_id=user.id, event='cycle_started')
+    db.session.add(delivered)
+    db.session.commit()
+    cursor = client.get('/api/goals/notifications?since=2026-01-01T00:00:00Z', headers=headers).get_json()['cursor']
+
+    # Stamped before `delivered` but committed after it was served, like a row
+    # written inside a long transaction.
+    late = Notification(recipient_id=user.id, event='goal_approved',
+                        updated_at=delivered.updated_at - timedelta(seconds=1))
+    db.session.add(late)
+    db.session.commit()
+
+    body = client.get(f'/api/goals/notifications?since={cursor}', headers=headers).get_json()
+
+    assert late.id in [n['id'] for n in body['notifications']]
+
+
+def test_since_cursor_moves_past_settled_rows(client, user, auth_headers):
+    headers = auth_headers(user.id)
+    _seed(user.id, 2)
+
+    body = client.get('/api/goals/notifications?since=2026-01-01T00:00:00Z', headers=headers).get_json()
+
+    assert len(body['notifications']) == 2
+    assert client.get(f"/api/goals/notifications?since={body['cursor']}", headers=headers) \
+        .get_json()['notifications'] == []
+
+
+def test_since_pages_through_changes(client, user, auth_headers):
+    headers = auth_headers(user.id)
+    notifications = _seed(user.id, 5)
+
+    first = client.get('/api/goals/notifications?since=2026-01-01T00:00:00Z&limit=3', headers=headers).get_json()
+    rest = client.get(f"/api/goals/notifications?since={first['cursor']}&limit=3", headers=headers).get_json()
+
+    assert first['has_more'] is True and rest['has_more'] is False
+    assert [n['id'] for n in first['notifications'] + rest['notifications']] == [n.id for n in notifications]
+
+
+def test_read_all_bumps_updated_at(client, user, auth_headers):
+    headers = auth_headers(user.id)
+    _seed(user.id, 2)
+    cursor = client.get('/api/goals/notifications', headers=headers).headers['X-Sync-Cursor']
+
+    client.post('/api/goals/notifications/read-all', headers=headers)
+
+    changed = client.get(f'/api/goals/notifications?since={cursor}', headers=headers).get_json()['notifications']
+    assert [n['is_read'] for n in changed] == [True, True]
+
+
+def test_unchanged_poll_returns_304(client, user, auth_headers):
+    headers = auth_headers(user.id)
+    _seed(user.id, 2)
+    etag = client.get('/api/goals/notifications', headers=headers).headers['ETag']
+
+    assert client.get('/api/goals/notifications', headers={**headers, 'If-None-Match': etag}).status_code == 304
+    _seed(user.id, 1)
+    assert client.get('/api/goals/notifications', headers={**headers, 'If-None-Match': etag}).status_code == 200
+
+
+def test_inbox_pages_newest_first_with_cursor(client, user, auth_headers):
+    headers = auth_headers(user.id)
+    notifications = _seed(user.id, 5)
+
+    first = client.get('/api/goals/notifications/inbox?limit=2', headers=headers).get_json()
+    second = client.get(f"/api/goals/notifications/inbox?limit=2&before={first['next_cursor']}", headers=headers).get_json()
+    last = client.get(f"/api/goals/notifications/inbox?limit=2&before={second['next_cursor']}", headers=headers).get_json()
+
+    pages = [first, second, last]
+    assert [n['id'] for page in pages for n in page['notifications']] == [n.id for n in reversed(notifications)]
+    assert last['next_cursor'] is None
+    assert first['unread_count'] == 5
+
+
+def test_unread_counter_is_maintained_without_count(client, user, auth_headers, count_queries):
+    headers = auth_headers(user.id)
+    _seed(user.id, 3)  # before the counter exists
+    assert client.get('/api/goals/notifications/unread-count', headers=headers).get_json() == {'unread_count': 3}
+
+    NotificationService.create_notification(user.id, 'goal_approved')
+    NotificationService.create_notification(user.id, 'goal_rejected')
+    db.session.commit()
+    with count_queries() as counter:
+        assert client.get('/api/goals/notifications/unread-count', headers=headers).get_json()['unread_count'] == 5
+    assert not any('count(' in sql.lower() for sql in counter.statements)
+
+    target = Notification.query.filter_by(recipient_id=user.id).first()
+    client.post(f'/api/goals/notifications/{target.id}/read', headers=headers)
+    client.post(f'/api/goals/notifications/{target.id}/read', headers=headers)  # already read: no change
+    assert NotificationService.unread_count(user.id) == 4
+
+    client.post('/api/goals/notifications/read-all', headers=headers)
+    assert NotificationService.unread_count(user.id) == 0
+
+
+def test_first_change_seeds_the_counter_from_the_table(client, user, auth_headers, count_queries):
+    headers = auth_headers(user.id)
+    seeded = _seed(user.id, 3)  # before the counter exists
+
+    # The change that creates the row counts what is already there, so one
+    # that lands between another request's COUNT and its insert isn't lost.
+    client.post(f'/api/goals/notifications/{seeded[0].id}/read', headers=headers)
+    assert db.session.get(NotificationCounter, user.id).unread_count == 2
+    NotificationService.create_notification(user.id, 'goal_approved')
+    db.session.commit()
+
+    with count_queries() as counter:
+        assert client.get('/api/goals/notifications/unread-count', headers=headers).get_json()['unread_count'] == 3
+    assert not any('count(' in sql.lower() for sql in counter.statements)
+
+
+def test_retention_job_archives_old_read_notifications(client, make_user, user, auth_headers):
+    hr = make_user(role='hr_admin')
+    old_read, old_unread, recent_read = _seed(user.id, 3)
+    old = datetime.now(timezone.utc) - timedelta(days=120)
+    old_read.created_at = old_unread.created_at = old
+    recent_read.created_at = datetime.now(timezone.utc) - timedelta(days=10)
+    old_read.is_read = recent_read.is_read = True
+    db.session.commit()
+    archived_id = old_read.id
+    NotificationService.unread_count(user.id)
+    db.session.execute(update(NotificationCounter).values(unread_count=7))  # drifted
+    db.session.commit()
+
+    resp = client.post('/api/goals/notifications/archive', json={'older_than_days': 90}, headers=auth_headers(hr.id))
+
+    assert resp.status_code == 202
+    job = client.get(f"/api/jobs/{resp.get_json()['job']['id']}", headers=auth_headers(hr.id)).get_json()
+    assert job['result'] == {'archived': 1, 'counters_reconciled': 1}
+    assert {n.id for n in Notification.query.all()} == {old_unread.id, recent_read.id}
+    archived = db.session.get(NotificationArchive, archived_id)
+    assert archived.recipient_id == user.id and archived.archived_at is not None
+    assert NotificationService.unread_count(user.id) == 1
+
+
+def test_bulk_fan_out_dedupes_and_keeps_counters(make_user, user, count_queries):
+    others = [make_user() for _ in range(4)]
+    NotificationService.unread_count(user.id)
+    NotificationService.create_notification(user.id, 'cycle_started', resource_type='appraisal_cycle', resource_id='c1')
+    db.session.commit()
+
+    recipients = [user.id] + [u.id for u in others] + [others[0].id, None]
+    with count_queries() as counter:
+        result = NotificationService.create_notifications_bulk(
+            recipients, 'cycle_started', triggered_by='system',
+            resource_type='appraisal_cycle', resource_id='c1', chunk_size=2,
+        )
+    db.session.commit()
+
+    assert result == {'created': 4, 'skipped': 2}
+    assert sum('INSERT INTO notifications' in sql for sql in counter.statements) == 3  # one per chunk
+    assert sorted(n.recipient_id for n in Notification.query.filter_by(resource_id='c1')) == \
+        sorted([user.id] + [u.id for u in others])
+    assert NotificationService.unread_count(user.id) == 1
+
+    # A read notification no longer blocks a new one; another resource never did.
+    Notification.query.filter_by(recipient_id=user.id).update({'is_read': True})
+    db.session.commit()
+    assert NotificationService.create_notifications_bulk(
+        [user.id], 'cycle_started', resource_type='appraisal_cycle', resource_id='c1') == {'created': 1, 'skipped': 0}
+    assert NotificationService.create_notifications_bulk(
+        [user.id], 'cycle_started', resource_type='appraisal_cycle', resource_id='c2') == {'created': 1, 'skipped': 0}
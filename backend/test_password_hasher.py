@@ -0,0 +1,70 @@
+import threading
+
+import bcrypt
+import pytest
+
+from extensions import db
+from models.user_auth import UserAuth
+from utils.password_hasher import HasherBusy, PasswordHasher, password_hasher
+
+PASSWORD = 'Sup3r-secret!'
+
+
+@pytest.fixture
+def local_user(make_user):
+    user = db.session.get(UserAuth, make_user().id)
+    user.password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=5)).decode()
+    db.session.commit()
+    return user
+
+
+def test_login_rehashes_at_configured_cost(client, local_user):
+    assert password_hasher.needs_rehash(local_user.password_hash)
+    assert client.post('/api/auth/login', json={'email': local_user.email, 'password': 'wrong'}).status_code == 401
+
+    resp = client.post('/api/auth/login', json={'email': local_user.email, 'password': PASSWORD})
+    assert resp.status_code == 200
+    assert local_user.password_hash.startswith('$2b$04$')
+    assert bcrypt.checkpw(PASSWORD.encode(), local_user.password_hash.encode())
+
+    stats = password_hasher.stats()
+    assert (stats['verify']['calls'], stats['hash']['calls'], stats['in_flight']) == (2, 1, 0)
+
+
+def test_saturated_hasher_sheds_with_503(client, local_user, monkeypatch, make_user, auth_headers):
+    monkeypatch.setattr(password_hasher, 'pool_size', 0)
+    monkeypatch.setattr(password_hasher, 'max_queue', 0)
+
+    resp = client.post('/api/auth/login', json={'email': local_user.email, 'password': PASSWORD})
+    assert resp.status_code == 503
+    assert resp.headers['Retry-After'] == '5'
+    assert local_user.failed_login_count == 0
+
+    resp = client.post('/api/auth/register', json={'email': 'new@example.com', 'password': PASSWORD})
+    assert resp.status_code == 503
+    assert UserAuth.query.filter_by(email='new@example.com').first() is None
+
+    stats = client.get('/api/auth/password-hasher/stats', headers=auth_headers(make_user(role='hr_admin').id))
+    assert stats.get_json()['rejected'] == 2
+
+
+def test_busy_pool_times_out_then_rejects_callers():
+    hasher = PasswordHasher(rounds=4, pool_size=1, max_queue=1, max_wait_seconds=0.05)
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+    release = threading.Event()
+    hasher._get_executor().submit(release.wait)  # occupy the only thread
+    hasher._in_flight = 1  # ...and count it, as _run would
+
+    try:
+        with pytest.raises(HasherBusy):  # queued behind the busy thread for longer than max_wait
+            hasher.verify(PASSWORD, password_hash)
+        hasher._in_flight = 2
+        with pytest.raises(HasherBusy):  # pool + queue full: rejected without waiting
+            hasher.hash(PASSWORD)
+    finally:
+        release.set()
+        hasher._in_flight = 0
+
+    assert hasher.verify(PASSWORD, password_hash) is True
+    stats = hasher.stats()
+    assert (stats['timed_out'], stats['rejected'], stats['verify']['calls']) == (1, 1, 1)
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+import bcrypt
+import pytest
+
+from extensions import db
+from models.refresh_token import RefreshToken
+from models.user_auth import UserAuth
+from utils import jwt_utils
+
+
+@pytest.fixture
+def user(make_user):
+    return db.session.get(UserAuth, make_user().id)
+
+
+@pytest.fixture
+def no_bcrypt(monkeypatch):
+    def _fail(*args):
+        raise AssertionError('bcrypt used for an rt2 token')
+    monkeypatch.setattr(jwt_utils.bcrypt, 'checkpw', _fail)
+
+
+def _legacy_token(user, secret='legacy-secret'):
+    rt = RefreshToken(
+        user_id=user.id,
+        token_hash=bcrypt.hashpw(secret.encode(), bcrypt.gensalt(rounds=4)).decode(),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+    )
+    db.session.add(rt)
+    db.session.commit()
+    return rt
+
+
+def test_rt2_tokens_verify_by_digest(client, user, no_bcrypt, count_queries):
+    raw, refresh_id = jwt_utils.create_refresh_token(user, db.session)
+    assert raw.startswith('rt2.')
+    stored = db.session.get(RefreshToken, refresh_id)
+    assert stored.token_hash is None and stored.token_digest != raw[4:]
+
+    with count_queries() as counter:
+        assert jwt_utils.verify_refresh_token(raw, db.session) is stored
+    assert counter.count <= 1
+    assert jwt_utils.verify_refresh_token(raw + 'x', db.session) is None
+    assert jwt_utils.verify_refresh_token('rt2.', db.session) is None
+
+    resp = client.post('/api/auth/refresh', json={'refresh_token': raw})
+    assert resp.status_code == 200
+    assert resp.get_json()['refresh_token'].startswith('rt2.')
+    assert stored.is_revoked
+
+
+def test_revoked_rt2_token_has_grace_period(client, user, no_bcrypt, monkeypatch):
+    raw, refresh_id = jwt_utils.create_refresh_token(user, db.session)
+    assert client.post('/api/auth/refresh', json={'refresh_token': raw}).status_code == 200
+    assert client.post('/api/auth/refresh', json={'refresh_token': raw}).status_code == 200
+
+    monkeypatch.setattr(jwt_utils, 'REFRESH_TOKEN_GRACE_SECONDS', 0)
+    assert client.post('/api/auth/refresh', json={'refresh_token': raw}).status_code == 401
+
+
+def test_legacy_id_tokens_rotate_to_rt2(client, user):
+    rt = _legacy_token(user)
+    resp = client.post('/api/auth/refresh', json={'refresh_token': f'{rt.id}:legacy-secret'})
+    assert resp.status_code == 200
+    assert resp.get_json()['refresh_token'].startswith('rt2.')
+    assert client.post('/api/auth/refresh', json={'refresh_token': f'{rt.id}:wrong'}).status_code == 401
+
+
+def test_unprefixed_scan_is_off_by_default(client, user, monkeypatch):
+    _legacy_token(user)
+    assert client.post('/api/auth/refresh', json={'refresh_token': 'legacy-secret'}).status_code == 401
+
+    monkeypatch.setattr(jwt_utils, 'REFRESH_TOKEN_LEGACY_SCAN', True)
+    assert client.post('/api/auth/refresh', json={'refresh_token': 'legacy-secret'}).status_code == 200
+
+
+def test_reused_token_revokes_its_family(client, user, monkeypatch):
+    raw, first_id = jwt_utils.create_refresh_token(user, db.session)
+    rotated = client.post('/api/auth/refresh', json={'refresh_token': raw}).get_json()['refresh_token']
+    other_login, other_id = jwt_utils.create_refresh_token(user, db.session)
+    family = db.session.get(RefreshToken, first_id).family_id
+    assert {rt.family_id for rt in RefreshToken.query.filter(RefreshToken.id != other_id)} == {family}
+
+    monkeypatch.setattr(jwt_utils, 'REFRESH_TOKEN_GRACE_SECONDS', 0)
+    assert client.post('/api/auth/refresh', json={'refresh_token': raw}).status_code == 401
+    assert client.post('/api/auth/refresh', json={'refresh_token': rotated}).status_code == 401
+    assert client.post('/api/auth/refresh', json={'refresh_token': other_login}).status_code == 200
+
+
+def test_purge_job_and_token_stats(client, make_user, auth_headers):
+    admin = make_user(role='hr_admin')
+    leaky, quiet = (db.session.get(UserAuth, make_user().id) for _ in range(2))
+    for _ in range(3):
+        jwt_utils.create_refresh_token(leaky, db.session)
+    jwt_utils.create_refresh_token(quiet, db.session)
+    expired = _legacy_token(quiet)
+    expired.expires_at = datetime.now(timezone.utc) - timedelta(days=1)
+    revoked = _legacy_token(quiet)
+    revoked.is_revoked, revoked.revoked_at = True, datetime.now(timezone.utc) - timedelta(hours=2)
+    db.session.commit()
+    headers = auth_headers(admin.id)
+
+    assert client.get('/api/auth/tokens/stats', headers=auth_headers(leaky.id)).status_code == 403
+    stats = client.get('/api/auth/tokens/stats?limit=1', headers=headers).get_json()
+    assert (stats['total'], stats['live'], stats['expired'], stats['revoked']) == (6, 4, 1, 1)
+    assert stats['users'] == [{
+        'user_id': leaky.id, 'email': leaky.email, 'live_tokens': 3, 'families': 3,
+        'last_issued_at': stats['users'][0]['last_issued_at'],
+    }]
+
+    resp = client.post('/api/auth/tokens/purge', json={'revoked_retention_hours': 4}, headers=headers)
+    assert resp.status_code == 202
+    assert resp.get_json()['job']['result'] == {'purged': 1}
+    resp = client.post('/api/auth/tokens/purge', json={'revoked_retention_hours': 1}, headers=headers)
+    assert resp.get_json()['job']['result'] == {'purged': 1}
+    assert RefreshToken.query.count() == 4
@@ -0,0 +1,166 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import delete, update
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.appraisal_rollup import AppraisalRollup
+from models.appraisal_rollup_state import AppraisalRollupState
+from models.department import Department
+from services import reporting_rollups
+
+# (department, status, overall_rating)
+POPULATION = [
+    ('Engineering', 'completed', 4),
+    ('Engineering', 'completed', 5),
+    ('Engineering', 'manager_review', None),
+    ('Sales', 'completed', 3),
+    ('Sales', 'not_started', None),
+    (None, 'completed', 2),
+]
+
+
+@pytest.fixture
+def hr_headers(make_user, auth_headers):
+    return auth_headers(make_user(role='hr_admin').id)
+
+
+@pytest.fixture
+def cycle(make_user):
+    departments = {name: Department(name=name) for name in ('Engineering', 'Sales')}
+    cycle = AppraisalCycle(name='FY26', start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), status='active')
+    db.session.add_all([cycle, *departments.values()])
+    db.session.flush()
+    for i, (department, status, rating) in enumerate(POPULATION):
+        employee = make_user(department_id=departments[department].id if department else None)
+        db.session.add(Appraisal(cycle_id=cycle.id, employee_id=employee.id, status=status, overall_rating=rating,
+                                 created_at=datetime(2026, 1 + i % 2, 10, tzinfo=timezone.utc)))
+    db.session.commit()
+    reporting_rollups.ensure_fresh()
+    return cycle
+
+
+def test_reports_read_rollups(client, cycle, hr_headers):
+    completion = client.get(f'/api/reports/cycle-completion?cycle_id={cycle.id}', headers=hr_headers).get_json()
+    assert completion == {'total': 6, 'completed': 4, 'in_progress': 1, 'not_started': 1,
+                          'completion_rate': 67, 'average_rating': 3.5}
+
+    distribution = client.get(f'/api/reports/rating-distribution?cycle_id={cycle.id}', headers=hr_headers)
+    assert distribution.get_json() == [{'rating': r, 'count': c} for r, c in [(1, 0), (2, 1), (3, 1), (4, 1), (5, 1)]]
+
+    departments = client.get('/api/reports/department-stats', headers=hr_headers).get_json()
+    assert sorted(departments, key=lambda d: d['department']) == [
+        {'department': 'Engineering', 'avg_rating': 4.5, 'completion_rate': 67},
+        {'department': 'Sales', 'avg_rating': 3.0, 'completion_rate': 50},
+    ]
+
+    compliance = client.get('/api/reports/distribution-compliance', headers=hr_headers).get_json()
+    assert compliance['total'] == 4
+
+    assert client.get('/api/reports/appraisal-trends', headers=hr_headers).get_json() == [
+        {'date': 'Jan', 'not_started': 1, 'in_progress': 1, 'completed': 1},
+        {'date': 'Feb', 'not_started': 0, 'in_progress': 0, 'completed': 3},
+    ]
+
+
+def test_report_reads_never_rebuild(client, cycle, hr_headers, count_queries):
+    url = f'/api/reports/cycle-completion?cycle_id={cycle.id}'
+    db.session.execute(update(AppraisalRollupState).values(is_stale=True))
+    db.session.commit()
+
+    with count_queries() as counter:
+        resp = client.get(url, headers=hr_headers)
+    assert resp.headers['X-Rollups-Stale'] == 'true'  # last-built counts, flagged
+    assert resp.get_json()['total'] == 6
+    assert not any('FROM appraisals' in sql or 'DELETE' in sql for sql in counter.statements)
+
+    reporting_rollups.ensure_fresh()
+    assert 'X-Rollups-Stale' not in client.get(url, headers=hr_headers).headers
+
+
+def test_appraisal_and_department_changes_apply_deltas(client, make_user, cycle, hr_headers):
+    url = f'/api/reports/cycle-completion?cycle_id={cycle.id}'
+
+    appraisal = Appraisal.query.filter_by(cycle_id=cycle.id, status='not_started').one()
+    appraisal.status = 'completed'
+    appraisal.overall_rating = 5
+    db.session.commit()
+    assert db.session.get(AppraisalRollupState, cycle.id).is_stale is False
+
+    body = client.get(url, headers=hr_headers).get_json()
+    assert (body['completed'], body['not_started'], body['average_rating']) == (5, 0, 3.8)
+
+    from models.user_profile import UserProfile
+    engineering = Department.query.filter_by(name='Engineering').one()
+    db.session.get(UserProfile, appraisal.employee_id).department_id = engineering.id
+    db.session.add(Appraisal(cycle_id=cycle.id, employee_id=make_user(department_id=engineering.id).id,
+                             status='not_started'))
+    db.session.delete(Appraisal.query.filter_by(cycle_id=cycle.id, overall_rating=2).one())
+    db.session.commit()
+
+    departments = client.get('/api/reports/department-stats', headers=hr_headers).get_json()
+    assert sorted(departments, key=lambda d: d['department']) == [
+        {'department': 'Engineering', 'avg_rating': 4.7, 'completion_rate': 60},
+        {'department': 'Sales', 'avg_rating': 3.0, 'completion_rate': 100},
+    ]
+    assert reporting_rollups.check_consistency()['mismatched'] == []
+    assert reporting_rollups.stale_cycle_ids() == []
+
+
+def test_bulk_generated_appraisals_are_counted(client, make_user, hr_headers):
+    from services.cycle_activation import generate_cycle_appraisals
+    cycle = AppraisalCycle(name='FY27', start_date=date(2027, 1, 1), end_date=date(2027, 12, 31), status='active')
+    db.session.add(cycle)
+    make_user()
+    db.session.commit()
+
+    generate_cycle_appraisals(cycle)
+    db.session.commit()
+    assert reporting_rollups.stale_cycle_ids([cycle.id]) == []
+    assert reporting_rollups.check_consistency([cycle.id])['mismatched'] == []
+
+
+def test_consistency_check_and_refresh_job(client, cycle, hr_headers):
+    reporting_rollups.ensure_fresh()
+    assert client.get('/api/reports/rollups/check', headers=hr_headers).get_json() == {
+        'checked': [cycle.id], 'stale': [], 'mismatched': [], 'consistent': True,
+    }
+
+    db.session.execute(update(AppraisalRollup).values(appraisal_count=AppraisalRollup.appraisal_count + 1))
+    db.session.commit()
+    assert client.get('/api/reports/rollups/check', headers=hr_headers).get_json()['mismatched'] == [cycle.id]
+
+    resp = client.post('/api/reports/rollups/refresh', json={'full': True}, headers=hr_headers)
+    assert resp.status_code == 202
+    job = resp.get_json()['job']
+    assert client.get(f"/api/jobs/{job['id']}", headers=hr_headers).get_json()['result']['mismatched'] == []
+    assert client.get('/api/reports/rollups/check', headers=hr_headers).get_json()['consistent'] is True
+
+
+def test_orm_created_cycle_is_counted_without_a_build(client, make_user, hr_headers):
+    cycle = AppraisalCycle(name='FY27', start_date=date(2027, 1, 1), end_date=date(2027, 12, 31), status='active')
+    db.session.add(cycle)
+    db.session.flush()
+    db.session.add(Appraisal(cycle_id=cycle.id, employee_id=make_user().id, status='completed', overall_rating=4))
+    db.session.commit()
+
+    resp = client.get(f'/api/reports/cycle-completion?cycle_id={cycle.id}', headers=hr_headers)
+    assert 'X-Rollups-Stale' not in resp.headers
+    body = resp.get_json()
+    assert (body['total'], body['completed'], body['average_rating']) == (1, 1, 4.0)
+    distribution = client.get(f'/api/reports/rating-distribution?cycle_id={cycle.id}', headers=hr_headers)
+    assert {'rating': 4, 'count': 1} in distribution.get_json()
+
+
+def test_never_built_cycles_are_built_on_first_read(client, cycle, hr_headers):
+    # As after deploy: appraisals exist but the cycle's rollups were never built
+    db.session.execute(delete(AppraisalRollup))
+    db.session.execute(delete(AppraisalRollupState))
+    db.session.commit()
+
+    resp = client.get(f'/api/reports/cycle-completion?cycle_id={cycle.id}', headers=hr_headers)
+    assert 'X-Rollups-Stale' not in resp.headers
+    assert (resp.get_json()['total'], resp.get_json()['completed']) == (6, 4)
+    assert reporting_rollups.stale_cycle_ids() == []
@@ -0,0 +1,105 @@
+import csv
+from datetime import date, datetime, timezone
+from io import BytesIO, StringIO
+
+import openpyxl
+import pytest
+
+from extensions import db
+from models.appraisal import Appraisal
+from models.appraisal_cycle import AppraisalCycle
+from models.appraisal_review import AppraisalReview
+from models.department import Department
+from services import appraisal_export
+
+
+@pytest.fixture
+def hr_headers(make_user, auth_headers):
+    return auth_headers(make_user(role='hr_admin').id)
+
+
+def _seed_cycle(make_user, name, size, department=None):
+    cycle = AppraisalCycle(name=name, start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), status='active')
+    db.session.add(cycle)
+    db.session.flush()
+    for i in range(size):
+        employee = make_user(department_id=department.id if department else None, first_name=f'{name}-{i}')
+        appraisal = Appraisal(cycle_id=cycle.id, employee_id=employee.id, status='completed',
+                              self_submitted=True, employee_comments='Fair, "mostly"' if i == 0 else None,
+                              employee_acknowledgement_date=datetime(2026, 3, 4, tzinfo=timezone.utc))
+        db.session.add(appraisal)
+        db.session.flush()
+        if i % 2 == 0:
+            db.session.add(AppraisalReview(appraisal_id=appraisal.id, overall_rating=4.5, calculated_rating=3.75))
+    db.session.commit()
+    return cycle
+
+
+def _csv_rows(resp):
+    return list(csv.reader(StringIO(resp.get_data(as_text=True))))
+
+
+def test_csv_export_is_limited_to_the_cycle(client, make_user, hr_headers):
+    engineering = Department(name='Engineering')
+    db.session.add(engineering)
+    db.session.commit()
+    cycle = _seed_cycle(make_user, 'FY26', 3, department=engineering)
+    _seed_cycle(make_user, 'Other', 2)
+
+    resp = client.get(f'/api/reports/export/appraisals?cycle_id={cycle.id}&format=csv', headers=hr_headers)
+
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == 'text/csv'
+    header, *rows = _csv_rows(resp)
+    assert header == appraisal_export.HEADERS
+    assert len(rows) == 3
+    assert {row[3] for row in rows} == {'FY26'}
+    assert {row[2] for row in rows} == {'Engineering'}
+    assert sorted(row[8] for row in rows) == ['', '4.5', '4.5']
+    assert 'Fair, "mostly"' in [row[13] for row in rows]
+    assert {row[14] for row in rows} == {'2026-03-04'}
+
+
+def test_csv_is_streamed_in_chunks(app, make_user):
+    cycle = _seed_cycle(make_user, 'FY26', 5)
+
+    chunks = list(appraisal_export.iter_csv(cycle.id, chunk_rows=2))
+
+    assert len(chunks) == 3
+    assert len(list(csv.reader(StringIO(''.join(chunks))))) == 6
+
+
+def test_xlsx_export_matches_csv_with_widths(client, make_user, hr_headers):
+    cycle = _seed_cycle(make_user, 'FY26', 3)
+    _seed_cycle(make_user, 'Other', 1)
+
+    resp = client.get(f'/api/reports/export/appraisals?cycle_id={cycle.id}', headers=hr_headers)
+    csv_rows = _csv_rows(client.get(f'/api/reports/export/appraisals?cycle_id={cycle.id}&format=csv',
+                                    headers=hr_headers))
+
+    assert resp.status_code == 200
+    ws = openpyxl.load_workbook(BytesIO(resp.data))['Appraisals']
+    xlsx_rows = [['' if v is None else str(v) for v in row] for row in ws.iter_rows(values_only=True)]
+    assert xlsx_rows == csv_rows
+    assert ws['A1'].font.bold
+    assert ws.column_dimensions['B'].width == max(len(r[1]) for r in csv_rows) + 2
+    assert ws.column_dimensions['N'].width == len('Employee Comments') + 2
+
+
+def test_export_uses_constant_queries(app, make_user, count_queries):
+    counts = []
+    for size in (2, 12):
+        department = Department(name=f'Dept {size}')
+        db.session.add(department)
+        cycle = _seed_cycle(make_user, f'C{size}', size, department=department)
+        db.session.expire_all()
+        with count_queries() as counter:
+            appraisal_export.write_xlsx(cycle.id).close()
+            list(appraisal_export.iter_csv(cycle.id))
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
+
+
+def test_export_rejects_unknown_format(client, hr_headers):
+    assert client.get('/api/reports/export/appraisals?format=pdf', headers=hr_headers).status_code == 400
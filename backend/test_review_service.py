@@ -0,0 +1,111 @@
+import pytest
+
+from extensions import db
+from models.appraisal import Appraisal
+from scripts.scoring_fixtures import reviews_by_employee, seed_scoring_cycle
+from services.review_service import ReviewService
+
+
+@pytest.mark.parametrize('weights', [
+    {},
+    {'goals_weight': 60, 'attributes_weight': 20, 'peer_feedback_weight': 20},
+    {'goals_weight': 50, 'attributes_weight': 30, 'peer_feedback_weight': 30},
+])
+def test_cycle_scores_match_per_appraisal_scores(app, weights):
+    employees = [f'emp-{i}' for i in range(30)]
+    scalar_cycle = seed_scoring_cycle(employees, **weights)
+    batch_cycle = seed_scoring_cycle(employees, **weights)
+
+    scalar_results = {
+        a.employee_id: ReviewService.calculate_scores(a.id)
+        for a in Appraisal.query.filter_by(cycle_id=scalar_cycle.id).all()
+    }
+    outcome = ReviewService.calculate_scores_for_cycle(batch_cycle.id)
+
+    employee_of = dict(db.session.query(Appraisal.id, Appraisal.employee_id).filter_by(cycle_id=batch_cycle.id))
+    batch_results = {employee_of[a_id]: result for a_id, result in outcome['results'].items()}
+    assert batch_results == scalar_results
+    assert reviews_by_employee(batch_cycle.id) == reviews_by_employee(scalar_cycle.id)
+    assert outcome['created'] + outcome['updated'] == len(employees)
+    assert outcome['updated'] == len(range(0, 30, 4))
+
+
+def test_cycle_scores_use_constant_queries(app, count_queries):
+    counts = []
+    for n in (3, 25):
+        cycle = seed_scoring_cycle([f'c{n}-{i}' for i in range(n)])
+        db.session.expire_all()
+        with count_queries() as counter:
+            ReviewService.calculate_scores_for_cycle(cycle.id)
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
+
+
+def test_recalculate_endpoint_runs_job(client, make_user, auth_headers):
+    hr = make_user(role='hr_admin')
+    cycle = seed_scoring_cycle([f'e{i}' for i in range(5)])
+
+    resp = client.post(f'/api/cycles/{cycle.id}/recalculate-scores', headers=auth_headers(hr.id))
+
+    assert resp.status_code == 202
+    job = client.get(f"/api/jobs/{resp.get_json()['job']['id']}", headers=auth_headers(hr.id)).get_json()
+    assert job['status'] == 'succeeded'
+    assert job['result']['created'] + job['result']['updated'] == 5
+
+
+SCENARIOS = [
+    {'name': 'Peer heavy', 'goals_weight': 50, 'attributes_weight': 20, 'peer_feedback_weight': 30},
+    {'goals_weight': 80, 'attributes_weight': 20, 'peer_feedback_weight': 0},
+    {'goals_weight': 10, 'attributes_weight': 90, 'peer_feedback_weight': 0},
+]
+
+
+def test_weight_simulation_matches_recalculation_without_writing(client, make_user, auth_headers, count_queries):
+    hr = make_user(role='hr_admin')
+    employees = [f'sim-{i}' for i in range(20)]
+    cycle = seed_scoring_cycle(employees, goals_weight=60, attributes_weight=20, peer_feedback_weight=20)
+    before = reviews_by_employee(cycle.id)
+
+    resp = client.post(f'/api/cycles/{cycle.id}/weight-simulation',
+                       json={'scenarios': SCENARIOS, 'include_appraisals': True}, headers=auth_headers(hr.id))
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert reviews_by_employee(cycle.id) == before
+    assert body['appraisal_count'] == len(employees)
+    assert [s['name'] for s in body['scenarios']] == ['Peer heavy', 'Scenario 2', 'Scenario 3']
+
+    # Each scenario scores exactly like a recalculation with those weights would.
+    for scenario, requested in zip(body['scenarios'], SCENARIOS):
+        assert sum(scenario['distribution'].values()) == len(employees)
+        twin = seed_scoring_cycle(employees, goals_weight=requested['goals_weight'],
+                                  attributes_weight=requested['attributes_weight'],
+                                  peer_feedback_weight=requested['peer_feedback_weight'])
+        recalculated = ReviewService.calculate_scores_for_cycle(twin.id, commit=False)['results']
+        db.session.rollback()
+        expected = sorted(r['calculated'] for r in recalculated.values())
+        assert sorted(a['calculated'] for a in scenario['appraisals']) == expected
+
+    # Later scenarios reuse the cached components: no rating tables are read again.
+    with count_queries() as counter:
+        client.post(f'/api/cycles/{cycle.id}/weight-simulation',
+                    json={'scenarios': SCENARIOS}, headers=auth_headers(hr.id))
+    rating_tables = ('FROM manager_reviews', 'FROM employee_attributes', 'FROM peer_feedbacks')
+    assert not any(table in sql for sql in counter.statements for table in rating_tables)
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'scenarios': []},
+    {'scenarios': [{'goals_weight': 50, 'attributes_weight': 30, 'peer_feedback_weight': 30}]},
+    {'scenarios': [{'goals_weight': '70', 'attributes_weight': 30, 'peer_feedback_weight': 0}]},
+    {'scenarios': [{'goals_weight': 0, 'attributes_weight': 100, 'peer_feedback_weight': 0}]},
+    {'scenarios': [{'goals_weight': 80, 'attributes_weight': 0, 'peer_feedback_weight': 20}]},
+])
+def test_weight_simulation_rejects_invalid_scenarios(client, make_user, auth_headers, body):
+    hr = make_user(role='hr_admin')
+    cycle = seed_scoring_cycle(['e1'])
+
+    resp = client.post(f'/api/cycles/{cycle.id}/weight-simulation', json=body, headers=auth_headers(hr.id))
+
+    assert resp.status_code == 400
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from extensions import db
+from models.goal import Goal
+from services.event_bus import event_bus, goal_channel, user_channel
+from services.notification_service import NotificationService
+
+
+@pytest.fixture
+def stream_app(app):
+    app.config.update(STREAM_HEARTBEAT_SECONDS=0.05, STREAM_MAX_SECONDS=2)
+    return app
+
+
+def _events(chunks, count):
+    """Parse the next `count` SSE events (skipping keep-alives) from a chunk iterator."""
+    events = []
+    for chunk in chunks:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if not text.startswith('event:'):
+            continue
+        event_line, data_line = text.strip().split('\n')
+        events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+        if len(events) == count:
+            return events
+    return events
+
+
+def test_events_are_delivered_only_after_commit(app):
+    with event_bus.subscribe([user_channel('u1')]) as subscription:
+        NotificationService.create_notification('u1', 'goal_approved')
+        assert subscription.get(timeout=0) is None
+        db.session.rollback()
+        db.session.commit()
+        assert subscription.get(timeout=0) is None
+
+        NotificationService.create_notification('u1', 'goal_approved')
+        NotificationService.create_notification('u2', 'goal_approved')
+        db.session.commit()
+
+        item = subscription.get(timeout=0)
+        assert item['event'] == 'notification'
+        assert item['data']['recipient_id'] == 'u1' and item['data']['id']
+        assert subscription.get(timeout=0) is None
+
+
+def test_slow_subscriber_gets_resync(app, monkeypatch):
+    monkeypatch.setattr(event_bus, 'queue_size', 2)
+    with event_bus.subscribe([user_channel('u1')]) as subscription:
+        for _ in range(3):
+            event_bus.dispatch(user_channel('u1'), 'notification', {})
+        assert subscription.get(timeout=0)['event'] == 'resync'
+        assert subscription.get(timeout=0) is None
+
+
+def test_stream_pushes_notifications_and_goal_comments(stream_app, client, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user.id)
+    goal = Goal(employee_id=user.id, title='Ship it')
+    db.session.add(goal)
+    db.session.commit()
+
+    resp = client.get(f'/api/stream?goals={goal.id}', headers=headers, buffered=False)
+    assert resp.mimetype == 'text/event-stream'
+    chunks = resp.response
+
+    assert _events(chunks, 1) == [('ready', {'user_id': user.id, 'goals': [goal.id]})]
+
+    client.post(f'/api/goals/{goal.id}/comments', json={'content': 'Progress!'}, headers=headers)
+    NotificationService.create_notification(user.id, 'goal_approved', goal_id=goal.id)
+    db.session.commit()
+
+    (comment_event, comment), (notification_event, notification) = _events(chunks, 2)
+    assert comment_event == 'goal_comment' and comment['action'] == 'created' and comment['goal_id'] == goal.id
+    assert notification_event == 'notification' and notification['goal_id'] == goal.id
+    resp.close()
+    assert not event_bus._subscribers.get(goal_channel(goal.id))
+
+
+def test_stream_requires_auth(client):
+    assert client.get('/api/stream').status_code == 401
+
+
+def test_stream_rejects_goals_the_user_cannot_see(stream_app, client, make_user, auth_headers):
+    owner, manager, stranger = make_user(), make_user(), make_user()
+    owner.manager_id = manager.id
+    goal = Goal(employee_id=owner.id, title='Private')
+    db.session.add(goal)
+    db.session.commit()
+
+    assert client.get(f'/api/stream?goals={goal.id}', headers=auth_headers(stranger.id)).status_code == 403
+    assert client.get('/api/stream?goals=no-such-goal', headers=auth_headers(owner.id)).status_code == 403
+    resp = client.get(f'/api/stream?goals={goal.id}', headers=auth_headers(manager.id), buffered=False)
+    assert _events(resp.response, 1) == [('ready', {'user_id': manager.id, 'goals': [goal.id]})]
+    resp.close()
+
+
+def test_stream_accepts_a_stream_token_in_the_query(stream_app, client, make_user, auth_headers):
+    user = make_user()
+    token = client.post('/api/stream/token', headers=auth_headers(user.id)).get_json()['token']
+
+    resp = client.get(f'/api/stream?token={token}', buffered=False)
+    assert _events(resp.response, 1) == [('ready', {'user_id': user.id, 'goals': []})]
+    resp.close()
+
+    # Only the stream accepts it, and an access token is no substitute.
+    assert client.get('/api/goals/notifications', headers={'Authorization': f'Bearer {token}'}).status_code == 401
+    access = auth_headers(user.id)['Authorization'].split(' ', 1)[1]
+    assert client.get(f'/api/stream?token={access}').status_code == 401
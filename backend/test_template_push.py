@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+import pytest
+
+from extensions import db
+from models.appraisal_cycle import AppraisalCycle
+from models.goal import Goal
+from models.goal_template import GoalTemplate
+from models.notification import Notification
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def cycle(app):
+    cycle = AppraisalCycle(name='Annual', cycle_type='annual', status='active',
+                           start_date=TODAY - timedelta(days=30), end_date=TODAY + timedelta(days=300))
+    db.session.add(cycle)
+    db.session.commit()
+    return cycle
+
+
+def _templates(cycle, *titles):
+    templates = [GoalTemplate(cycle_id=cycle.id, title=title, description=f'{title} v1', created_by='hr')
+                 for title in titles]
+    db.session.add_all(templates)
+    db.session.commit()
+    return [t.id for t in templates]
+
+
+def _team(make_user, size):
+    manager = make_user(role='manager')
+    return manager, [make_user(manager_id=manager.id) for _ in range(size)]
+
+
+def _push(client, auth_headers, manager, cycle, template_ids, **extra):
+    return client.post('/api/goals/push-templates-to-team', headers=auth_headers(manager.id),
+                       json={'template_ids': template_ids, 'cycle_id': cycle.id, **extra})
+
+
+def test_push_creates_then_updates(client, make_user, auth_headers, cycle):
+    manager, team = _team(make_user, 3)
+    template_ids = _templates(cycle, 'Ship', 'Mentor')
+
+    first = _push(client, auth_headers, manager, cycle, template_ids).get_json()
+    assert (first['created'], first['updated'], first['team_size']) == (6, 0, 3)
+    goal = Goal.query.filter_by(employee_id=team[0].id, title='Ship').one()
+    assert (goal.approval_status, goal.created_by, goal.target_date) == ('approved', manager.id, cycle.end_date)
+    assert Notification.query.filter_by(event='goal_assigned').count() == 3  # one per employee
+
+    GoalTemplate.query.filter_by(title='Ship').update({'description': 'Ship v2'})
+    goal.approval_status = 'draft'
+    db.session.commit()
+    second = _push(client, auth_headers, manager, cycle, template_ids).get_json()
+
+    assert (second['created'], second['updated']) == (0, 6)
+    assert Goal.query.filter_by(appraisal_cycle_id=cycle.id).count() == 6
+    assert {g.description for g in Goal.query.filter_by(title='Ship')} == {'Ship v2'}
+    assert db.session.get(Goal, goal.id).approval_status == 'approved'
+
+
+def test_dry_run_returns_diff_without_writing(client, make_user, auth_headers, cycle):
+    manager, team = _team(make_user, 2)
+    ship, mentor = _templates(cycle, 'Ship', 'Mentor')
+    _push(client, auth_headers, manager, cycle, [ship])
+    GoalTemplate.query.filter_by(id=ship).update({'description': 'Ship v2'})
+    db.session.commit()
+
+    body = _push(client, auth_headers, manager, cycle, [ship, mentor], dry_run=True).get_json()
+
+    assert body['dry_run'] is True
+    assert (body['created'], body['updated']) == (2, 2)
+    assert sorted((c['employee_id'], c['title']) for c in body['diff']['create']) == \
+        sorted((u.id, 'Mentor') for u in team)
+    assert [u['changes'] for u in body['diff']['update']] == \
+        [{'description': {'from': 'Ship v1', 'to': 'Ship v2'}}] * 2
+    assert Goal.query.filter_by(title='Mentor').count() == 0
+    assert {g.description for g in Goal.query.filter_by(title='Ship')} == {'Ship v1'}
+
+
+def test_push_statement_count_independent_of_team_size(client, make_user, auth_headers, cycle, count_queries):
+    template_ids = _templates(cycle, 'Ship', 'Mentor', 'Learn')
+    counts = []
+    for size in (2, 20):
+        manager, _ = _team(make_user, size)
+        _push(client, auth_headers, manager, cycle, template_ids[:1])  # some goals exist already
+        db.session.expire_all()
+        with count_queries() as counter:
+            assert _push(client, auth_headers, manager, cycle, template_ids).status_code == 200
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
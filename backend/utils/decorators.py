@@ -11,9 +11,11 @@ headers can now read from g.current_user instead.
 import logging
 from functools import wraps
 
+import jwt as pyjwt
 from flask import request, jsonify, g
 
-from utils.jwt_utils import decode_access_token
+from utils.identity_cache import identity_cache
+from utils.jwt_utils import decode_access_token, decode_stream_token
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +26,18 @@ def _verify_user_in_db(payload):
     Returns the current user dict with DB-verified role, or None if invalid.
     This provides defense-in-depth: even if a JWT is valid, the user must
     still be active and their role is read from the DB (not the JWT).
+
+    Verified identities are served from the in-process identity cache for up
+    to IDENTITY_CACHE_TTL_SECONDS; role / is_active changes evict the entry
+    (see utils/identity_cache.py).
     """
     from models.user_auth import UserAuth
 
     user_id = payload['sub']
+    cached = identity_cache.get(user_id)
+    if cached is not None:
+        return cached
+
     user = UserAuth.query.get(user_id)
 
     if not user:
@@ -41,19 +51,67 @@ def _verify_user_in_db(payload):
     # SECURITY: Use the role from the database, not the JWT.
     # This ensures role changes and deactivations take effect immediately,
     # rather than waiting for the JWT to expire (up to 15 min).
-    return {
+    current_user = {
         'user_id': user.id,
         'email': user.email,
         'role': user.role,  # From DB, not JWT — defense-in-depth
     }
+    identity_cache.set(user_id, current_user)
+    return current_user
+
+
+def _authenticate_request(allow_stream_token=False):
+    """Decode the bearer token and verify the user, at most once per request.
+
+    With allow_stream_token, a request without an Authorization header may
+    instead carry a stream token (see jwt_utils.create_stream_token) in
+    ?token=.
+
+    Returns (current_user, None) on success or (None, error_code) where
+    error_code is one of MISSING_TOKEN, TOKEN_EXPIRED, INVALID_TOKEN or
+    UNAUTHORIZED. The outcome is memoised on g so stacked @require_auth /
+    @require_role decorators do not repeat the decode and DB verification.
+    """
+    cached = getattr(g, '_auth_result', None)
+    if cached is not None:
+        return cached
+
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        token, decode = auth_header.split(' ', 1)[1], decode_access_token
+    elif allow_stream_token and request.args.get('token'):
+        token, decode = request.args['token'], decode_stream_token
+    else:
+        token = None
+    if token is None:
+        result = (None, 'MISSING_TOKEN')
+    else:
+        try:
+            payload = decode(token)
+            # SECURITY: Verify user exists and is active in DB
+            current_user = _verify_user_in_db(payload)
+            result = (current_user, None) if current_user else (None, 'UNAUTHORIZED')
+        except pyjwt.ExpiredSignatureError:
+            result = (None, 'TOKEN_EXPIRED')
+        except Exception as e:
+            logger.warning('Invalid token: %s', e)
+            result = (None, 'INVALID_TOKEN')
 
+    g._auth_result = result
+    if result[0] is not None:
+        g.current_user = result[0]
+    return result
 
-def require_auth(f):
+
+def require_auth(f=None, *, allow_stream_token=False):
     """Validate JWT from Authorization header and inject current_user into g.
 
     SECURITY: After decoding the JWT, verifies the user still exists and is
     active in the database. Uses the DB role (not JWT role) for authorization.
 
+    @require_auth(allow_stream_token=True) also accepts a ?token= stream
+    token, for EventSource connections that cannot set headers.
+
     Sets:
         g.current_user = {
             'user_id': str,
@@ -61,39 +119,29 @@ def require_auth(f):
             'role': str,  # From DB, verified
         }
     """
+    if f is None:
+        return lambda view: require_auth(view, allow_stream_token=allow_stream_token)
+
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get('Authorization', '')
+        current_user, error = _authenticate_request(allow_stream_token)
 
-        if not auth_header.startswith('Bearer '):
+        if error == 'MISSING_TOKEN':
             return jsonify({
                 'error': 'MISSING_TOKEN',
                 'message': 'Authorization header required',
             }), 401
-
-        token = auth_header.split(' ', 1)[1]
-
-        try:
-            import jwt as pyjwt
-            payload = decode_access_token(token)
-
-            # SECURITY: Verify user exists and is active in DB
-            current_user = _verify_user_in_db(payload)
-            if current_user is None:
-                return jsonify({
-                    'error': 'UNAUTHORIZED',
-                    'message': 'User account not found or deactivated',
-                }), 401
-
-            g.current_user = current_user
-        except Exception as e:
-            import jwt as pyjwt
-            if isinstance(e, pyjwt.ExpiredSignatureError):
-                return jsonify({
-                    'error': 'TOKEN_EXPIRED',
-                    'message': 'Access token has expired',
-                }), 401
-            logger.warning('Invalid token: %s', e)
+        if error == 'UNAUTHORIZED':
+            return jsonify({
+                'error': 'UNAUTHORIZED',
+                'message': 'User account not found or deactivated',
+            }), 401
+        if error == 'TOKEN_EXPIRED':
+            return jsonify({
+                'error': 'TOKEN_EXPIRED',
+                'message': 'Access token has expired',
+            }), 401
+        if error:
             return jsonify({
                 'error': 'INVALID_TOKEN',
                 'message': 'Invalid access token',
@@ -126,30 +174,13 @@ def require_role(*allowed_roles):
             # If require_auth wasn't applied yet, do auth check here
             user = getattr(g, 'current_user', None)
             if user is None:
-                # Try to authenticate
-                auth_header = request.headers.get('Authorization', '')
-                if not auth_header.startswith('Bearer '):
+                user, error = _authenticate_request()
+                if error == 'UNAUTHORIZED':
                     return jsonify({
                         'error': 'UNAUTHORIZED',
-                        'message': 'Authentication required',
+                        'message': 'User account not found or deactivated',
                     }), 401
-
-                token = auth_header.split(' ', 1)[1]
-                try:
-                    import jwt as pyjwt
-                    payload = decode_access_token(token)
-
-                    # SECURITY: Verify user exists and is active in DB
-                    current_user = _verify_user_in_db(payload)
-                    if current_user is None:
-                        return jsonify({
-                            'error': 'UNAUTHORIZED',
-                            'message': 'User account not found or deactivated',
-                        }), 401
-
-                    g.current_user = current_user
-                    user = g.current_user
-                except Exception:
+                if error:
                     return jsonify({
                         'error': 'UNAUTHORIZED',
                         'message': 'Authentication required',
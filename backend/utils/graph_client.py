@@ -1,14 +1,72 @@
 """
 Microsoft Graph API client for Azure AD.
 Migrated from auth-service/utils/graph_client.py.
+
+All calls share one pooled requests.Session, so repeated logins reuse
+keep-alive connections instead of paying a TLS handshake per call.
+get_login_context() runs the profile / manager / direct-reports lookups
+concurrently under one overall deadline; anything that hasn't answered by
+then is reported as unknown (None). defer() runs work (the profile photo
+fetch) off the request path on its own small pool, so a backlog of deferred
+work can never hold up login lookups.
 """
-import requests
-import logging
+import os
 import base64
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
-GRAPH_API_URL = 'https://graph.microsoft.com/v1.0'
+GRAPH_API_URL = os.getenv('GRAPH_API_URL', 'https://graph.microsoft.com/v1.0')
+# Per-call (connect, read) timeouts, and the budget for all login lookups together.
+GRAPH_TIMEOUT = (3.05, 5)
+GRAPH_LOGIN_DEADLINE_SECONDS = float(os.getenv('GRAPH_LOGIN_DEADLINE_SECONDS', 6))
+GRAPH_POOL_SIZE = int(os.getenv('GRAPH_POOL_SIZE', 8))
+GRAPH_DEFERRED_POOL_SIZE = int(os.getenv('GRAPH_DEFERRED_POOL_SIZE', 2))
+
+_session = None
+_executor = None           # login lookups
+_deferred_executor = None  # defer(): photo fetches etc.
+_lock = threading.Lock()
+
+
+def _get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=GRAPH_POOL_SIZE))
+            _session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=GRAPH_POOL_SIZE))
+        return _session
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=GRAPH_POOL_SIZE, thread_name_prefix='graph')
+        return _executor
+
+
+def _get_deferred_executor():
+    global _deferred_executor
+    with _lock:
+        if _deferred_executor is None:
+            _deferred_executor = ThreadPoolExecutor(max_workers=GRAPH_DEFERRED_POOL_SIZE,
+                                                    thread_name_prefix='graph-deferred')
+        return _deferred_executor
+
+
+def _get(path, token, json_body=True):
+    headers = {'Authorization': f'Bearer {token}'}
+    if json_body:
+        headers['Content-Type'] = 'application/json'
+    return _get_session().get(f'{GRAPH_API_URL}{path}', headers=headers, timeout=GRAPH_TIMEOUT)
 
 
 class GraphClient:
@@ -20,16 +78,8 @@ class GraphClient:
         if not token:
             return None
 
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json',
-        }
-
         try:
-            response = requests.get(
-                f'{GRAPH_API_URL}/me?$select=id,displayName,mail,userPrincipalName,department,jobTitle',
-                headers=headers, timeout=5,
-            )
+            response = _get('/me?$select=id,displayName,mail,userPrincipalName,department,jobTitle', token)
             if response.status_code == 200:
                 data = response.json()
                 return {
@@ -52,13 +102,8 @@ class GraphClient:
         if not token:
             return None
 
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json',
-        }
-
         try:
-            response = requests.get(f'{GRAPH_API_URL}/me/manager', headers=headers, timeout=5)
+            response = _get('/me/manager', token)
             if response.status_code == 200:
                 data = response.json()
                 return {
@@ -78,18 +123,17 @@ class GraphClient:
 
     @staticmethod
     def get_direct_reports(token):
-        """Fetch direct reports for the current user."""
+        """Fetch direct reports for the current user.
+
+        Returns [] when the user has none, and None when Graph couldn't say
+        (error or exception) — callers must not treat that as "no reports".
+        """
         if not token:
             return []
 
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json',
-        }
-
         try:
-            url = f'{GRAPH_API_URL}/me/directReports?$select=id,displayName,mail,userPrincipalName,jobTitle,department'
-            response = requests.get(url, headers=headers, timeout=5)
+            response = _get('/me/directReports?$select=id,displayName,mail,userPrincipalName,jobTitle,department',
+                            token)
 
             if response.status_code == 200:
                 data = response.json()
@@ -107,10 +151,10 @@ class GraphClient:
                 return []
             else:
                 logger.warning(f"Graph API Error fetching direct reports: {response.status_code}")
-                return []
+                return None
         except Exception as e:
             logger.error(f"Exception calling Graph API for reports: {e}")
-            return []
+            return None
 
     @staticmethod
     def get_user_photo(token):
@@ -118,10 +162,8 @@ class GraphClient:
         if not token:
             return None
 
-        headers = {'Authorization': f'Bearer {token}'}
-
         try:
-            response = requests.get(f'{GRAPH_API_URL}/me/photo/$value', headers=headers, timeout=5)
+            response = _get('/me/photo/$value', token, json_body=False)
             if response.status_code == 200:
                 image_data = base64.b64encode(response.content).decode('utf-8')
                 content_type = response.headers.get('Content-Type', 'image/jpeg')
@@ -134,3 +176,39 @@ class GraphClient:
         except Exception as e:
             logger.error(f"Exception calling Graph API for photo: {e}")
             return None
+
+    @staticmethod
+    def get_login_context(token, deadline_seconds=None):
+        """Profile, manager and direct reports, fetched concurrently.
+
+        Returns {'me': ..., 'manager': ..., 'direct_reports': [...]} within
+        `deadline_seconds` (default GRAPH_LOGIN_DEADLINE_SECONDS); lookups
+        still outstanding at the deadline are None (unknown).
+        """
+        result = {'me': None, 'manager': None, 'direct_reports': None}
+        if not token:
+            return result
+
+        deadline = GRAPH_LOGIN_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+        executor = _get_executor()
+        started = time.monotonic()
+        futures = {
+            'me': executor.submit(GraphClient.get_me, token),
+            'manager': executor.submit(GraphClient.get_user_manager, token),
+            'direct_reports': executor.submit(GraphClient.get_direct_reports, token),
+        }
+        wait(futures.values(), timeout=deadline)
+
+        for name, future in futures.items():
+            if future.done():
+                result[name] = future.result()
+            else:
+                future.cancel()
+                logger.warning('Graph %s lookup missed the %.1fs login deadline', name, deadline)
+        logger.info('Graph login lookups took %.0fms', (time.monotonic() - started) * 1000)
+        return result
+
+    @staticmethod
+    def defer(fn, *args):
+        """Run `fn(*args)` on the deferred-work pool, off the caller's request."""
+        return _get_deferred_executor().submit(fn, *args)
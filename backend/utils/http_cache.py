@@ -0,0 +1,31 @@
+"""
+HTTP conditional responses — ETag / If-None-Match for polled endpoints.
+
+Endpoints compute an ETag from a cheap fingerprint query (row count and latest
+updated_at, say) plus whatever request arguments shape the body. When the
+client's If-None-Match matches, they return the 304 from not_modified()
+before loading or serializing any rows.
+"""
+import hashlib
+
+from flask import Response, request
+
+
+def etag_for(*parts):
+    """Stable ETag for the given fingerprint parts."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def not_modified(etag):
+    """A 304 response if the request's If-None-Match already has `etag`, else None."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        return with_etag(response, etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Tag a response and make clients revalidate it on every poll."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
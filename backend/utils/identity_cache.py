@@ -0,0 +1,135 @@
+"""
+Identity cache — bounded TTL + LRU cache of DB-verified user identities.
+
+@require_auth re-reads the user's role and active flag from user_auth on every
+request (defense-in-depth, see utils/decorators.py). This cache keeps the
+verified identity in-process for a short, configurable window so hot endpoints
+skip that lookup.
+
+Invalidation:
+  - Changes to UserAuth.role / UserAuth.is_active (or deleting a UserAuth row)
+    evict the entry in this process as soon as the change is flushed, and again
+    after commit so a concurrent request cannot re-cache the old value.
+  - Other gunicorn workers only see the change once their entry expires, so
+    IDENTITY_CACHE_TTL_SECONDS is the upper bound on staleness.
+  - IDENTITY_CACHE_TTL_SECONDS = 0 disables the cache entirely.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 10000
+
+_PENDING_KEY = 'identity_cache_pending_invalidations'
+
+
+class IdentityCache:
+    """Thread-safe TTL cache with LRU eviction, keyed by user id."""
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read TTL / size limits from the Flask config."""
+        self.ttl_seconds = app.config.get('IDENTITY_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+        self.max_entries = app.config.get('IDENTITY_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, user_id):
+        """Return the cached identity dict for user_id, or None if absent/expired."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, identity = entry
+            if expires_at <= self._clock():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return dict(identity)
+
+    def set(self, user_id, identity):
+        """Cache a verified identity, evicting the least recently used entry if full."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user_id] = (self._clock() + self.ttl_seconds, dict(identity))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+identity_cache = IdentityCache()
+
+
+# ── Invalidation hooks ──────────────────────────────────────────────
+
+def _watched_fields_changed(user):
+    state = inspect(user)
+    return any(state.attrs[field].history.has_changes() for field in ('role', 'is_active'))
+
+
+def _collect_invalidations(session, flush_context):
+    """after_flush: evict users whose role/is_active changed or who were deleted."""
+    from models.user_auth import UserAuth
+
+    user_ids = set()
+    for obj in session.dirty:
+        if isinstance(obj, UserAuth) and _watched_fields_changed(obj):
+            user_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, UserAuth):
+            user_ids.add(obj.id)
+
+    if not user_ids:
+        return
+
+    for user_id in user_ids:
+        identity_cache.invalidate(user_id)
+    session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+def _apply_invalidations(session):
+    """after_commit: evict again now that the new values are visible to readers."""
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        identity_cache.invalidate(user_id)
+
+
+def _discard_invalidations(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_invalidation_hooks(session):
+    """Attach cache invalidation listeners to the given session (or session class)."""
+    if event.contains(session, 'after_flush', _collect_invalidations):
+        return
+    event.listen(session, 'after_flush', _collect_invalidations)
+    event.listen(session, 'after_commit', _apply_invalidations)
+    event.listen(session, 'after_soft_rollback', _discard_invalidations)
@@ -0,0 +1,143 @@
+"""
+JWKS key cache — parsed signing keys by kid, refreshed ahead of expiry.
+
+validate_azure_token() used to fetch the OIDC config + JWKS inside the login
+request whenever the cache expired or an unknown kid showed up, and parsed
+the RSA key from its JWK on every call. JwksKeyCache instead:
+  - keeps kid -> parsed public key, so a hit is a dict lookup
+  - once keys are older than refresh_after (default 80% of the TTL), keeps
+    serving them and refreshes on a background thread; only keys past the
+    TTL (or a cold cache) are fetched in the request
+  - single-flights refreshes: one thread fetches, concurrent callers wait
+    for (or, in the background case, skip) that fetch rather than firing
+    their own
+  - remembers kids the JWKS doesn't contain for negative_ttl, and never
+    fetches more than once per min_refresh_interval, so a flood of tokens
+    with bogus kids (or an unreachable IdP) can't turn into a flood of
+    JWKS requests
+  - keeps serving the last good keys if a refresh fails
+"""
+import logging
+import threading
+import time
+
+import requests
+from jwt.algorithms import RSAAlgorithm
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 12 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS = 300
+DEFAULT_MIN_REFRESH_INTERVAL_SECONDS = 30
+DEFAULT_TIMEOUT_SECONDS = 10
+MAX_UNKNOWN_KIDS = 1000
+
+
+class JwksKeyCache:
+    def __init__(self, oidc_config_url, ttl_seconds=DEFAULT_TTL_SECONDS, refresh_after_seconds=None,
+                 negative_ttl_seconds=DEFAULT_NEGATIVE_TTL_SECONDS,
+                 min_refresh_interval_seconds=DEFAULT_MIN_REFRESH_INTERVAL_SECONDS,
+                 timeout=DEFAULT_TIMEOUT_SECONDS, http=None, clock=time.monotonic):
+        self.oidc_config_url = oidc_config_url
+        self.ttl_seconds = ttl_seconds
+        self.refresh_after_seconds = (
+            refresh_after_seconds if refresh_after_seconds is not None else ttl_seconds * 0.8
+        )
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.timeout = timeout
+        self._http = http or requests
+        self._clock = clock
+        self._keys = {}             # kid -> parsed public key
+        self._fetched_at = None     # clock() of the last successful fetch
+        self._attempted_at = None   # clock() of the last fetch attempt
+        self._unknown_kids = {}     # kid -> clock() until which it is treated as unknown
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    # ── Public API ───────────────────────────────────────────────────
+
+    def get_key(self, kid):
+        """Parsed public key for `kid`, or None if the JWKS doesn't have it."""
+        now = self._clock()
+        with self._lock:
+            key = self._keys.get(kid)
+            fetched_at, attempted_at = self._fetched_at, self._attempted_at
+            known_unknown = now < self._unknown_kids.get(kid, now)
+        expired = fetched_at is None or now - fetched_at >= self.ttl_seconds
+
+        if not expired and key is not None:
+            if now - fetched_at >= self.refresh_after_seconds and self._may_fetch(now, attempted_at):
+                self._refresh_in_background()
+            return key
+        if not expired and known_unknown:
+            return None
+        # Cold, expired, or a kid we haven't seen (possibly a freshly rotated key)
+        self._refresh(seen_attempt=attempted_at, allowed=self._may_fetch(now, attempted_at))
+
+        with self._lock:
+            key = self._keys.get(kid)
+            if key is None and self._fetched_at is not None:
+                self._remember_unknown(kid)
+            return key
+
+    def clear(self):
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = None
+            self._attempted_at = None
+            self._unknown_kids.clear()
+
+    # ── Refreshing ───────────────────────────────────────────────────
+
+    def _may_fetch(self, now, attempted_at):
+        return attempted_at is None or now - attempted_at >= self.min_refresh_interval_seconds
+
+    def _remember_unknown(self, kid):
+        """Negative-cache `kid`. Call with _lock held."""
+        now = self._clock()
+        if len(self._unknown_kids) >= MAX_UNKNOWN_KIDS:
+            self._unknown_kids = {k: until for k, until in self._unknown_kids.items() if until > now}
+        if len(self._unknown_kids) < MAX_UNKNOWN_KIDS:
+            self._unknown_kids[kid] = now + self.negative_ttl_seconds
+
+    def _refresh(self, seen_attempt, allowed=True):
+        """Wait out any fetch in progress; then fetch if `allowed` and nobody has since `seen_attempt`."""
+        with self._refresh_lock:
+            if allowed and self._attempted_at == seen_attempt:
+                self._fetch()
+
+    def _refresh_in_background(self):
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # A refresh is already running
+
+        def run():
+            try:
+                self._fetch()
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=run, name='jwks-refresh', daemon=True).start()
+
+    def _fetch(self):
+        """Fetch and parse the JWKS. Call with _refresh_lock held. Keeps old keys on failure."""
+        with self._lock:
+            self._attempted_at = self._clock()
+        try:
+            oidc_resp = self._http.get(self.oidc_config_url, timeout=self.timeout)
+            oidc_resp.raise_for_status()
+            jwks_resp = self._http.get(oidc_resp.json()['jwks_uri'], timeout=self.timeout)
+            jwks_resp.raise_for_status()
+            keys = {}
+            for jwk in jwks_resp.json()['keys']:
+                if jwk.get('kid') and jwk.get('kty') == 'RSA':
+                    keys[jwk['kid']] = RSAAlgorithm.from_jwk(jwk)
+        except Exception as e:
+            logger.error('Failed to fetch JWKS from %s: %s', self.oidc_config_url, e)
+            return
+
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = self._clock()
+            self._unknown_kids = {kid: until for kid, until in self._unknown_kids.items() if kid not in keys}
+        logger.info('Fetched %d JWKS signing keys', len(keys))
@@ -3,14 +3,18 @@ JWT utility functions — token creation, decoding, and Azure AD validation.
 Migrated from auth-service/utils/jwt_utils.py.
 """
 import os
+import hmac
 import uuid
 import hashlib
+import secrets
 import logging
 from datetime import datetime, timedelta, timezone
 
 import jwt
 import bcrypt
-import requests
+from sqlalchemy import update
+
+from utils.jwks_cache import JwksKeyCache
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +39,25 @@ if len(JWT_SECRET) < 32 and not JWT_SECRET.startswith('INSECURE-DEV'):
 JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
 ACCESS_TOKEN_EXPIRY_MINUTES = 15
 REFRESH_TOKEN_EXPIRY_DAYS = 7
+# Browsers' EventSource can't send an Authorization header, so /api/stream
+# also accepts a ?token= that is only good for opening a stream, briefly.
+STREAM_TOKEN_EXPIRY_SECONDS = 60
+
+# Refresh tokens are issued as 'rt2.<secret>' and stored as an HMAC-SHA256
+# digest of the secret, so verification is one indexed lookup instead of a
+# bcrypt check. The key defaults to one derived from JWT_SECRET; rotating it
+# invalidates every outstanding rt2 token.
+REFRESH_TOKEN_PREFIX = 'rt2.'
+REFRESH_TOKEN_HMAC_KEY = (
+    os.getenv('REFRESH_TOKEN_HMAC_KEY')
+    or hmac.new(JWT_SECRET.encode(), b'refresh-token-digest', hashlib.sha256).hexdigest()
+).encode()
+# Revoked tokens still verify this long after rotation, so concurrent
+# refreshes from the same client don't log it out.
+REFRESH_TOKEN_GRACE_SECONDS = 30
+# Tokens without an id prefix predate indexed lookup and can only be checked
+# by bcrypt-scanning every active row. Off unless explicitly re-enabled.
+REFRESH_TOKEN_LEGACY_SCAN = os.getenv('REFRESH_TOKEN_LEGACY_SCAN', 'false').lower() == 'true'
 
 # Azure AD
 AZURE_AD_TENANT_ID = os.getenv('AZURE_AD_TENANT_ID', '')
@@ -45,9 +68,9 @@ AZURE_OIDC_CONFIG_URL = (
     f'https://login.microsoftonline.com/{AZURE_AD_TENANT_ID}/v2.0/.well-known/openid-configuration'
 )
 
-# Cache for Azure JWKS keys
-_jwks_cache: dict = {'keys': None, 'fetched_at': None}
+# Parsed Azure AD signing keys by kid (see utils/jwks_cache.py)
 JWKS_CACHE_TTL = timedelta(hours=12)
+azure_jwks = JwksKeyCache(AZURE_OIDC_CONFIG_URL, ttl_seconds=JWKS_CACHE_TTL.total_seconds())
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -68,26 +91,52 @@ def create_access_token(user):
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
-def create_refresh_token(user, db_session):
-    """Create a long-lived refresh token; store its hash in the DB."""
-    from models.refresh_token import RefreshToken
+def create_stream_token(user_id):
+    """Create a single-purpose token for opening /api/stream from a browser."""
+    now = datetime.now(timezone.utc)
+    payload = {
+        'sub': user_id,
+        'iat': now,
+        'exp': now + timedelta(seconds=STREAM_TOKEN_EXPIRY_SECONDS),
+        'type': 'stream',
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def decode_stream_token(token):
+    """Decode and verify a stream token. Returns the payload dict."""
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    if payload.get('type') != 'stream':
+        raise jwt.InvalidTokenError('Not a stream token')
+    return payload
+
+
+def refresh_token_digest(secret):
+    """Keyed digest stored for (and looked up by) an rt2 refresh token's secret."""
+    return hmac.new(REFRESH_TOKEN_HMAC_KEY, secret.encode(), hashlib.sha256).hexdigest()
 
-    raw_token = uuid.uuid4().hex + uuid.uuid4().hex  # 64-char hex string
-    token_hash = bcrypt.hashpw(raw_token.encode(), bcrypt.gensalt(rounds=10)).decode()
 
+def create_refresh_token(user, db_session, family_id=None):
+    """Create a long-lived refresh token; store its HMAC digest in the DB.
 
+    Tokens issued by rotating an earlier one pass its `family_id`, so the
+    whole chain can be revoked together; a login starts a new family.
+    """
+    from models.refresh_token import RefreshToken
+
+    secret = secrets.token_urlsafe(32)
     expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRY_DAYS)
 
     refresh = RefreshToken(
         user_id=user.id,
-        token_hash=token_hash,
+        family_id=family_id or str(uuid.uuid4()),
+        token_digest=refresh_token_digest(secret),
         expires_at=expires_at,
     )
     db_session.add(refresh)
     db_session.commit()
 
-    return f"{refresh.id}:{raw_token}", refresh.id
-
+    return f"{REFRESH_TOKEN_PREFIX}{secret}", refresh.id
 
 
 def decode_access_token(token):
@@ -103,87 +152,89 @@ def decode_access_token(token):
         raise
 
 
+def revoke_token_family(family_id, db_session):
+    """Revoke every still-active token in a rotation family (one indexed UPDATE). Caller commits."""
+    from models.refresh_token import RefreshToken
+
+    return db_session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.is_revoked.is_(False))
+        .values(is_revoked=True, revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def _accept(rt, db_session):
+    """Return `rt` if it is active or revoked within the grace period.
+
+    A token presented after it was rotated away (past the grace period) has
+    been replayed — most likely stolen — so its whole family is revoked.
+    """
+    if rt.is_expired():
+        return None
+    if not rt.is_revoked:
+        return rt
+    elapsed = rt.revoked_seconds_ago()
+    if elapsed is not None and elapsed < REFRESH_TOKEN_GRACE_SECONDS:
+        return rt
+    if rt.family_id:
+        revoked = revoke_token_family(rt.family_id, db_session)
+        db_session.commit()
+        logger.warning('Revoked refresh token %s reused; revoked %d tokens in family %s',
+                       rt.id, revoked, rt.family_id)
+    return None
+
+
 def verify_refresh_token(raw_token, db_session):
-    """Look up and verify a raw refresh token against stored hashes.
+    """Look up and verify a raw refresh token.
+
+    'rt2.<secret>' tokens are found by their HMAC digest (one indexed
+    lookup). Legacy '<id>:<secret>' tokens are bcrypt-checked against their
+    row until they expire or are rotated on refresh.
 
     Returns the RefreshToken record if valid, or None.
     """
     from models.refresh_token import RefreshToken
 
-    # New format: 'id:raw_token'
+    if raw_token.startswith(REFRESH_TOKEN_PREFIX):
+        digest = refresh_token_digest(raw_token[len(REFRESH_TOKEN_PREFIX):])
+        rt = RefreshToken.query.filter_by(token_digest=digest).first()
+        if rt and hmac.compare_digest(rt.token_digest, digest):
+            return _accept(rt, db_session)
+        return None
+
     if ':' not in raw_token:
-        # Fallback for old tokens (sequential scan)
-        from models.refresh_token import RefreshToken
-        active_tokens = RefreshToken.query.filter_by(is_revoked=False).all()
-        for rt in active_tokens:
-            if rt.is_expired():
-                continue
+        if not REFRESH_TOKEN_LEGACY_SCAN:
+            return None
+        # Pre-id tokens: bcrypt-check every unexpired legacy row
+        candidates = RefreshToken.query.filter(
+            RefreshToken.is_revoked.is_(False),
+            RefreshToken.token_hash.isnot(None),
+            RefreshToken.expires_at > datetime.now(timezone.utc),
+        ).all()
+        for rt in candidates:
             if bcrypt.checkpw(raw_token.encode(), rt.token_hash.encode()):
                 return rt
         return None
 
     try:
-        from models.refresh_token import RefreshToken
         token_id, actual_raw = raw_token.split(':', 1)
-        rt = RefreshToken.query.get(token_id)
-        
-        if not rt or rt.is_revoked or rt.is_expired():
-            # Check for grace period if revoked
-            if rt and rt.is_revoked and rt.revoked_at:
-                now = datetime.now(timezone.utc)
-                GRACE_PERIOD_SECONDS = 30
-                elapsed = (now - rt.revoked_at).total_seconds()
-                if elapsed < GRACE_PERIOD_SECONDS:
-                    if bcrypt.checkpw(actual_raw.encode(), rt.token_hash.encode()):
-                        return rt
+        rt = db_session.get(RefreshToken, token_id)
+        if not rt or not rt.token_hash or rt.is_expired():
             return None
-
         if bcrypt.checkpw(actual_raw.encode(), rt.token_hash.encode()):
-            return rt
+            return _accept(rt, db_session)
     except Exception as e:
         logger.error(f"Error verifying indexed refresh token: {e}")
         return None
 
     return None
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # Azure AD Token Validation
 # ═══════════════════════════════════════════════════════════════════════
 
-def _get_azure_jwks():
-    """Fetch (and cache) the Microsoft JWKS signing keys."""
-    now = datetime.now(timezone.utc)
-
-    cached_keys = _jwks_cache.get('keys')
-    cached_at = _jwks_cache.get('fetched_at')
-
-    if (
-        cached_keys is not None
-        and cached_at is not None
-        and now - cached_at < JWKS_CACHE_TTL
-    ):
-        return cached_keys
-
-    try:
-        oidc_resp = requests.get(AZURE_OIDC_CONFIG_URL, timeout=10)
-        oidc_resp.raise_for_status()
-        jwks_uri = oidc_resp.json()['jwks_uri']
-
-        jwks_resp = requests.get(jwks_uri, timeout=10)
-        jwks_resp.raise_for_status()
-        keys = jwks_resp.json()['keys']
-
-        _jwks_cache['keys'] = keys
-        _jwks_cache['fetched_at'] = now
-        logger.info('Fetched %d Azure AD JWKS signing keys', len(keys))
-        return keys
-    except Exception as e:
-        logger.error('Failed to fetch Azure AD JWKS: %s', e)
-        cached_keys = _jwks_cache.get('keys')
-        if cached_keys is not None:
-            return cached_keys
-        raise
-
-
 def validate_azure_token(id_token):
     """Validate an Azure AD ID token.
 
@@ -197,26 +248,10 @@ def validate_azure_token(id_token):
         if not kid:
             raise jwt.InvalidTokenError('Token header missing kid')
 
-        keys = _get_azure_jwks()
-        matching_key = None
-        for key in keys:
-            if key.get('kid') == kid:
-                matching_key = key
-                break
-
-        if matching_key is None:
-            _jwks_cache['keys'] = None
-            keys = _get_azure_jwks()
-            for key in keys:
-                if key.get('kid') == kid:
-                    matching_key = key
-                    break
-
-        if matching_key is None:
+        public_key = azure_jwks.get_key(kid)
+        if public_key is None:
             raise jwt.InvalidTokenError(f'No matching key found for kid={kid}')
 
-        public_key = jwt.algorithms.RSAAlgorithm.from_jwk(matching_key)
-
         payload = jwt.decode(
             id_token,
             public_key,
@@ -0,0 +1,162 @@
+"""
+Password hasher — bcrypt on a dedicated, size-bounded thread pool.
+
+bcrypt at cost 12 takes a few hundred milliseconds of CPU. Running it on the
+request thread lets a burst of logins occupy every worker, so health checks
+and other requests time out. Instead:
+  - hashing and verification run on PASSWORD_HASH_POOL_SIZE threads (bcrypt
+    releases the GIL while it works)
+  - at most PASSWORD_HASH_MAX_QUEUE calls may wait for a thread; past that,
+    and for calls that wait longer than PASSWORD_HASH_MAX_WAIT_SECONDS,
+    HasherBusy is raised so the route can shed load with a 503
+  - needs_rehash() reports hashes made at a different cost than
+    PASSWORD_BCRYPT_ROUNDS, so login can re-hash them transparently
+  - stats() exposes call counts, hash latency and queue wait
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUNDS = 12
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_MAX_WAIT_SECONDS = 5
+
+
+class HasherBusy(Exception):
+    """The hashing pool is saturated; the caller should retry later."""
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing is saturated')
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    def __init__(self, rounds=DEFAULT_ROUNDS, pool_size=DEFAULT_POOL_SIZE, max_queue=DEFAULT_MAX_QUEUE,
+                 max_wait_seconds=DEFAULT_MAX_WAIT_SECONDS):
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._reset_stats()
+
+    def init_app(self, app):
+        """Read cost / pool limits from the Flask config."""
+        self.rounds = app.config.get('PASSWORD_BCRYPT_ROUNDS', DEFAULT_ROUNDS)
+        self.pool_size = app.config.get('PASSWORD_HASH_POOL_SIZE', DEFAULT_POOL_SIZE)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', DEFAULT_MAX_QUEUE)
+        self.max_wait_seconds = app.config.get('PASSWORD_HASH_MAX_WAIT_SECONDS', DEFAULT_MAX_WAIT_SECONDS)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+        with self._lock:
+            self._reset_stats()
+
+    # ── Public API ───────────────────────────────────────────────────
+
+    def hash(self, password):
+        """bcrypt hash of `password` at the configured cost, as a str."""
+        rounds = self.rounds
+        return self._run('hash', lambda: bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode())
+
+    def verify(self, password, password_hash):
+        """True if `password` matches `password_hash`."""
+        return self._run('verify', lambda: bcrypt.checkpw(password.encode(), password_hash.encode()))
+
+    def needs_rehash(self, password_hash):
+        """True if `password_hash` was made at a different cost than the configured one."""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        with self._lock:
+            snapshot = {
+                'in_flight': self._in_flight,
+                'capacity': self.pool_size + self.max_queue,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+            }
+            for op, (calls, hash_total, hash_max, wait_total, wait_max) in self._ops.items():
+                snapshot[op] = {
+                    'calls': calls,
+                    'avg_hash_ms': round(hash_total / calls * 1000, 2) if calls else None,
+                    'max_hash_ms': round(hash_max * 1000, 2),
+                    'avg_wait_ms': round(wait_total / calls * 1000, 2) if calls else None,
+                    'max_wait_ms': round(wait_max * 1000, 2),
+                }
+        return snapshot
+
+    # ── Internals ────────────────────────────────────────────────────
+
+    def _reset_stats(self):
+        # op -> [calls, hash seconds total, hash seconds max, wait seconds total, wait seconds max]
+        self._ops = {'hash': [0, 0.0, 0.0, 0.0, 0.0], 'verify': [0, 0.0, 0.0, 0.0, 0.0]}
+        self._rejected = 0
+        self._timed_out = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='bcrypt')
+            return self._executor
+
+    def _retry_after(self):
+        return max(1, int(self.max_wait_seconds))
+
+    def _run(self, op, fn):
+        with self._lock:
+            if self._in_flight >= self.pool_size + self.max_queue:
+                self._rejected += 1
+                raise HasherBusy(self._retry_after())
+            self._in_flight += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self._record(op, started - submitted, time.perf_counter() - started)
+
+        try:
+            future = self._get_executor().submit(timed)
+        except Exception:
+            self._release()
+            raise
+        # Counted until the work itself finishes (or is cancelled), not until
+        # the caller stops waiting, so abandoned calls still occupy capacity.
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(timeout=self.max_wait_seconds)
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            logger.warning('Password %s waited over %ss; shedding', op, self.max_wait_seconds)
+            raise HasherBusy(self._retry_after())
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record(self, op, waited, took):
+        with self._lock:
+            entry = self._ops[op]
+            entry[0] += 1
+            entry[1] += took
+            entry[2] = max(entry[2], took)
+            entry[3] += waited
+            entry[4] = max(entry[4], waited)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,134 @@
+"""
+Sync cursors — keyset positions for incremental ("?since=") polling and
+newest-first ("?before=") paging.
+
+A cursor marks the last (updated_at, id) a client has seen. Endpoints return
+rows strictly after it, ordered by (updated_at, id), plus the cursor of the
+last row returned.
+
+updated_at is stamped in Python when a row is flushed, not when its
+transaction commits, so a row can become visible after rows with later
+timestamps have already been served (e.g. notifications created inside a
+long cycle activation). A cursor therefore never advances past
+OVERLAP_SECONDS before now: the final page of a poll hands back a plain
+timestamp that far behind, and the next poll re-scans that window. Delivery
+is at least once — rows changed in the last OVERLAP_SECONDS are sent again,
+so clients must upsert by id — and nothing is missed as long as writers
+commit within the window.
+
+The encoded form is opaque to clients. A plain ISO-8601 timestamp is also
+accepted for the first sync.
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_
+
+_SEPARATOR = '|'
+
+# How far behind now a sync cursor may point; longer than any writing transaction.
+OVERLAP_SECONDS = 120
+
+
+class InvalidCursor(ValueError):
+    """The ?since= value is neither a cursor we issued nor an ISO timestamp."""
+
+
+def _as_utc(moment):
+    if moment.tzinfo is None:
+        # SQLite hands back naive datetimes; every timestamp we store is UTC.
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def encode(updated_at, row_id=''):
+    raw = f'{_as_utc(updated_at).isoformat()}{_SEPARATOR}{row_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def checkpoint(updated_at, row_id='', overlap_seconds=OVERLAP_SECONDS):
+    """Cursor for the latest change a client has been sent.
+
+    Falls back to a plain timestamp overlap_seconds before now when the change
+    is more recent than that, so rows still being committed are picked up.
+    """
+    settled = datetime.now(timezone.utc) - timedelta(seconds=overlap_seconds)
+    if _as_utc(updated_at) > settled:
+        return encode(settled)
+    return encode(updated_at, row_id)
+
+
+def decode(value):
+    """Return (updated_at, row_id) for a ?since= value."""
+    try:
+        return _as_utc(datetime.fromisoformat(value.replace('Z', '+00:00'))), ''
+    except ValueError:
+        pass
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        timestamp, row_id = raw.split(_SEPARATOR, 1)
+        return _as_utc(datetime.fromisoformat(timestamp)), row_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor(value) from exc
+
+
+def after(updated_at_column, id_column, cursor):
+    """WHERE clause for rows strictly after a decoded cursor.
+
+    A cursor without a row id (a plain timestamp, or one built from a
+    MAX(updated_at)) means "changed after this moment".
+    """
+    updated_at, row_id = cursor
+    if not row_id:
+        return updated_at_column > updated_at
+    return or_(
+        updated_at_column > updated_at,
+        and_(updated_at_column == updated_at, id_column > row_id),
+    )
+
+
+def page_after(query, updated_at_column, id_column, since, limit, overlap_seconds=OVERLAP_SECONDS):
+    """Rows changed after `since` (a ?since= value), oldest first.
+
+    Returns (rows, next_cursor, has_more). On the last page next_cursor is
+    held back to overlap_seconds before now (see checkpoint), so the next
+    poll may re-send rows. A `since` of None starts from the oldest row.
+    Pass overlap_seconds=0 for keyset paging over a column that isn't a sync
+    timestamp.
+    """
+    if since is not None:
+        cursor = decode(since)
+        query = query.filter(after(updated_at_column, id_column, cursor))
+    rows = query.order_by(updated_at_column.asc(), id_column.asc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        last = rows[-1]
+        position = (getattr(last, updated_at_column.key), getattr(last, id_column.key))
+    elif since is not None:
+        position = cursor
+    else:
+        return rows, None, False
+    if has_more:
+        return rows, encode(*position), True
+    return rows, checkpoint(*position, overlap_seconds=overlap_seconds), False
+
+
+def page_before(query, order_column, id_column, before, limit):
+    """Newest-first keyset page: rows strictly before the `before` cursor (or the newest if None).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if before:
+        moment, row_id = decode(before)
+        query = query.filter(or_(
+            order_column < moment,
+            and_(order_column == moment, id_column < row_id),
+        ))
+    rows = query.order_by(order_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode(getattr(last, order_column.key), getattr(last, id_column.key))
@@ -2,6 +2,7 @@
 "use client";
 
 import { useGoalComments, useAddComment } from "@/hooks/use-goal-comments";
+import { useEventStream } from "@/hooks/use-event-stream";
 import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar";
 import { Button } from "@/components/ui/button";
 import { Textarea } from "@/components/ui/textarea";
@@ -30,6 +31,7 @@ const typeColors: Record<string, string> = {
 };
 
 export function GoalTimeline({ goalId }: GoalTimelineProps) {
+    useEventStream([goalId]);
     const { data: comments, isLoading } = useGoalComments(goalId);
     const addComment = useAddComment();
     const [newComment, setNewComment] = useState("");
@@ -11,6 +11,7 @@ import {
 } from "@/components/ui/dropdown-menu";
 import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 import apiClient from "@/lib/api-client";
+import { useEventStream } from "@/hooks/use-event-stream";
 import { formatDistanceToNow } from "date-fns";
 import { Bell, Check } from "lucide-react";
 import Link from "next/link";
@@ -36,7 +37,7 @@ function useNotifications() {
             // API returns a list directly
             return Array.isArray(data) ? data : (data.notifications || []);
         },
-        refetchInterval: 30000, // Poll every 30 seconds
+        refetchInterval: 300000, // Fallback; /api/stream pushes changes
     });
 }
 
@@ -101,6 +102,7 @@ function formatEvent(event: string): string {
 }
 
 export function NotificationBell() {
+    useEventStream();
     const { data: notifications, isLoading } = useNotifications();
     const markRead = useMarkNotificationRead();
     const markAllRead = useMarkAllRead();
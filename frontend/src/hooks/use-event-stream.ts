@@ -0,0 +1,72 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import apiClient, { API_BASE_URL } from '@/lib/api-client';
+
+const RECONNECT_DELAY_MS = 5000;
+
+/**
+ * Subscribe to /api/stream and refresh cached notifications and goal comments
+ * when the server pushes a change.
+ *
+ * EventSource can't send an Authorization header, so each connection uses a
+ * short-lived stream token from POST /api/stream/token. The token is only
+ * checked when the stream opens; on any error (including the server closing
+ * the stream after STREAM_MAX_SECONDS) we fetch a fresh one and reconnect.
+ */
+export function useEventStream(goalIds: string[] = []) {
+    const queryClient = useQueryClient();
+    const goals = goalIds.filter(Boolean).join(',');
+
+    useEffect(() => {
+        let source: EventSource | null = null;
+        let retry: ReturnType<typeof setTimeout> | undefined;
+        let closed = false;
+
+        const refreshAll = () => {
+            queryClient.invalidateQueries({ queryKey: ['notifications'] });
+            goals.split(',').filter(Boolean).forEach((goalId) =>
+                queryClient.invalidateQueries({ queryKey: ['goals', goalId, 'comments'] })
+            );
+        };
+
+        const scheduleReconnect = () => {
+            if (!closed) retry = setTimeout(connect, RECONNECT_DELAY_MS);
+        };
+
+        async function connect() {
+            let stream: EventSource;
+            try {
+                const { data } = await apiClient.post<{ token: string }>('/api/stream/token');
+                if (closed) return;
+                const params = new URLSearchParams({ token: data.token });
+                if (goals) params.set('goals', goals);
+                stream = new EventSource(`${API_BASE_URL}/api/stream?${params}`);
+            } catch {
+                scheduleReconnect();
+                return;
+            }
+            // Catch up on anything missed while disconnected.
+            stream.addEventListener('ready', refreshAll);
+            stream.addEventListener('resync', refreshAll);
+            stream.addEventListener('notification', () =>
+                queryClient.invalidateQueries({ queryKey: ['notifications'] })
+            );
+            stream.addEventListener('goal_comment', (event) => {
+                const { goal_id } = JSON.parse((event as MessageEvent).data);
+                queryClient.invalidateQueries({ queryKey: ['goals', goal_id, 'comments'] });
+            });
+            stream.onerror = () => {
+                stream.close();
+                scheduleReconnect();
+            };
+            source = stream;
+        }
+
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            source?.close();
+        };
+    }, [goals, queryClient]);
+}